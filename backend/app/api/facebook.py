@@ -4,9 +4,10 @@ Facebook Dashboard API路由
 import logging
 from fastapi import APIRouter, Depends, Query, Body
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
 from app.core.cache import invalidate_cache
 from app.services.facebook_service import FacebookDashboardService
@@ -25,7 +26,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_service(db: Session = Depends(get_db)) -> FacebookDashboardService:
+def get_service(db: AsyncSession = Depends(get_async_db)) -> FacebookDashboardService:
     """获取Facebook服务实例"""
     return FacebookDashboardService(db)
 
@@ -145,7 +146,8 @@ async def get_ads_detail_performance_overview(
 ):
     """获取Facebook Ads Detail Performance Overview数据"""
     return await service.get_ads_detail_performance_overview(
-        request.startDate1, request.endDate1, request.startDate2, request.endDate2, request.accountId
+        request.startDate1, request.endDate1, request.startDate2, request.endDate2, request.accountId,
+        request.includePreview
     )
 
 
@@ -4,9 +4,10 @@ Google Ads Dashboard API路由
 import logging
 from fastapi import APIRouter, Depends, Query, Body
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
 from app.core.cache import invalidate_cache
 from app.services.google_service import GoogleDashboardService
@@ -23,7 +24,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_service(db: Session = Depends(get_db)) -> GoogleDashboardService:
+def get_service(db: AsyncSession = Depends(get_async_db)) -> GoogleDashboardService:
     """获取Google服务实例"""
     return GoogleDashboardService(db)
 
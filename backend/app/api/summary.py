@@ -16,7 +16,7 @@ from app.core.cache import cached
 router = APIRouter()
 
 
-@cached(prefix="summary:facebook_multi_account", ttl=settings.CACHE_TTL_SHORT)
+@cached(prefix="summary:facebook_multi_account", ttl=settings.CACHE_TTL_SHORT, invalidate_on_sync=False)
 async def _get_facebook_multi_account_summary(
     account_ids: List[str],
     this_week_start: str,
@@ -122,7 +122,7 @@ async def get_facebook_multi_account_summary(
         return api_error(f"获取Facebook汇总数据失败: {str(e)}", code=500)
 
 
-@cached(prefix="summary:google_two_weeks", ttl=settings.CACHE_TTL_SHORT)
+@cached(prefix="summary:google_two_weeks", ttl=settings.CACHE_TTL_SHORT, invalidate_on_sync=False)
 async def _get_google_two_weeks_summary(
     this_week_start: str,
     this_week_end: str,
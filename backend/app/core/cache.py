@@ -3,18 +3,40 @@ Redis缓存管理器
 提供两级缓存策略：L1内存缓存 + L2 Redis缓存
 """
 import json
+import re
+import time
+import uuid
+import asyncio
 import hashlib
 import logging
-from typing import Any, Optional, Callable
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Callable, Tuple
 from collections.abc import Mapping, Sequence
 from functools import wraps
 from datetime import timedelta
 import redis
-from cachetools import TTLCache
+from cachetools import LRUCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .cache_codec import CacheCodec
 from .config import settings
+from .database import AsyncSessionLocal, SessionLocal
+from .events import DataChangedEvent, subscribe_data_changed
+from .l1_cache import SizedTTLCache
 
 logger = logging.getLogger(__name__)
 
+# 释放回源锁时校验持有者，避免误删其他进程在租期过期后重新获取的锁
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 class CacheManager:
     """缓存管理器 - 支持两级缓存"""
@@ -22,7 +44,29 @@ class CacheManager:
     def __init__(self):
         """初始化缓存管理器"""
         self.redis_client: Optional[redis.Redis] = None
-        self.l1_cache = TTLCache(maxsize=100, ttl=300)  # L1: 内存缓存，5分钟TTL
+        # L1: 内存缓存，按字节预算和前缀配额淘汰，TTL 跟随各条目
+        self.l1_cache = SizedTTLCache(
+            max_bytes=settings.CACHE_L1_MAX_MB * 1024 * 1024,
+            quotas=settings.CACHE_L1_PREFIX_QUOTA_RULES,
+            validator=self._is_current_generation,
+        )
+        self._generations: Dict[str, Tuple[int, float]] = {}  # 平台 -> (失效代数, 读取时间)
+        self.codec = CacheCodec.from_settings()  # L2: 二进制编码 + 压缩
+        self.single_flight_stats = {
+            "coalesced": 0,  # 进程内合并到同一次回源的请求数
+            "lock_waits": 0,  # 因其他进程持锁而等待的次数
+            "lock_wait_hits": 0,  # 等待后直接拿到其他进程回填结果的次数
+        }
+        self.stale_stats = {
+            "stale_hits": 0,  # 软过期后直接返回旧值的次数
+            "background_refreshes": 0,  # 后台刷新成功次数
+            "background_refresh_errors": 0,  # 后台刷新失败次数
+        }
+        self.sync_stats = {
+            "invalidated": 0,  # 因同步数据变化失效的键数
+            "warmed": 0,  # 同步后预热的键数
+            "warm_errors": 0,  # 预热失败的键数
+        }
         self._connect_redis()
     
     def _connect_redis(self):
@@ -33,7 +77,7 @@ class CacheManager:
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
                 password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                decode_responses=True,
+                decode_responses=False,  # L2 存储编码后的二进制数据
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 retry_on_timeout=True,
@@ -90,31 +134,75 @@ class CacheManager:
         
         return f"{prefix}:{key_str}"
     
-    def get(self, key: str) -> Optional[Any]:
+    def _current_generation(self, platform: str) -> int:
+        """
+        平台的缓存失效代数（同步失效时递增）
+        
+        L1 条目记录写入时的代数，其他 worker 发现代数变化后丢弃本进程的旧 L1 条目；
+        代数在本进程缓存 CACHE_L1_GENERATION_CHECK_SECONDS 秒，避免每次命中都访问Redis
+        """
+        if not self.redis_client:
+            return 0
+        now = time.monotonic()
+        cached = self._generations.get(platform)
+        if cached and now - cached[1] < settings.CACHE_L1_GENERATION_CHECK_SECONDS:
+            return cached[0]
+        try:
+            generation = int(self.redis_client.get(f"cachegen:{platform}") or 0)
+        except Exception:
+            generation = cached[0] if cached else 0
+        self._generations[platform] = (generation, now)
+        return generation
+    
+    def bump_generation(self, platform: str):
+        """递增平台的失效代数，使所有 worker 的该平台 L1 条目失效"""
+        if not self.redis_client:
+            return
+        try:
+            generation = int(self.redis_client.incr(f"cachegen:{platform}"))
+            self._generations[platform] = (generation, time.monotonic())
+        except Exception as e:
+            logger.error(f"Redis失效代数更新失败: {platform}, {str(e)}")
+    
+    def _l1_tag(self, key: str) -> Optional[int]:
+        platform = _platform_of(key)
+        return self._current_generation(platform) if platform else None
+    
+    def _is_current_generation(self, key: str, tag: Any) -> bool:
+        platform = _platform_of(key)
+        return not platform or tag == self._current_generation(platform)
+    
+    def get(self, key: str, prefix: Optional[str] = None) -> Optional[Any]:
         """
         获取缓存数据（先L1后L2）
         
         Args:
             key: 缓存键
+            prefix: 缓存前缀（用于L1按前缀统计）
             
         Returns:
             缓存的数据，如果不存在返回None
         """
         # 先查L1缓存
-        if key in self.l1_cache:
+        data = self.l1_cache.get(key, prefix)
+        if data is not None:
             logger.debug(f"🎯 L1缓存命中: {key}")
-            return self.l1_cache[key]
+            return data
         
         # 再查L2缓存（Redis）
         if self.redis_client:
             try:
-                value = self.redis_client.get(key)
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = pipe.execute()
                 if value:
                     logger.debug(f"🎯 L2缓存命中: {key}")
                     # 反序列化
-                    data = json.loads(value)
-                    # 写入L1缓存
-                    self.l1_cache[key] = data
+                    data = self.codec.decode(value)
+                    # 写入L1缓存（沿用L2剩余TTL）
+                    if pttl and pttl > 0:
+                        self.l1_cache.set(key, data, pttl / 1000, prefix, self._l1_tag(key))
                     return data
             except Exception as e:
                 logger.error(f"Redis获取失败: {key}, {str(e)}")
@@ -122,7 +210,7 @@ class CacheManager:
         logger.debug(f"❌ 缓存未命中: {key}")
         return None
     
-    def set(self, key: str, value: Any, ttl: int = 3600):
+    def set(self, key: str, value: Any, ttl: int = 3600, prefix: Optional[str] = None):
         """
         设置缓存数据（同时写入L1和L2）
         
@@ -130,14 +218,15 @@ class CacheManager:
             key: 缓存键
             value: 要缓存的数据
             ttl: 过期时间（秒），默认1小时
+            prefix: 缓存前缀（用于L1按前缀统计）
         """
         # 写入L1缓存
-        self.l1_cache[key] = value
+        self.l1_cache.set(key, value, ttl, prefix, self._l1_tag(key))
         
         # 写入L2缓存（Redis）
         if self.redis_client:
             try:
-                serialized = json.dumps(value, ensure_ascii=False)
+                serialized = self.codec.encode(value)
                 self.redis_client.setex(key, ttl, serialized)
                 logger.debug(f"✅ 缓存已设置: {key} (TTL: {ttl}s)")
             except Exception as e:
@@ -156,6 +245,110 @@ class CacheManager:
             except Exception as e:
                 logger.error(f"Redis删除失败: {key}, {str(e)}")
     
+    @staticmethod
+    def _fill_lock_key(key: str) -> str:
+        """回源锁的Redis键（不与业务前缀重叠，clear_pattern 不会误删）"""
+        return f"lock:{key}"
+
+    def acquire_fill_lock(self, key: str) -> Optional[str]:
+        """
+        获取跨进程回源锁（SET NX PX）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            锁令牌；锁已被其他进程持有时返回None。Redis不可用时返回空字符串（视为获取成功）
+        """
+        if not self.redis_client:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_client.set(
+                self._fill_lock_key(key), token, nx=True, px=settings.CACHE_LOCK_LEASE_MS
+            )
+        except Exception as e:
+            logger.error(f"Redis回源锁获取失败: {key}, {str(e)}")
+            return ""
+        return token if acquired else None
+
+    def release_fill_lock(self, key: str, token: str):
+        """释放回源锁（仅当仍由自己持有时）"""
+        if not self.redis_client or not token:
+            return
+        try:
+            self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, self._fill_lock_key(key), token)
+        except Exception as e:
+            logger.error(f"Redis回源锁释放失败: {key}, {str(e)}")
+
+    def is_fill_locked(self, key: str) -> bool:
+        """回源锁是否仍被持有"""
+        if not self.redis_client:
+            return False
+        try:
+            return bool(self.redis_client.exists(self._fill_lock_key(key)))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _range_index_key(platform: str) -> str:
+        """缓存键范围索引（Redis Hash：缓存键 -> 范围元数据JSON）"""
+        return f"cacheidx:{platform}"
+
+    def index_key_range(self, key: str, meta: Dict[str, Any]):
+        """记录缓存键的 平台/账户/日期范围，供同步后精确失效"""
+        if not self.redis_client:
+            return
+        try:
+            index_key = self._range_index_key(meta["platform"])
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hset(index_key, key, json.dumps(meta))
+            pipe.expire(index_key, settings.CACHE_TTL_LONG * 2)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis范围索引写入失败: {key}, {str(e)}")
+
+    def get_indexed_ranges(self, platform: str) -> Dict[str, Dict[str, Any]]:
+        """读取平台下所有缓存键的范围元数据"""
+        if not self.redis_client:
+            return {}
+        try:
+            raw = self.redis_client.hgetall(self._range_index_key(platform))
+        except Exception as e:
+            logger.error(f"Redis范围索引读取失败: {platform}, {str(e)}")
+            return {}
+        ranges = {}
+        for key, value in raw.items():
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            try:
+                ranges[key] = json.loads(value)
+            except (TypeError, ValueError):
+                ranges[key] = {}
+        return ranges
+
+    def drop_indexed_keys(self, platform: str, keys: List[str]):
+        """从范围索引中移除键"""
+        if not self.redis_client or not keys:
+            return
+        try:
+            self.redis_client.hdel(self._range_index_key(platform), *keys)
+        except Exception as e:
+            logger.error(f"Redis范围索引删除失败: {platform}, {str(e)}")
+
+    def prune_range_index(self, platform: str, keys: List[str]):
+        """移除索引中缓存已过期的键，避免索引无限增长"""
+        if not self.redis_client or not keys:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.exists(key)
+            missing = [key for key, exists in zip(keys, pipe.execute()) if not exists]
+            self.drop_indexed_keys(platform, missing)
+        except Exception as e:
+            logger.error(f"Redis范围索引清理失败: {platform}, {str(e)}")
+
     def clear_pattern(self, pattern: str) -> int:
         """
         清除匹配模式的所有缓存
@@ -200,14 +393,14 @@ class CacheManager:
     def get_stats(self) -> dict:
         """获取缓存统计信息"""
         stats = {
-            "l1_cache": {
-                "size": len(self.l1_cache),
-                "maxsize": self.l1_cache.maxsize,
-                "ttl": self.l1_cache.ttl
-            },
+            "l1_cache": self.l1_cache.get_stats(),
             "redis": {
                 "connected": self.redis_client is not None
-            }
+            },
+            "single_flight": dict(self.single_flight_stats),
+            "stale": dict(self.stale_stats),
+            "sync_invalidation": dict(self.sync_stats),
+            "codec": self.codec.get_stats()
         }
         
         if self.redis_client:
@@ -249,14 +442,250 @@ class CacheManager:
 cache_manager = CacheManager()
 
 
-def cached(prefix: str, ttl: int = 3600, key_builder: Optional[Callable] = None):
+# 进程内正在回源的缓存键：异步调用共享 Future，同步调用共享 _Flight
+_inflight_async: Dict[str, asyncio.Future] = {}
+_inflight_sync: Dict[str, "_Flight"] = {}
+_inflight_lock = threading.Lock()
+
+# 软过期缓存的包装标记：{SWR_MARKER: 软过期时间戳, "data": 原始结果}
+SWR_MARKER = "__swr_soft_expire_at__"
+
+# 正在后台刷新的缓存键（去重），以及后台任务的强引用
+_refreshing_keys: set = set()
+_background_tasks: set = set()
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_background_refresh: ContextVar[bool] = ContextVar("cache_background_refresh", default=False)
+
+# 进程内缓存键登记：访问次数、范围元数据和重算参数（用于同步后按热度预热和后台刷新）
+_key_registry: LRUCache = LRUCache(maxsize=settings.CACHE_KEY_REGISTRY_SIZE)
+_registry_lock = threading.Lock()
+_pending_warm_keys: set = set()
+
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_ACCOUNT_ARG_NAMES = ("account_id", "accountId", "account_ids")
+
+
+class _KeyEntry:
+    """进程内登记的缓存键"""
+
+    def __init__(self, meta: Optional[Dict[str, Any]], refresh: Callable, is_async: bool):
+        self.meta = meta
+        self.refresh = refresh
+        self.is_async = is_async
+        self.hits = 0
+
+
+class _DetachedArg:
+    """登记时替换数据库会话（或持有会话的服务对象）的占位符，重算时用新会话重建"""
+
+    __slots__ = ("service_cls", "is_async")
+
+    def __init__(self, service_cls: Optional[type], is_async: bool):
+        self.service_cls = service_cls
+        self.is_async = is_async
+
+    def rebuild(self, db: Any) -> Any:
+        return self.service_cls(db) if self.service_cls else db
+
+
+def _detach(value: Any) -> Any:
+    """请求作用域的会话和服务对象不随登记保留（服务对象按 cls(db) 重建）"""
+    if isinstance(value, (Session, AsyncSession)):
+        return _DetachedArg(None, isinstance(value, AsyncSession))
+    db = getattr(value, "db", None)
+    if isinstance(db, (Session, AsyncSession)):
+        return _DetachedArg(type(value), isinstance(db, AsyncSession))
+    return value
+
+
+def _detach_call(args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+    return tuple(_detach(arg) for arg in args), {name: _detach(value) for name, value in kwargs.items()}
+
+
+def _rebuild_call(call: Tuple[tuple, dict], allow_async: bool) -> Tuple[tuple, dict, List[Any]]:
+    """用新会话还原登记的调用参数，返回 (args, kwargs, 需要关闭的会话)"""
+    sessions: List[Any] = []
+
+    def attach(value: Any) -> Any:
+        if not isinstance(value, _DetachedArg):
+            return value
+        db = AsyncSessionLocal() if value.is_async and allow_async else SessionLocal()
+        sessions.append(db)
+        return value.rebuild(db)
+
+    args, kwargs = call
+    return tuple(attach(arg) for arg in args), {name: attach(value) for name, value in kwargs.items()}, sessions
+
+
+def _platform_of(prefix: str) -> Optional[str]:
+    """从缓存前缀推断数据所属平台（如 facebook:impressions:db、summary:google_two_weeks）"""
+    for platform in ("facebook", "google"):
+        if platform in prefix:
+            return platform
+    return None
+
+
+def _collect_dates(value: Any, dates: List[str]):
+    if isinstance(value, str):
+        if _DATE_PATTERN.match(value):
+            dates.append(value[:10])
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            _collect_dates(item, dates)
+    elif isinstance(value, Sequence) and not isinstance(value, (bytes, bytearray)):
+        for item in value:
+            _collect_dates(item, dates)
+
+
+def _build_range_meta(
+    prefix: str,
+    signature: inspect.Signature,
+    args: tuple,
+    kwargs: dict,
+    range_builder: Optional[Callable] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    从调用参数提取缓存键的范围元数据
+
+    Returns:
+        {"platform", "start", "end", "accounts"}；无法判断平台时返回None。
+        未识别出日期时 start/end 为None，失效时按"与任意范围重叠"处理
+    """
+    platform = _platform_of(prefix)
+    if not platform:
+        return None
+    try:
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        arguments = dict(kwargs)
+
+    start = end = None
+    if range_builder:
+        start, end = range_builder(arguments)
+    else:
+        dates: List[str] = []
+        for name, value in arguments.items():
+            if name != "self":
+                _collect_dates(value, dates)
+        if dates:
+            start, end = min(dates), max(dates)
+
+    accounts = []
+    for name in _ACCOUNT_ARG_NAMES:
+        value = arguments.get(name)
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        accounts.extend(str(v).replace("act_", "") for v in values if v)
+    return {"platform": platform, "start": start, "end": end, "accounts": sorted(set(accounts))}
+
+
+def _range_overlaps(meta: Optional[Dict[str, Any]], event: DataChangedEvent) -> bool:
+    """缓存键的范围是否与变更事件重叠（元数据缺失时保守地视为重叠）"""
+    if not meta:
+        return True
+    accounts = meta.get("accounts") or []
+    if event.account_id and accounts and event.account_id not in accounts:
+        return False
+    start, end = meta.get("start"), meta.get("end")
+    if not start or not end:
+        return True
+    return not (end < event.start_date or start > event.end_date)
+
+
+def in_background_refresh() -> bool:
+    """当前是否运行在缓存后台刷新中（此时请求作用域的数据库会话可能已关闭，调用方应使用独立连接）"""
+    return _background_refresh.get()
+
+
+def _stale_window(prefix: str, ttl: int) -> int:
+    """按前缀配置（最长前缀匹配）计算可返回旧值的秒数，0 表示不返回旧值"""
+    matched = None
+    for rule_prefix, seconds in settings.CACHE_STALE_PREFIX_RULES.items():
+        if prefix.startswith(rule_prefix) and (matched is None or len(rule_prefix) > len(matched[0])):
+            matched = (rule_prefix, seconds)
+    if matched is None:
+        return 0
+    if matched[1] is not None:
+        return matched[1]
+    return int(ttl * settings.CACHE_STALE_TTL_RATIO)
+
+
+def _read_cache(cache_key: str, prefix: Optional[str] = None) -> Tuple[Optional[Any], bool]:
+    """
+    读取缓存并解开软过期包装
+
+    Returns:
+        (数据, 是否已软过期)；未命中时数据为None
+    """
+    value = cache_manager.get(cache_key, prefix)
+    if isinstance(value, dict) and SWR_MARKER in value:
+        return value.get("data"), time.time() >= value[SWR_MARKER]
+    return value, False
+
+
+class _Flight:
+    """同步调用的一次回源（等待者阻塞在 event 上）"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+async def _wait_for_peer_fill_async(cache_key: str, prefix: Optional[str] = None) -> Optional[Any]:
+    """其他进程持锁回源时，轮询等待其写入新鲜结果；锁释放或超时后返回None"""
+    cache_manager.single_flight_stats["lock_waits"] += 1
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+    interval = settings.CACHE_LOCK_POLL_INTERVAL_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        cached_data, stale = _read_cache(cache_key, prefix)
+        if cached_data is not None and not stale:
+            cache_manager.single_flight_stats["lock_wait_hits"] += 1
+            return cached_data
+        if not cache_manager.is_fill_locked(cache_key):
+            break
+    return None
+
+
+def _wait_for_peer_fill_sync(cache_key: str, prefix: Optional[str] = None) -> Optional[Any]:
+    """同 _wait_for_peer_fill_async（同步版本）"""
+    cache_manager.single_flight_stats["lock_waits"] += 1
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+    interval = settings.CACHE_LOCK_POLL_INTERVAL_MS / 1000
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        cached_data, stale = _read_cache(cache_key, prefix)
+        if cached_data is not None and not stale:
+            cache_manager.single_flight_stats["lock_wait_hits"] += 1
+            return cached_data
+        if not cache_manager.is_fill_locked(cache_key):
+            break
+    return None
+
+
+def cached(
+    prefix: str,
+    ttl: int = 3600,
+    key_builder: Optional[Callable] = None,
+    invalidate_on_sync: bool = True,
+    range_builder: Optional[Callable] = None
+):
     """
     缓存装饰器 - 用于缓存函数返回值
     
+    同一缓存键的并发未命中只回源一次：进程内后到的调用等待首个调用的结果，
+    跨进程通过Redis短租期锁协调，未抢到锁的进程等待持锁进程回填缓存。
+    前缀在 CACHE_STALE_PREFIXES 中配置时，TTL 到期后在可返回旧值的时长内直接返回旧值，
+    并在后台刷新（同一键只刷新一次）。
+    同步服务写入数据后，日期范围与同步窗口重叠的键会被失效，并按访问次数预热。
+    
     Args:
         prefix: 缓存键前缀
-        ttl: 过期时间（秒）
+        ttl: 过期时间（秒）；允许返回旧值时为软过期时间
         key_builder: 自定义键生成函数
+        invalidate_on_sync: 数据来自同步后的数据库表时为True；直接调用广告平台API的结果不受同步影响，应设为False
+        range_builder: 自定义日期范围提取函数，参数为绑定后的调用参数字典，返回 (开始日期, 结束日期)；
+                       默认取参数中所有 YYYY-MM-DD 日期的最小值和最大值
     
     Example:
         @cached(prefix="facebook:impressions", ttl=1800)
@@ -264,54 +693,248 @@ def cached(prefix: str, ttl: int = 3600, key_builder: Optional[Callable] = None)
             # 调用API获取数据
             return data
     """
+    stale_window = _stale_window(prefix, ttl)
+
     def decorator(func: Callable):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            # 生成缓存键
+        is_async = inspect.iscoroutinefunction(func)
+        signature = inspect.signature(func)
+
+        def build_key(*args, **kwargs) -> str:
             if key_builder:
-                cache_key = key_builder(*args, **kwargs)
+                return key_builder(*args, **kwargs)
+            return cache_manager._generate_cache_key(prefix, *args, **kwargs)
+
+        def store(cache_key: str, result: Any, meta: Optional[Dict[str, Any]] = None):
+            if result is None:
+                return
+            if stale_window > 0:
+                envelope = {SWR_MARKER: time.time() + ttl, "data": result}
+                cache_manager.set(cache_key, envelope, ttl + stale_window, prefix)
             else:
-                cache_key = cache_manager._generate_cache_key(prefix, *args, **kwargs)
+                cache_manager.set(cache_key, result, ttl, prefix)
+            if meta:
+                cache_manager.index_key_range(cache_key, meta)
+
+        def track(cache_key: str, args: tuple, kwargs: dict) -> _KeyEntry:
+            """登记缓存键并累计访问次数"""
+            with _registry_lock:
+                entry = _key_registry.get(cache_key)
+            if entry is None:
+                meta = None
+                if invalidate_on_sync:
+                    try:
+                        meta = _build_range_meta(prefix, signature, args, kwargs, range_builder)
+                    except Exception as e:
+                        logger.debug(f"缓存键范围解析失败: {cache_key}, {str(e)}")
+
+                # 只保留重建调用所需的参数，会话和服务对象在重算时新建
+                call = _detach_call(args, kwargs)
+                if is_async:
+                    async def refresh():
+                        call_args, call_kwargs, sessions = _rebuild_call(call, allow_async=True)
+                        try:
+                            store(cache_key, await func(*call_args, **call_kwargs), meta)
+                        finally:
+                            for db in sessions:
+                                if isinstance(db, AsyncSession):
+                                    await db.close()
+                                else:
+                                    db.close()
+                else:
+                    def refresh():
+                        call_args, call_kwargs, sessions = _rebuild_call(call, allow_async=False)
+                        try:
+                            store(cache_key, func(*call_args, **call_kwargs), meta)
+                        finally:
+                            for db in sessions:
+                                db.close()
+
+                entry = _KeyEntry(meta, refresh, is_async)
+                with _registry_lock:
+                    _key_registry[cache_key] = entry
+            entry.hits += 1
+            return entry
+
+        async def fill_async(cache_key: str, meta: Optional[Dict[str, Any]], *args, **kwargs):
+            token = cache_manager.acquire_fill_lock(cache_key)
+            if token is None:
+                cached_data = await _wait_for_peer_fill_async(cache_key, prefix)
+                if cached_data is not None:
+                    return cached_data
+                token = cache_manager.acquire_fill_lock(cache_key) or ""
+            try:
+                result = await func(*args, **kwargs)
+                store(cache_key, result, meta)
+                return result
+            finally:
+                cache_manager.release_fill_lock(cache_key, token)
+
+        def fill_sync(cache_key: str, meta: Optional[Dict[str, Any]], *args, **kwargs):
+            token = cache_manager.acquire_fill_lock(cache_key)
+            if token is None:
+                cached_data = _wait_for_peer_fill_sync(cache_key, prefix)
+                if cached_data is not None:
+                    return cached_data
+                token = cache_manager.acquire_fill_lock(cache_key) or ""
+            try:
+                result = func(*args, **kwargs)
+                store(cache_key, result, meta)
+                return result
+            finally:
+                cache_manager.release_fill_lock(cache_key, token)
+
+        def claim_refresh(cache_key: str) -> Optional[str]:
+            """登记后台刷新；同键已在本进程刷新或其他进程持锁时返回None"""
+            with _inflight_lock:
+                if cache_key in _refreshing_keys:
+                    return None
+                _refreshing_keys.add(cache_key)
+            token = cache_manager.acquire_fill_lock(cache_key)
+            if token is None:
+                with _inflight_lock:
+                    _refreshing_keys.discard(cache_key)
+            return token
+
+        def finish_refresh(cache_key: str, token: str, error: Optional[Exception]):
+            cache_manager.release_fill_lock(cache_key, token)
+            with _inflight_lock:
+                _refreshing_keys.discard(cache_key)
+            if error is None:
+                cache_manager.stale_stats["background_refreshes"] += 1
+            else:
+                cache_manager.stale_stats["background_refresh_errors"] += 1
+                logger.warning(f"⚠️ 缓存后台刷新失败: {cache_key}, {str(error)}")
+
+        def schedule_refresh_async(cache_key: str, entry: _KeyEntry):
+            token = claim_refresh(cache_key)
+            if token is None:
+                return
+
+            async def run():
+                ctx_token = _background_refresh.set(True)
+                error = None
+                try:
+                    await entry.refresh()
+                except Exception as e:
+                    error = e
+                finally:
+                    _background_refresh.reset(ctx_token)
+                    finish_refresh(cache_key, token, error)
+
+            task = asyncio.get_running_loop().create_task(run())
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+
+        def schedule_refresh_sync(cache_key: str, entry: _KeyEntry):
+            token = claim_refresh(cache_key)
+            if token is None:
+                return
+
+            def run():
+                ctx_token = _background_refresh.set(True)
+                error = None
+                try:
+                    entry.refresh()
+                except Exception as e:
+                    error = e
+                finally:
+                    _background_refresh.reset(ctx_token)
+                    finish_refresh(cache_key, token, error)
+
+            _refresh_executor.submit(run)
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            cache_key = build_key(*args, **kwargs)
+            entry = track(cache_key, args, kwargs)
             
-            # 尝试从缓存获取
-            cached_data = cache_manager.get(cache_key)
+            # 尝试从缓存获取（软过期时返回旧值并后台刷新）
+            cached_data, stale = _read_cache(cache_key, prefix)
             if cached_data is not None:
+                if stale:
+                    cache_manager.stale_stats["stale_hits"] += 1
+                    schedule_refresh_async(cache_key, entry)
                 return cached_data
             
-            # 缓存未命中，执行函数
-            result = await func(*args, **kwargs)
+            if not settings.CACHE_SINGLE_FLIGHT_ENABLED:
+                result = await func(*args, **kwargs)
+                store(cache_key, result, entry.meta)
+                return result
             
-            # 存入缓存
-            if result is not None:
-                cache_manager.set(cache_key, result, ttl)
+            # 已有相同键在回源，等待其结果
+            flight = _inflight_async.get(cache_key)
+            if flight is not None:
+                cache_manager.single_flight_stats["coalesced"] += 1
+                try:
+                    return await asyncio.shield(flight)
+                except asyncio.CancelledError:
+                    if not flight.cancelled():
+                        raise
+                    # 首个调用被取消（如客户端断开），由当前调用自行回源
+                    return await fill_async(cache_key, entry.meta, *args, **kwargs)
             
-            return result
+            flight = asyncio.get_running_loop().create_future()
+            _inflight_async[cache_key] = flight
+            try:
+                result = await fill_async(cache_key, entry.meta, *args, **kwargs)
+                flight.set_result(result)
+                return result
+            except asyncio.CancelledError:
+                flight.cancel()
+                raise
+            except BaseException as e:
+                flight.set_exception(e)
+                flight.exception()  # 标记已读取，无等待者时不产生未处理异常警告
+                raise
+            finally:
+                _inflight_async.pop(cache_key, None)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # 生成缓存键
-            if key_builder:
-                cache_key = key_builder(*args, **kwargs)
-            else:
-                cache_key = cache_manager._generate_cache_key(prefix, *args, **kwargs)
+            cache_key = build_key(*args, **kwargs)
+            entry = track(cache_key, args, kwargs)
             
-            # 尝试从缓存获取
-            cached_data = cache_manager.get(cache_key)
+            # 尝试从缓存获取（软过期时返回旧值并后台刷新）
+            cached_data, stale = _read_cache(cache_key, prefix)
             if cached_data is not None:
+                if stale:
+                    cache_manager.stale_stats["stale_hits"] += 1
+                    schedule_refresh_sync(cache_key, entry)
                 return cached_data
             
-            # 缓存未命中，执行函数
-            result = func(*args, **kwargs)
+            if not settings.CACHE_SINGLE_FLIGHT_ENABLED:
+                result = func(*args, **kwargs)
+                store(cache_key, result, entry.meta)
+                return result
+            
+            with _inflight_lock:
+                flight = _inflight_sync.get(cache_key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = _Flight()
+                    _inflight_sync[cache_key] = flight
             
-            # 存入缓存
-            if result is not None:
-                cache_manager.set(cache_key, result, ttl)
+            # 已有相同键在回源，等待其结果
+            if not is_leader:
+                cache_manager.single_flight_stats["coalesced"] += 1
+                flight.event.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
             
-            return result
+            try:
+                flight.result = fill_sync(cache_key, entry.meta, *args, **kwargs)
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight_sync.pop(cache_key, None)
+                flight.event.set()
         
         # 根据函数类型返回对应的wrapper
-        import inspect
-        if inspect.iscoroutinefunction(func):
+        if is_async:
             return async_wrapper
         else:
             return sync_wrapper
@@ -319,6 +942,87 @@ def cached(prefix: str, ttl: int = 3600, key_builder: Optional[Callable] = None)
     return decorator
 
 
+def invalidate_data_range(event: DataChangedEvent) -> List[str]:
+    """
+    失效与数据变更事件重叠的缓存键（数据变更事件订阅者）
+
+    候选键来自Redis范围索引（覆盖所有worker写入的键）和本进程登记的键；
+    被失效且本进程可重算的键加入待预热列表，由 warm_up_invalidated_keys 处理
+
+    Returns:
+        被失效的缓存键列表
+    """
+    if not settings.CACHE_SYNC_INVALIDATION_ENABLED:
+        return []
+
+    candidates = cache_manager.get_indexed_ranges(event.platform)
+    with _registry_lock:
+        for key, entry in _key_registry.items():
+            if entry.meta and entry.meta.get("platform") == event.platform:
+                candidates.setdefault(key, entry.meta)
+
+    matched = [key for key, meta in candidates.items() if _range_overlaps(meta, event)]
+    for key in matched:
+        cache_manager.delete(key)
+    if matched:
+        cache_manager.bump_generation(event.platform)
+    cache_manager.drop_indexed_keys(event.platform, matched)
+    matched_set = set(matched)
+    cache_manager.prune_range_index(event.platform, [key for key in candidates if key not in matched_set])
+
+    with _registry_lock:
+        _pending_warm_keys.update(key for key in matched if key in _key_registry)
+    cache_manager.sync_stats["invalidated"] += len(matched)
+    scope = f"账户 {event.account_id}" if event.account_id else "全部账户"
+    logger.info(
+        f"🗑️ {event.platform} 数据已更新（{scope} {event.start_date} 到 {event.end_date}），失效缓存 {len(matched)} 个键"
+    )
+    return matched
+
+
+async def warm_up_invalidated_keys(limit: Optional[int] = None) -> int:
+    """
+    按访问次数从高到低重算最近被同步失效的缓存键
+
+    Args:
+        limit: 最多预热的键数量，默认 CACHE_WARMUP_TOP_N
+
+    Returns:
+        成功预热的键数量
+    """
+    limit = settings.CACHE_WARMUP_TOP_N if limit is None else limit
+    with _registry_lock:
+        entries = [(key, _key_registry.get(key)) for key in _pending_warm_keys]
+        _pending_warm_keys.clear()
+    entries = [(key, entry) for key, entry in entries if entry is not None]
+    if limit <= 0 or not entries:
+        return 0
+
+    entries.sort(key=lambda item: item[1].hits, reverse=True)
+    warmed = 0
+    ctx_token = _background_refresh.set(True)
+    try:
+        for key, entry in entries[:limit]:
+            try:
+                if entry.is_async:
+                    await entry.refresh()
+                else:
+                    await asyncio.to_thread(entry.refresh)
+                warmed += 1
+            except Exception as e:
+                cache_manager.sync_stats["warm_errors"] += 1
+                logger.warning(f"⚠️ 缓存预热失败: {key}, {str(e)}")
+    finally:
+        _background_refresh.reset(ctx_token)
+
+    cache_manager.sync_stats["warmed"] += warmed
+    logger.info(f"🔥 同步后已预热 {warmed}/{min(limit, len(entries))} 个缓存键")
+    return warmed
+
+
+subscribe_data_changed(invalidate_data_range)
+
+
 def invalidate_cache(pattern: str):
     """
     清除缓存的辅助函数
@@ -0,0 +1,194 @@
+"""
+Redis L2 缓存编解码
+序列化（orjson / msgpack / json）+ 超过阈值时压缩（zstd / lz4 / zlib），带格式头，兼容旧的 JSON 文本缓存
+"""
+import json
+import threading
+import time
+import zlib
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - 可选依赖
+    lz4_frame = None
+
+from .config import settings
+
+# 格式头：MAGIC(1) + 版本(1) + 序列化方式(1) + 压缩方式(1)
+# 0xC1 在 UTF-8 中不会出现，可与旧的 JSON 文本缓存区分
+CODEC_MAGIC = 0xC1
+CODEC_VERSION = 1
+HEADER_SIZE = 4
+
+SERIALIZERS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_SERIALIZER_NAMES = {v: k for k, v in SERIALIZERS.items()}
+_COMPRESSION_NAMES = {v: k for k, v in COMPRESSIONS.items()}
+
+
+def _available_serializer(name: str) -> bool:
+    return name == "json" or (name == "orjson" and orjson is not None) or (name == "msgpack" and msgpack is not None)
+
+
+def _available_compression(name: str) -> bool:
+    return name in ("none", "zlib") or (name == "zstd" and zstandard is not None) or (name == "lz4" and lz4_frame is not None)
+
+
+def _resolve(configured: str, preference: tuple, available) -> str:
+    """解析配置的编解码方式，auto 或未安装时按优先级回退"""
+    configured = (configured or "auto").lower()
+    if configured != "auto" and available(configured):
+        return configured
+    return next(name for name in preference if available(name))
+
+
+class CacheCodec:
+    """L2 缓存编解码器（线程安全，统计为近似值）"""
+
+    def __init__(self, serializer: str, compression: str, compress_min_bytes: int, level: int):
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+        self._zstd_local = threading.local()  # zstd 压缩/解压器不是线程安全的，每个线程各建一个
+        self._stats = {
+            "encoded": 0,
+            "decoded": 0,
+            "legacy_decoded": 0,
+            "compressed": 0,
+            "raw_bytes": 0,
+            "stored_bytes": 0,
+            "encode_seconds": 0.0,
+            "decode_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "CacheCodec":
+        serializer = _resolve(settings.CACHE_CODEC_SERIALIZER, ("orjson", "msgpack", "json"), _available_serializer)
+        compression = _resolve(settings.CACHE_CODEC_COMPRESSION, ("zstd", "lz4", "zlib"), _available_compression)
+        return cls(serializer, compression, settings.CACHE_COMPRESS_MIN_BYTES, settings.CACHE_COMPRESS_LEVEL)
+
+    # ---------- 序列化 ----------
+
+    def _serialize(self, value: Any) -> bytes:
+        if self.serializer == "orjson":
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        if self.serializer == "msgpack":
+            return msgpack.packb(value, use_bin_type=True)
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _deserialize(serializer: str, payload: bytes) -> Any:
+        if serializer == "orjson":
+            return orjson.loads(payload)
+        if serializer == "msgpack":
+            return msgpack.unpackb(payload, raw=False)
+        return json.loads(payload)
+
+    # ---------- 压缩 ----------
+
+    def _zstd(self):
+        local = self._zstd_local
+        if not hasattr(local, "compressor"):
+            local.compressor = zstandard.ZstdCompressor(level=self.level)
+            local.decompressor = zstandard.ZstdDecompressor()
+        return local
+
+    def _compress(self, compression: str, payload: bytes) -> bytes:
+        if compression == "zstd":
+            return self._zstd().compressor.compress(payload)
+        if compression == "lz4":
+            return lz4_frame.compress(payload)
+        if compression == "zlib":
+            return zlib.compress(payload, min(max(self.level, 1), 9))
+        return payload
+
+    def _decompress(self, compression: str, payload: bytes) -> bytes:
+        if compression == "zstd":
+            return self._zstd().decompressor.decompress(payload)
+        if compression == "lz4":
+            return lz4_frame.decompress(payload)
+        if compression == "zlib":
+            return zlib.decompress(payload)
+        return payload
+
+    # ---------- 编解码 ----------
+
+    def encode(self, value: Any) -> bytes:
+        """序列化并在超过阈值时压缩，返回带格式头的字节串"""
+        started = time.perf_counter()
+        payload = self._serialize(value)
+        raw_size = len(payload)
+        compression = "none"
+        if self.compression != "none" and raw_size >= self.compress_min_bytes:
+            compressed = self._compress(self.compression, payload)
+            if len(compressed) < raw_size:
+                payload, compression = compressed, self.compression
+        header = bytes((CODEC_MAGIC, CODEC_VERSION, SERIALIZERS[self.serializer], COMPRESSIONS[compression]))
+        data = header + payload
+
+        stats = self._stats
+        stats["encoded"] += 1
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += len(data)
+        if compression != "none":
+            stats["compressed"] += 1
+        stats["encode_seconds"] += time.perf_counter() - started
+        return data
+
+    def decode(self, data: Any) -> Any:
+        """解码 encode 的结果；无格式头时按旧的 JSON 文本解析"""
+        started = time.perf_counter()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if len(data) >= HEADER_SIZE and data[0] == CODEC_MAGIC:
+            version, serializer_id, compression_id = data[1], data[2], data[3]
+            if version != CODEC_VERSION:
+                raise ValueError(f"不支持的缓存编码版本: {version}")
+            serializer = _SERIALIZER_NAMES.get(serializer_id)
+            compression = _COMPRESSION_NAMES.get(compression_id)
+            if not serializer or not compression:
+                raise ValueError(f"未知的缓存编码: serializer={serializer_id}, compression={compression_id}")
+            value = self._deserialize(serializer, self._decompress(compression, data[HEADER_SIZE:]))
+        else:
+            value = json.loads(data)
+            self._stats["legacy_decoded"] += 1
+        self._stats["decoded"] += 1
+        self._stats["decode_seconds"] += time.perf_counter() - started
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """编解码统计"""
+        stats = dict(self._stats)
+        encoded = stats["encoded"] or 1
+        decoded = stats["decoded"] or 1
+        return {
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "compress_min_bytes": self.compress_min_bytes,
+            "encoded": stats["encoded"],
+            "decoded": stats["decoded"],
+            "legacy_decoded": stats["legacy_decoded"],
+            "compressed": stats["compressed"],
+            "raw_bytes": stats["raw_bytes"],
+            "stored_bytes": stats["stored_bytes"],
+            "compression_ratio": round(stats["raw_bytes"] / stats["stored_bytes"], 3) if stats["stored_bytes"] else None,
+            "avg_encode_ms": round(stats["encode_seconds"] / encoded * 1000, 3),
+            "avg_decode_ms": round(stats["decode_seconds"] / decoded * 1000, 3),
+        }
@@ -2,7 +2,7 @@
 应用配置
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 from pathlib import Path
 import json
 import os
@@ -42,6 +42,14 @@ class Settings(BaseSettings):
         """数据库连接URL"""
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """异步数据库连接URL（看板查询使用）"""
+        return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
+    
+    DB_ASYNC_POOL_SIZE: int = 20  # 异步连接池大小
+    DB_ASYNC_MAX_OVERFLOW: int = 40  # 异步连接池最大溢出连接数
+    
     # Facebook API配置（请在 .env 文件中配置）
     FACEBOOK_APP_ID: str = ""
     FACEBOOK_APP_SECRET: str = ""
@@ -52,21 +60,68 @@ class Settings(BaseSettings):
     FACEBOOK_ADS_PROXY_URL: str = ""  # 兼容旧配置
     FACEBOOK_DAILY_SYNC_ENABLED: bool = True  # 启用自动同步（按每小时整点执行）
     FACEBOOK_HOURLY_SYNC_DAYS: int = 14  # 整点增量同步窗口（天）
+    FACEBOOK_HOURLY_CHANGE_DETECTION_ENABLED: bool = True  # 整点同步先比对账户级每天汇总，只重新读取汇总变化的日期（需启用 SYNC_STATE_ENABLED）
     FACEBOOK_DAILY_SYNC_DAYS: int = 30  # 每日回补窗口（天）
     FACEBOOK_DAILY_SYNC_INCLUDE_TODAY: bool = False  # 每日回补是否包含今天
     FACEBOOK_BACKFILL_ENABLED: bool = True  # 是否启用每日回补
     FACEBOOK_BACKFILL_HOUR: int = 2  # 每日回补触发小时（0-23）
     FACEBOOK_DAILY_SYNC_PROFILE: str = "default"  # 同步性能配置: default|conservative|aggressive
     FACEBOOK_DAILY_SYNC_ACCOUNT_IDS: str = ""  # 逗号分隔的账号列表，留空则使用 FACEBOOK_AD_ACCOUNT_ID
+    FACEBOOK_SYNC_ACCOUNT_PARALLELISM: int = 3  # 定时同步时同时同步的账户数（每个账户独立会话，共享应用限流）
+    FACEBOOK_OVERVIEW_HYBRID_ENABLED: bool = True  # 总览接口中已完整同步的日期读取本地表，只实时查询其余日期；触达等不可累加指标仍实时取总值（需启用 SYNC_STATE_ENABLED）
+    FACEBOOK_OVERVIEW_SETTLE_HOURS: int = 3  # 日期结束后至少再过该小时数的同步才视为完整（账户时区晚于服务器时区时调大）
+    FACEBOOK_CREATIVE_DIMENSION_ENABLED: bool = False  # 广告明细接口关联创意维度表返回图片和预览（执行 sql_create_dim_ad_creative.sql 后开启）
+    FACEBOOK_ROLLUP_ENABLED: bool = False  # 看板按天/广告系列/广告组粒度的查询优先读取日汇总表，并在同步后刷新汇总表（建表并用 facebook_rollup_backfill.py 回填后再开启）
+    FACEBOOK_INSIGHTS_CHUNK_WORKERS: int = 4  # 大日期范围分片读取 Insights 的并发数
+    FACEBOOK_RATE_GOVERNOR_ENABLED: bool = True  # 按响应用量头（X-Business-Use-Case-Usage 等）自适应调整每个账户的并发和速率
+    FACEBOOK_RATE_TARGET_USAGE_PCT: float = 75.0  # 目标用量百分比，超过后成倍收缩，低于其 80% 时线性放大
+    FACEBOOK_RATE_MIN_CONCURRENCY: int = 2  # 每个账户的最小并发
+    FACEBOOK_RATE_INITIAL_RPS: float = 10.0  # 每个账户的初始请求速率（次/秒）
+    FACEBOOK_RATE_MIN_RPS: float = 1.0  # 每个账户的最低请求速率（次/秒）
+    FACEBOOK_RATE_MAX_RPS: float = 100.0  # 每个账户的最高请求速率（次/秒）
+    FACEBOOK_RATE_RPS_STEP: float = 1.0  # 每轮线性放大的速率增量（次/秒）
+    FACEBOOK_RATE_THROTTLE_PAUSE_SECONDS: float = 15.0  # 触发限流后暂停该账户请求的基础秒数（连续限流时倍增）
+    FACEBOOK_ASYNC_FETCH_ENABLED: bool = True  # 创意/预览使用单线程异步客户端（httpx 连接池 + 信号量）获取，替代大线程池
+    FACEBOOK_BATCH_API_INFLIGHT: int = 4  # Batch API 同时在途的批次数（仍受账户限速器约束）
+    FACEBOOK_BATCH_API_TARGET_SECONDS: float = 8.0  # Batch API 单批目标耗时（秒），超过时批次减半，低于一半时逐步放大
+    FACEBOOK_CREATIVE_MEMORY_ENTRIES: int = 20000  # 创意/预览存储的进程内 LRU 最大条目数
+    FACEBOOK_CREATIVE_STORE_TTL_SECONDS: int = 2592000  # 创意/预览在 Redis 中的保存时间（秒，默认30天，按版本键存储无需提前失效）
+    FACEBOOK_STREAMING_SYNC_ENABLED: bool = True  # 流式同步：Insights 分页读取、转换、写库三段并行，内存占用与日期范围无关
+    FACEBOOK_STREAMING_BATCH_ROWS: int = 2000  # 流式同步每批行数
+    FACEBOOK_STREAMING_MAX_INFLIGHT_ROWS: int = 20000  # 流式同步队列中最多缓存的行数（超出时读取端等待）
+    FACEBOOK_ASYNC_INSIGHTS_ENABLED: bool = True  # 大日期范围使用异步报表任务（AdReportRun）获取 Insights
+    FACEBOOK_ASYNC_INSIGHTS_MIN_DAYS: int = 8  # 同步窗口达到该天数才使用异步报表
+    FACEBOOK_ASYNC_INSIGHTS_DAYS_PER_JOB: int = 10  # 每个异步报表任务覆盖的天数
+    FACEBOOK_ASYNC_INSIGHTS_POLL_SECONDS: float = 5.0  # 轮询异步报表状态的间隔（秒）
+    FACEBOOK_ASYNC_INSIGHTS_TIMEOUT_SECONDS: int = 1800  # 异步报表最长等待时间（秒），超时的窗口回退到同步读取
+    
+    # 同步写入配置
+    SYNC_WRITE_MODE: str = "replace"  # 事实表写入模式: replace(先删后插)|upsert(按内容哈希增量写入)|staging(暂存表装载后单事务替换)；upsert/staging 需先执行 row_hash 迁移脚本
+    SYNC_STATE_ENABLED: bool = True  # 按 平台×账户×天 记录同步状态（需先执行 sql_create_bi_ads_sync_state.sql），失败/中断的日期优先重试
+    SYNC_STATE_HOURLY_SKIP_FRESH_SECONDS: int = 0  # 整点同步跳过在该秒数内已成功同步的日期（0 表示不跳过）
+    SYNC_STATE_BACKFILL_SKIP_FRESH_SECONDS: int = 21600  # 每日回补跳过在该秒数内已成功同步的日期（默认6小时）
+    FACT_PARTITION_MAINTENANCE_ENABLED: bool = True  # 启用事实表月度分区维护（仅对已分区的表生效）
+    FACT_PARTITION_MAINTENANCE_HOUR: int = 3  # 分区维护触发小时（0-23），启动时也会执行一次
+    FACT_PARTITION_PRECREATE_MONTHS: int = 3  # 预建未来分区的月数
+    FACT_PARTITION_RETENTION_MONTHS: int = 0  # 数据保留月数，超期分区整区删除（0 表示不删除）
     
     # Google Ads API配置（请在 .env 文件中配置）
     GOOGLE_ADS_DEVELOPER_TOKEN: str = ""  # Google Ads开发者令牌
     GOOGLE_ADS_CUSTOMER_ID: str = ""  # 客户ID
+    GOOGLE_ADS_LOGIN_CUSTOMER_ID: str = ""  # 经理账户（MCC）ID，通过 MCC 访问子账户时填写，留空则使用 google-ads.yaml 中的配置
+    GOOGLE_ADS_SYNC_CUSTOMER_IDS: str = ""  # 逗号分隔的定时同步客户ID列表，留空则使用 GOOGLE_ADS_CUSTOMER_ID
+    GOOGLE_ADS_SYNC_CUSTOMER_PARALLELISM: int = 3  # 定时同步时同时同步的客户数（每个客户独立会话）
+    GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED: bool = False  # 按 customer_id 写入和覆盖同步窗口（执行 customer_id 迁移脚本后开启；未开启时只同步一个客户）
+    GOOGLE_ADS_TOKEN_REFRESH_MARGIN_SECONDS: int = 300  # 共享客户端的访问令牌在过期前多少秒由后台线程刷新
+    GOOGLE_ADS_TOKEN_REFRESH_CHECK_SECONDS: int = 60  # 后台检查访问令牌是否需要刷新的间隔（秒）
+    GOOGLE_ADS_SYNC_CHUNK_DAYS: int = 0  # 同步时每个 search_stream 查询覆盖的天数（0 表示整个窗口一次查询，7 表示按周分段，1 表示逐天）
     GOOGLE_ADS_CONFIG_PATH: str = "config/google-ads.yaml"  # 配置文件路径（相对于项目根目录）
     GOOGLE_ADS_JSON_KEY_FILE_PATH: str = "config/seismic-relic-466902-q4-c98779167f0b.json"  # 服务账号JSON密钥文件路径
     PROXY_URL: str = ""  # 通用代理地址（可用于Facebook/Google）
     GOOGLE_ADS_MAX_WORKERS: int = 8  # Google Ads API 并发线程池最大线程数
     GOOGLE_ADS_SUMMARY_MAX_WORKERS: int = 4  # 概览汇总线程池最大线程数
+    GOOGLE_ADS_SUMMARY_HYBRID_ENABLED: bool = True  # 概览汇总中已完整同步的日期读取本地表，只实时查询其余日期（需启用 SYNC_STATE_ENABLED 和 GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED）
+    GOOGLE_ADS_SUMMARY_SETTLE_HOURS: int = 3  # 日期结束后至少再过该小时数的同步才视为完整（账户时区晚于服务器时区时调大）
     GOOGLE_ADS_DAILY_SYNC_ENABLED: bool = True  # 启用自动同步（按每小时整点执行）
     GOOGLE_ADS_HOURLY_SYNC_DAYS: int = 14  # 整点增量同步窗口（天）
     GOOGLE_ADS_DAILY_SYNC_DAYS: int = 30  # 每日回补窗口（天）
@@ -191,6 +246,56 @@ class Settings(BaseSettings):
     CACHE_TTL_MEDIUM: int = 3600  # 中期缓存：1小时（广告数据）
     CACHE_TTL_LONG: int = 7200  # 长期缓存：2小时（性能分析、历史数据）
     
+    # L1 内存缓存配置
+    CACHE_L1_MAX_MB: int = 128  # L1 总内存预算（MB）
+    # 按前缀的 L1 配额（MB），逗号分隔 "前缀=MB"；未配置的前缀共享剩余预算，大结果不会挤掉其他前缀
+    CACHE_L1_PREFIX_QUOTAS: str = "facebook:ads_detail_performance=32,facebook:ads_performance=16,summary:=8"
+    CACHE_L1_GENERATION_CHECK_SECONDS: float = 2.0  # L1 命中时检查同步失效代数的间隔（秒）
+    
+    @property
+    def CACHE_L1_PREFIX_QUOTA_RULES(self) -> Dict[str, int]:
+        """解析 L1 前缀配额：{前缀: 字节数}"""
+        quotas = {}
+        for entry in self.CACHE_L1_PREFIX_QUOTAS.split(","):
+            prefix, _, size_mb = entry.strip().partition("=")
+            if prefix.strip() and size_mb.strip().isdigit():
+                quotas[prefix.strip()] = int(size_mb) * 1024 * 1024
+        return quotas
+    
+    # Redis L2 缓存编码配置
+    CACHE_CODEC_SERIALIZER: str = "auto"  # 序列化方式：auto/orjson/msgpack/json（auto 按 orjson > msgpack > json 选择已安装的）
+    CACHE_CODEC_COMPRESSION: str = "auto"  # 压缩方式：auto/zstd/lz4/zlib/none（auto 按 zstd > lz4 > zlib 选择已安装的）
+    CACHE_COMPRESS_MIN_BYTES: int = 4096  # 序列化后超过该字节数才压缩
+    CACHE_COMPRESS_LEVEL: int = 3  # 压缩级别（zstd/zlib）
+    
+    # 缓存回源合并（single-flight）配置
+    CACHE_SINGLE_FLIGHT_ENABLED: bool = True  # 同一缓存键并发未命中时只回源一次
+    CACHE_LOCK_LEASE_MS: int = 15000  # 跨进程回源锁租期（毫秒），持锁进程异常退出后自动释放
+    CACHE_LOCK_WAIT_SECONDS: float = 20.0  # 未抢到锁时等待其他进程回填结果的最长时间（秒）
+    CACHE_LOCK_POLL_INTERVAL_MS: int = 100  # 等待回填时轮询缓存的间隔（毫秒）
+    
+    # 过期后先返回旧值再后台刷新（stale-while-revalidate）
+    # 逗号分隔的缓存键前缀，可写成 "前缀=秒数" 指定可返回旧值的时长，未指定秒数时按 TTL × CACHE_STALE_TTL_RATIO
+    CACHE_STALE_PREFIXES: str = "facebook:overview,facebook:impressions,facebook:purchases,google:impressions,google:conversions,summary:"
+    CACHE_STALE_TTL_RATIO: float = 1.0  # 默认可返回旧值时长 = TTL × 该比例（硬过期 = TTL + 该时长）
+    
+    # 同步后的缓存精确失效与预热
+    CACHE_SYNC_INVALIDATION_ENABLED: bool = True  # 同步写入后按 平台/账户/日期范围 失效重叠的缓存键
+    CACHE_WARMUP_TOP_N: int = 20  # 每轮同步后按访问次数预热的失效键数量（0 关闭预热）
+    CACHE_KEY_REGISTRY_SIZE: int = 1000  # 进程内记录的缓存键（访问次数、重算方法）上限
+    
+    @property
+    def CACHE_STALE_PREFIX_RULES(self) -> Dict[str, Optional[int]]:
+        """解析可返回旧值的缓存前缀配置：{前缀: 可返回旧值的秒数或None}"""
+        rules = {}
+        for entry in self.CACHE_STALE_PREFIXES.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            prefix, _, seconds = entry.partition("=")
+            rules[prefix.strip()] = int(seconds) if seconds.strip().isdigit() else None
+        return rules
+    
     # JWT配置（请在 .env 文件中设置生产环境密钥）
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
@@ -2,6 +2,7 @@
 数据库配置和连接
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -23,6 +24,23 @@ engine = create_engine(
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步数据库引擎（看板只读查询使用，原生 await，不占用线程池）
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=30,
+    echo=settings.DEBUG,
+    execution_options={
+        "isolation_level": "READ COMMITTED"
+    }
+)
+
+# 异步会话工厂
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # 创建基类
 Base = declarative_base()
 
@@ -39,6 +57,15 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    获取异步数据库会话
+    用于FastAPI依赖注入（看板查询接口）
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """初始化数据库表"""
     Base.metadata.create_all(bind=engine)
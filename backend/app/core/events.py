@@ -0,0 +1,65 @@
+"""
+进程内数据变更事件
+同步服务写入数据后发布"某平台/账户/日期范围的数据已变化"，缓存等模块订阅后做精确失效
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataChangedEvent:
+    """数据变更事件"""
+
+    platform: str  # 'facebook' / 'google'
+    start_date: str  # YYYY-MM-DD
+    end_date: str  # YYYY-MM-DD
+    account_id: Optional[str] = None  # 账户ID（不含act_前缀），为空表示该平台所有账户
+
+
+_subscribers: List[Callable[[DataChangedEvent], None]] = []
+_subscribers_lock = threading.Lock()
+
+
+def subscribe_data_changed(handler: Callable[[DataChangedEvent], None]) -> None:
+    """订阅数据变更事件（同一处理函数只注册一次）"""
+    with _subscribers_lock:
+        if handler not in _subscribers:
+            _subscribers.append(handler)
+
+
+def publish_data_changed(
+    platform: str,
+    start_date: str,
+    end_date: str,
+    account_id: Optional[str] = None
+) -> DataChangedEvent:
+    """
+    发布数据变更事件，同步调用所有订阅者（订阅者异常只记录日志）
+
+    Args:
+        platform: 平台
+        start_date: 变更的开始日期
+        end_date: 变更的结束日期
+        account_id: 账户ID，为空表示所有账户
+
+    Returns:
+        发布的事件
+    """
+    event = DataChangedEvent(
+        platform=platform,
+        start_date=str(start_date)[:10],
+        end_date=str(end_date)[:10],
+        account_id=(account_id or "").replace("act_", "") or None,
+    )
+    with _subscribers_lock:
+        handlers = list(_subscribers)
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception as e:
+            logger.error(f"❌ 数据变更事件处理失败: {event}, {str(e)}")
+    return event
@@ -0,0 +1,216 @@
+"""
+L1 进程内缓存
+按字节预算淘汰（LRU），按前缀划分配额，每个条目使用各自的 TTL，并按前缀统计命中/未命中/淘汰
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_BUCKET = "*"  # 未配置配额的前缀共享的分区
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存字节数（递归累加 sys.getsizeof，共享对象只计一次）"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        obj_id = id(obj)
+        if obj_id in seen:
+            continue
+        seen.add(obj_id)
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expire_at", "tag", "stat_prefix")
+
+    def __init__(self, value: Any, size: int, expire_at: float, tag: Any, stat_prefix: str):
+        self.value = value
+        self.size = size
+        self.expire_at = expire_at
+        self.tag = tag
+        self.stat_prefix = stat_prefix
+
+
+class _Bucket:
+    """一个配额分区：独立的字节预算和 LRU 顺序"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+
+class SizedTTLCache:
+    """
+    按字节预算的 TTL + LRU 缓存（线程安全）
+
+    配额前缀各自占用独立分区，其余前缀共享剩余预算，
+    因此大结果（如广告明细）只会淘汰同分区的条目，不会挤掉其他前缀的缓存。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        quotas: Optional[Dict[str, int]] = None,
+        validator: Optional[Callable[[str, Any], bool]] = None
+    ):
+        """
+        Args:
+            max_bytes: 总字节预算
+            quotas: {前缀: 字节配额}
+            validator: 命中时校验条目标记的函数 (key, tag) -> 是否仍有效
+        """
+        quotas = dict(quotas or {})
+        shared = max_bytes - sum(quotas.values())
+        self.max_bytes = max_bytes
+        self._buckets: Dict[str, _Bucket] = {prefix: _Bucket(size) for prefix, size in quotas.items()}
+        self._buckets[DEFAULT_BUCKET] = _Bucket(shared if shared > 0 else max_bytes // 4)
+        # 长前缀优先匹配
+        self._quota_prefixes = sorted(quotas, key=len, reverse=True)
+        self._key_bucket: Dict[str, str] = {}
+        self._validator = validator
+        self._lock = threading.RLock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---------- 内部工具 ----------
+
+    def _bucket_name(self, key: str) -> str:
+        for prefix in self._quota_prefixes:
+            if key.startswith(prefix):
+                return prefix
+        return DEFAULT_BUCKET
+
+    @staticmethod
+    def _default_stat_prefix(key: str) -> str:
+        return ":".join(key.split(":")[:2])
+
+    def _count(self, stat_prefix: str, field: str, amount: int = 1):
+        counters = self._stats.get(stat_prefix)
+        if counters is None:
+            counters = self._stats[stat_prefix] = {
+                "hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidated": 0, "rejected": 0,
+            }
+        counters[field] += amount
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        bucket_name = self._key_bucket.pop(key, None)
+        if bucket_name is None:
+            return None
+        bucket = self._buckets[bucket_name]
+        entry = bucket.entries.pop(key, None)
+        if entry is not None:
+            bucket.used_bytes -= entry.size
+        return entry
+
+    # ---------- 公共接口 ----------
+
+    def get(self, key: str, prefix: Optional[str] = None) -> Optional[Any]:
+        """读取条目（过期或校验失败时删除并视为未命中）"""
+        with self._lock:
+            bucket_name = self._key_bucket.get(key)
+            entry = self._buckets[bucket_name].entries.get(key) if bucket_name else None
+            if entry is None:
+                self._count(prefix or self._default_stat_prefix(key), "misses")
+                return None
+            if entry.expire_at <= time.time():
+                self._remove(key)
+                self._count(entry.stat_prefix, "expired")
+                self._count(entry.stat_prefix, "misses")
+                return None
+            if entry.tag is not None and self._validator and not self._validator(key, entry.tag):
+                self._remove(key)
+                self._count(entry.stat_prefix, "invalidated")
+                self._count(entry.stat_prefix, "misses")
+                return None
+            self._buckets[bucket_name].entries.move_to_end(key)
+            self._count(entry.stat_prefix, "hits")
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: float, prefix: Optional[str] = None, tag: Any = None) -> bool:
+        """
+        写入条目，超出分区预算时按 LRU 淘汰同分区的旧条目
+
+        Returns:
+            是否写入（单个条目超过分区预算时不写入 L1）
+        """
+        stat_prefix = prefix or self._default_stat_prefix(key)
+        size = estimate_size(value)
+        with self._lock:
+            self._remove(key)
+            bucket_name = self._bucket_name(key)
+            bucket = self._buckets[bucket_name]
+            if ttl <= 0 or size > bucket.max_bytes:
+                self._count(stat_prefix, "rejected")
+                return False
+            while bucket.entries and bucket.used_bytes + size > bucket.max_bytes:
+                evicted_key, evicted = bucket.entries.popitem(last=False)
+                self._key_bucket.pop(evicted_key, None)
+                bucket.used_bytes -= evicted.size
+                self._count(evicted.stat_prefix, "evictions")
+            bucket.entries[key] = _Entry(value, size, time.time() + ttl, tag, stat_prefix)
+            bucket.used_bytes += size
+            self._key_bucket[key] = bucket_name
+            return True
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+        return entry.value if entry is not None else default
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._key_bucket.keys())
+
+    def clear(self):
+        with self._lock:
+            for bucket in self._buckets.values():
+                bucket.entries.clear()
+                bucket.used_bytes = 0
+            self._key_bucket.clear()
+
+    def __len__(self) -> int:
+        return len(self._key_bucket)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_bucket
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """各分区用量与各前缀的命中统计"""
+        with self._lock:
+            buckets = {
+                name: {
+                    "entries": len(bucket.entries),
+                    "used_bytes": bucket.used_bytes,
+                    "max_bytes": bucket.max_bytes,
+                }
+                for name, bucket in self._buckets.items()
+            }
+            prefixes = {}
+            for prefix, counters in sorted(self._stats.items()):
+                lookups = counters["hits"] + counters["misses"]
+                prefixes[prefix] = {
+                    **counters,
+                    "hit_rate": f"{counters['hits'] / lookups * 100:.2f}%" if lookups else "N/A",
+                }
+            return {
+                "size": len(self._key_bucket),
+                "used_bytes": sum(bucket.used_bytes for bucket in self._buckets.values()),
+                "max_bytes": self.max_bytes,
+                "buckets": buckets,
+                "prefixes": prefixes,
+            }
+
@@ -3,13 +3,17 @@ In-process scheduler for recurring jobs.
 """
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.cache import warm_up_invalidated_keys
 from app.core.config import settings
 from app.core.database import SessionLocal, engine
 from app.services.facebook_ads_sync_service import FacebookAdsDataSyncService
 from app.services.google_ads_sync_service import GoogleAdsDataSyncService
+from app.services.partition_service import PartitionService
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
@@ -76,13 +80,73 @@ def _next_top_of_hour(now: datetime) -> datetime:
     return hour_start + timedelta(hours=1)
 
 
+def _skip_fresh_seconds(sync_mode: str) -> int:
+    """按同步类型决定跳过多久内已成功同步的日期（回补窗口较长，可跳过整点同步刚写入的日期）"""
+    if sync_mode == "backfill":
+        return settings.SYNC_STATE_BACKFILL_SKIP_FRESH_SECONDS
+    return settings.SYNC_STATE_HOURLY_SKIP_FRESH_SECONDS
+
+
+def _normalize_google_customers(raw_customers: str, fallback_customer: str) -> List[str]:
+    customers = _normalize_facebook_accounts(raw_customers, fallback_customer)
+    return list(dict.fromkeys(customer.replace("-", "") for customer in customers))
+
+
 def _run_google_ads_sync(start_date: str, end_date: str, sync_mode: str = "hourly") -> None:
-    customer_id = (settings.GOOGLE_ADS_CUSTOMER_ID or "").replace("-", "")
-    if not customer_id:
+    customer_ids = _normalize_google_customers(
+        settings.GOOGLE_ADS_SYNC_CUSTOMER_IDS,
+        settings.GOOGLE_ADS_CUSTOMER_ID or "",
+    )
+    if not customer_ids:
         logger.error("missing GOOGLE_ADS_CUSTOMER_ID; skip google sync")
         return
+    if len(customer_ids) > 1 and not settings.GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED:
+        # 未按客户限定范围时每个客户都会覆盖整个窗口，只能同步一个客户
+        logger.warning(
+            "GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED is off; syncing only customer %s of %d configured",
+            customer_ids[0], len(customer_ids),
+        )
+        customer_ids = customer_ids[:1]
 
     proxy_url: Optional[str] = settings.GOOGLE_ADS_PROXY_URL_EFFECTIVE or None
+    parallelism = max(1, min(settings.GOOGLE_ADS_SYNC_CUSTOMER_PARALLELISM, len(customer_ids)))
+    logger.info(
+        "google sync(%s) %d customers, parallelism=%d, window=%s -> %s",
+        sync_mode, len(customer_ids), parallelism, start_date, end_date,
+    )
+
+    started = time.time()
+    reports: List[Dict[str, Any]] = []
+    # 每个客户独立的服务实例和数据库会话，写入时按 customer_id 限定范围
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="google-customer-sync") as executor:
+        futures = [
+            executor.submit(_sync_google_customer, customer_id, start_date, end_date, sync_mode, proxy_url)
+            for customer_id in customer_ids
+        ]
+        for future in as_completed(futures):
+            reports.append(future.result())
+
+    failed = [report for report in reports if not report["success"]]
+    logger.info(
+        "google sync(%s) finished: %d/%d customers succeeded in %.1fs",
+        sync_mode, len(reports) - len(failed), len(reports), time.time() - started,
+    )
+    if failed:
+        logger.error(
+            "google sync(%s) failed customers: %s",
+            sync_mode, ", ".join(f"{report['customer_id']} ({report['message']})" for report in failed),
+        )
+
+
+def _sync_google_customer(
+    customer_id: str,
+    start_date: str,
+    end_date: str,
+    sync_mode: str,
+    proxy_url: Optional[str],
+) -> Dict[str, Any]:
+    """同步单个客户（独立会话，异常不影响其他客户），返回客户耗时和结果"""
+    started = time.time()
     db = SessionLocal()
     try:
         service = GoogleAdsDataSyncService(db)
@@ -94,16 +158,26 @@ def _run_google_ads_sync(start_date: str, end_date: str, sync_mode: str = "hourl
             clear_existing=True,
             use_concurrent=True,
             max_workers=settings.GOOGLE_ADS_MAX_WORKERS,
+            skip_fresh_seconds=_skip_fresh_seconds(sync_mode),
         )
+    except Exception as exc:
+        logger.exception("google sync(%s) customer=%s exception: %s", sync_mode, customer_id, exc)
+        result = {"success": False, "message": str(exc), "errors": []}
     finally:
         db.close()
 
     if result.get("success"):
-        logger.info("google sync(%s) success: %s", sync_mode, result.get("message"))
+        logger.info("google sync(%s) customer=%s success: %s", sync_mode, customer_id, result.get("message"))
     else:
-        logger.error("google sync(%s) failed: %s", sync_mode, result.get("message"))
+        logger.error("google sync(%s) customer=%s failed: %s", sync_mode, customer_id, result.get("message"))
         for err in result.get("errors", []):
-            logger.error("google sync error: %s", err)
+            logger.error("google sync error (customer=%s): %s", customer_id, err)
+    return {
+        "customer_id": customer_id,
+        "success": bool(result.get("success")),
+        "message": result.get("message"),
+        "seconds": time.time() - started,
+    }
 
 
 def _normalize_facebook_accounts(raw_accounts: str, fallback_account: str) -> List[str]:
@@ -136,29 +210,94 @@ def _run_facebook_ads_sync(start_date: str, end_date: str, sync_mode: str = "hou
         return
 
     proxy_url: Optional[str] = settings.FACEBOOK_PROXY_URL_EFFECTIVE or None
+    parallelism = max(1, min(settings.FACEBOOK_SYNC_ACCOUNT_PARALLELISM, len(account_ids)))
+    logger.info(
+        "facebook sync(%s) %d accounts, parallelism=%d, window=%s -> %s",
+        sync_mode, len(account_ids), parallelism, start_date, end_date,
+    )
+
+    started = time.time()
+    reports: List[Dict[str, Any]] = []
+    # 每个账户独立的服务实例和数据库会话；同一应用的限流通过共享的账户限速器传递
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="fb-account-sync") as executor:
+        futures = [
+            executor.submit(
+                _sync_facebook_account, access_token, ad_account_id, start_date, end_date, sync_mode, proxy_url
+            )
+            for ad_account_id in account_ids
+        ]
+        for future in as_completed(futures):
+            reports.append(future.result())
+
+    failed = [report for report in reports if not report["success"]]
+    logger.info(
+        "facebook sync(%s) finished: %d/%d accounts succeeded in %.1fs",
+        sync_mode, len(reports) - len(failed), len(reports), time.time() - started,
+    )
+    for report in sorted(reports, key=lambda item: item["seconds"], reverse=True):
+        logger.info(
+            "facebook sync(%s) account=%s %s in %.1fs",
+            sync_mode, report["account_id"], "ok" if report["success"] else "FAILED", report["seconds"],
+        )
+    if failed:
+        logger.error(
+            "facebook sync(%s) failed accounts: %s",
+            sync_mode, ", ".join(f"{report['account_id']} ({report['message']})" for report in failed),
+        )
+
+
+def _sync_facebook_account(
+    access_token: str,
+    ad_account_id: str,
+    start_date: str,
+    end_date: str,
+    sync_mode: str,
+    proxy_url: Optional[str],
+) -> Dict[str, Any]:
+    """同步单个账户（独立会话，异常不影响其他账户），返回账户耗时和结果"""
+    api_account_id, db_account_id = _normalize_facebook_account_id(ad_account_id)
+    logger.info("facebook sync(%s) account=%s window=%s -> %s", sync_mode, api_account_id, start_date, end_date)
+    started = time.time()
     db = SessionLocal()
     try:
         service = FacebookAdsDataSyncService(db, performance_profile=settings.FACEBOOK_DAILY_SYNC_PROFILE)
-        for ad_account_id in account_ids:
-            api_account_id, db_account_id = _normalize_facebook_account_id(ad_account_id)
-            logger.info("facebook sync(%s) account=%s window=%s -> %s", sync_mode, api_account_id, start_date, end_date)
-            result = service.sync_ads(
-                access_token=access_token,
-                ad_account_id=api_account_id,
-                start_date=start_date,
-                end_date=end_date,
-                account_id_for_db=db_account_id,
-                proxy_url=proxy_url,
-            )
-            if result.get("success"):
-                logger.info("facebook sync(%s) success: %s", sync_mode, result.get("message"))
-            else:
-                logger.error("facebook sync(%s) failed: %s", sync_mode, result.get("message"))
-                for err in result.get("errors", []):
-                    logger.error("facebook sync error: %s", err)
+        result = service.sync_ads(
+            access_token=access_token,
+            ad_account_id=api_account_id,
+            start_date=start_date,
+            end_date=end_date,
+            account_id_for_db=db_account_id,
+            proxy_url=proxy_url,
+            skip_fresh_seconds=_skip_fresh_seconds(sync_mode),
+            detect_changes=sync_mode == "hourly" and settings.FACEBOOK_HOURLY_CHANGE_DETECTION_ENABLED,
+        )
+    except Exception as exc:
+        logger.exception("facebook sync(%s) account=%s exception: %s", sync_mode, api_account_id, exc)
+        result = {"success": False, "message": str(exc), "errors": []}
     finally:
         db.close()
 
+    if result.get("success"):
+        logger.info("facebook sync(%s) account=%s success: %s", sync_mode, api_account_id, result.get("message"))
+    else:
+        logger.error("facebook sync(%s) account=%s failed: %s", sync_mode, api_account_id, result.get("message"))
+        for err in result.get("errors", []):
+            logger.error("facebook sync error (account=%s): %s", api_account_id, err)
+    return {
+        "account_id": api_account_id,
+        "success": bool(result.get("success")),
+        "message": result.get("message"),
+        "seconds": time.time() - started,
+    }
+
+
+async def _warm_up_cache() -> None:
+    """同步写入会失效重叠的缓存键，这里按访问热度重新计算，避免同步后的首个请求回源"""
+    try:
+        await warm_up_invalidated_keys()
+    except Exception as exc:
+        logger.warning("cache warm-up failed: %s", exc)
+
 
 async def _google_ads_daily_sync_loop() -> None:
     while True:
@@ -194,6 +333,7 @@ async def _google_ads_daily_sync_loop() -> None:
                 if (backfill_start, backfill_end) != (start_date, end_date):
                     logger.info("google daily backfill window: %s -> %s", backfill_start, backfill_end)
                     await asyncio.to_thread(_run_google_ads_sync, backfill_start, backfill_end, "backfill")
+            await _warm_up_cache()
         except asyncio.CancelledError:
             return
         except Exception as exc:
@@ -235,6 +375,7 @@ async def _facebook_ads_daily_sync_loop() -> None:
                 if (backfill_start, backfill_end) != (start_date, end_date):
                     logger.info("facebook daily backfill window: %s -> %s", backfill_start, backfill_end)
                     await asyncio.to_thread(_run_facebook_ads_sync, backfill_start, backfill_end, "backfill")
+            await _warm_up_cache()
         except asyncio.CancelledError:
             return
         except Exception as exc:
@@ -242,6 +383,52 @@ async def _facebook_ads_daily_sync_loop() -> None:
             await asyncio.sleep(60)
 
 
+def _run_partition_maintenance() -> None:
+    db = SessionLocal()
+    try:
+        report = PartitionService(db).run_maintenance()
+    finally:
+        db.close()
+    for table_name, changes in report.items():
+        logger.info(
+            "partition maintenance %s: created=%s dropped=%s",
+            table_name,
+            changes.get("created") or [],
+            changes.get("dropped") or [],
+        )
+
+
+async def _partition_maintenance_loop() -> None:
+    # 启动时先执行一次，确保当前及未来分区存在
+    try:
+        await asyncio.to_thread(_run_partition_maintenance)
+    except asyncio.CancelledError:
+        return
+    except Exception as exc:
+        logger.exception("partition maintenance exception: %s", exc)
+
+    while True:
+        now = datetime.now()
+        next_run = now.replace(
+            hour=_normalize_hour(settings.FACT_PARTITION_MAINTENANCE_HOUR), minute=30, second=0, microsecond=0
+        )
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        logger.info("next partition maintenance at %s", next_run.strftime("%Y-%m-%d %H:%M:%S"))
+        try:
+            await asyncio.sleep((next_run - now).total_seconds())
+            await asyncio.to_thread(_run_partition_maintenance)
+        except asyncio.CancelledError:
+            return
+        except Exception as exc:
+            logger.exception("partition maintenance exception: %s", exc)
+            await asyncio.sleep(60)
+
+
+def start_partition_maintenance_task() -> asyncio.Task:
+    return asyncio.create_task(_partition_maintenance_loop())
+
+
 def start_google_ads_daily_sync_task() -> asyncio.Task:
     return asyncio.create_task(_google_ads_daily_sync_loop())
 
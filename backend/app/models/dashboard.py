@@ -7,9 +7,9 @@ Dashboard数据模型
 - AdSetData 已移除，现在使用 get_adsets_performance_overview 直接查询
 - AdsPerformanceData 已移除，现在使用 get_ads_performance_overview 直接查询
 
-只保留原始数据表模型：FacebookAdsRaw 和 GoogleAdsCampaignRaw
+只保留原始数据表模型：FacebookAdsRaw 和 GoogleAdsCampaignRaw，以及广告创意维度表 DimAdCreative
 """
-from sqlalchemy import Column, Integer, String, DECIMAL
+from sqlalchemy import Column, DateTime, Integer, String, DECIMAL, Text
 from app.core.database import Base
 from sqlalchemy import Date
 
@@ -50,9 +50,8 @@ class FacebookAdsRaw(Base):
     adds_payment_info = Column(Integer, comment='添加支付信息')
     purchases = Column(Integer, comment='购物次数')
     
-    # 创意信息（新增）
-    image_url = Column(String(500), comment='广告图片URL')
-    preview_url = Column(String(65535), comment='广告预览HTML')
+    # 同步元数据
+    row_hash = Column(String(32), comment='数据列内容哈希（增量同步用）')
     
     def __repr__(self):
         return f"<FacebookAds(campaign_id={self.campaign_id}, adset_id={self.adset_id}, ad_id={self.ad_id}, date={self.createtime})>"
@@ -83,12 +82,31 @@ class FacebookAdsRaw(Base):
             'purchases': self.purchases or 0,
             'ctr': round(float(self.clicks or 0) / float(self.impression or 1) * 100, 2) if self.impression else 0,
             'cpm': round(float(self.spend or 0) / float(self.impression or 1) * 1000, 2) if self.impression else 0,
-            'roas': round(purchases_roas_value, 2),
-            'image_url': self.image_url,
-            'preview_url': self.preview_url
+            'roas': round(purchases_roas_value, 2)
         }
 
 
+class DimAdCreative(Base):
+    """
+    Facebook 广告创意维度表（每个广告一行）
+    映射到数据库表：dim_ad_creative
+    
+    主键：ad_id
+    图片URL和预览HTML从事实表移出，同步时按 content_hash 只在内容变化时写入
+    """
+    __tablename__ = "dim_ad_creative"
+    
+    ad_id = Column(String(255), primary_key=True, comment='广告ID')
+    account_id = Column(String(255), comment='广告账户ID')
+    image_url = Column(String(500), comment='广告图片URL')
+    preview_html = Column(Text, comment='广告预览HTML')
+    content_hash = Column(String(32), nullable=False, comment='图片URL+预览HTML 内容哈希')
+    updated_at = Column(DateTime, comment='内容更新时间')
+    
+    def __repr__(self):
+        return f"<DimAdCreative(ad_id={self.ad_id})>"
+
+
 class GoogleAdsCampaignRaw(Base):
     """
     Google Ads Campaign 原始数据表
@@ -104,6 +122,9 @@ class GoogleAdsCampaignRaw(Base):
     campaign_id = Column(String(255), primary_key=True, comment='广告系列ID')
     createtime = Column(Date, primary_key=True, comment='日期')
     
+    # 账户信息
+    customer_id = Column(String(32), comment='Google Ads 客户ID')
+    
     # 广告系列信息
     campaign = Column(String(255), comment='广告系列')
     
@@ -116,6 +137,9 @@ class GoogleAdsCampaignRaw(Base):
     conversions = Column(DECIMAL(10, 2), comment='转化次数')
     conversion_value = Column(DECIMAL(10, 2), comment='转化价值')
     
+    # 同步元数据
+    row_hash = Column(String(32), comment='数据列内容哈希（增量同步用）')
+    
     def __repr__(self):
         return f"<GoogleAdsCampaign(campaign_id={self.campaign_id}, campaign={self.campaign}, date={self.createtime})>"
     
@@ -56,7 +56,7 @@ class FacebookAdsetsPerformanceOverviewRequest(FacebookDateRangeWithAccountReque
 
 class FacebookAdsDetailPerformanceOverviewRequest(FacebookDateRangeWithAccountRequest):
     """Facebook Ads Detail Performance Overview 请求"""
-    pass
+    includePreview: bool = Field(True, description="是否返回广告图片和预览HTML")
 
 
 class FacebookAdsPerformanceOverviewRequest(SingleDateRequest):
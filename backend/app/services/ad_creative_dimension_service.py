@@ -0,0 +1,130 @@
+"""
+Facebook 广告创意维度表维护服务
+每个广告一行（图片 URL + 预览 HTML），同步时按内容哈希比对，只写入新增或变化的创意
+"""
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger("app.services.ad_creative_dimension_service")
+
+AD_CREATIVE_TABLE = "dim_ad_creative"
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def creative_content_hash(image_url: Optional[str], preview_html: Optional[str]) -> str:
+    """创意内容哈希（与迁移脚本中的 MD5(CONCAT_WS(CHAR(31), ...)) 一致）"""
+    return hashlib.md5(f"{image_url or ''}\x1f{preview_html or ''}".encode("utf-8")).hexdigest()
+
+
+class AdCreativeDimensionService:
+    """广告创意维度表维护服务"""
+
+    def __init__(self, db: Session):
+        """
+        初始化服务
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    def load_hashes(self, ad_ids, batch_size: int = 1000) -> Dict[str, Tuple[str, Optional[str]]]:
+        """读取广告的现有内容哈希和图片URL（只拿到图片时按图片URL比对）"""
+        query = text(
+            f"SELECT ad_id, content_hash, image_url FROM {AD_CREATIVE_TABLE} WHERE ad_id IN :ad_ids"
+        ).bindparams(bindparam("ad_ids", expanding=True))
+        ad_ids = list(ad_ids)
+        hashes = {}
+        for i in range(0, len(ad_ids), batch_size):
+            for ad_id, content_hash, image_url in self.db.execute(query, {"ad_ids": ad_ids[i:i + batch_size]}):
+                hashes[str(ad_id)] = (content_hash, image_url)
+        return hashes
+
+    def upsert(
+        self,
+        creatives: Dict[str, Tuple[Optional[str], Optional[str]]],
+        account_id: str = None,
+        batch_size: int = 500
+    ) -> Dict[str, int]:
+        """
+        写入新增或内容变化的创意（图片和预览都为空的条目跳过，不覆盖已有内容）
+
+        Args:
+            creatives: {ad_id: (图片URL, 预览HTML)}
+            account_id: 广告账户ID
+            batch_size: 每批写入条数（预览 HTML 较大，批次不宜过大）
+
+        Returns:
+            {"checked", "written", "unchanged"} 统计
+        """
+        candidates = {
+            ad_id: (image_url, preview_html)
+            for ad_id, (image_url, preview_html) in creatives.items()
+            if image_url or preview_html
+        }
+        stats = {"checked": len(candidates), "written": 0, "unchanged": 0}
+        if not candidates:
+            return stats
+
+        existing = self.load_hashes(candidates.keys())
+        rows = []
+        for ad_id, (image_url, preview_html) in candidates.items():
+            content_hash = creative_content_hash(image_url, preview_html)
+            existing_hash, existing_image_url = existing.get(ad_id, (None, None))
+            # 只拿到图片（未启用预览）时保留已有预览，图片未变即视为未变化
+            if existing_hash == content_hash or (
+                existing_hash is not None and preview_html is None and existing_image_url == image_url
+            ):
+                stats["unchanged"] += 1
+                continue
+            rows.append({
+                "ad_id": ad_id,
+                "account_id": account_id,
+                "image_url": image_url,
+                "preview_html": preview_html,
+                "content_hash": content_hash,
+            })
+
+        if rows:
+            # 只拿到部分内容（如未启用预览）时保留已有的另一部分，哈希按合并后的内容计算
+            upsert_query = text(f"""
+                INSERT INTO {AD_CREATIVE_TABLE} (ad_id, account_id, image_url, preview_html, content_hash)
+                VALUES (:ad_id, :account_id, :image_url, :preview_html, :content_hash)
+                ON DUPLICATE KEY UPDATE
+                    content_hash = MD5(CONCAT_WS(
+                        CHAR(31),
+                        IFNULL(IFNULL(VALUES(image_url), image_url), ''),
+                        IFNULL(IFNULL(VALUES(preview_html), preview_html), '')
+                    )),
+                    account_id = IFNULL(VALUES(account_id), account_id),
+                    image_url = IFNULL(VALUES(image_url), image_url),
+                    preview_html = IFNULL(VALUES(preview_html), preview_html)
+            """)
+            try:
+                for i in range(0, len(rows), batch_size):
+                    self.db.execute(upsert_query, rows[i:i + batch_size])
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            stats["written"] = len(rows)
+
+        _log_print(f"🎨 创意维度表: 检查 {stats['checked']} | 写入 {stats['written']} | 未变化 {stats['unchanged']}")
+        return stats
@@ -1,12 +1,17 @@
 """
 基础Dashboard服务类
 """
+import asyncio
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from fastapi.concurrency import run_in_threadpool
 
+from app.core.cache import in_background_refresh
+from app.core.database import async_engine, SessionLocal
+
 from app.utils.helpers import calc_change, aggregate_data, calculate_averages
 from app.utils.chart_helpers import generate_chart_data
 
@@ -14,7 +19,7 @@ from app.utils.chart_helpers import generate_chart_data
 class BaseDashboardService:
     """Dashboard服务基类 - 提供通用数据处理方法"""
     
-    def __init__(self, db: Session, platform: str):
+    def __init__(self, db: Union[AsyncSession, Session], platform: str):
         self.db = db
         self.PLATFORM = platform
     
@@ -29,12 +34,58 @@ class BaseDashboardService:
         Returns:
             查询结果列表
         """
+        if in_background_refresh():
+            # 缓存后台刷新时请求已结束，不能复用请求作用域的会话
+            return await self._execute_detached(query, params)
+        
+        if isinstance(self.db, AsyncSession):
+            result = await self.db.execute(query, params)
+            return result.fetchall()
+        
+        # 兼容同步Session（脚本/同步任务中使用）
         def _run():
             result = self.db.execute(query, params)
             return result.fetchall()
         
         return await run_in_threadpool(_run)
     
+    async def _execute_detached(self, query: text, params: Dict[str, Any]) -> List[Any]:
+        """在独立连接上执行查询（不使用 self.db）"""
+        if isinstance(self.db, AsyncSession):
+            async with async_engine.connect() as conn:
+                result = await conn.execute(query, params)
+                return result.fetchall()
+        
+        def _run():
+            db = SessionLocal()
+            try:
+                return db.execute(query, params).fetchall()
+            finally:
+                db.close()
+        
+        return await run_in_threadpool(_run)
+    
+    async def execute_queries_parallel(self, *queries: Tuple[text, Dict[str, Any]]) -> List[List[Any]]:
+        """
+        并行执行多条独立查询（如指标卡的当前期和对比期），每条查询使用独立的连接
+        
+        Args:
+            queries: (SQL查询对象, 查询参数) 元组
+            
+        Returns:
+            与输入顺序一致的查询结果列表
+        """
+        if len(queries) <= 1 or not isinstance(self.db, AsyncSession):
+            # 同一个会话不能并发执行，退化为顺序执行
+            return [await self.execute_query(query, params) for query, params in queries]
+        
+        async def _run_on_own_connection(query: text, params: Dict[str, Any]) -> List[Any]:
+            async with async_engine.connect() as conn:
+                result = await conn.execute(query, params)
+                return result.fetchall()
+        
+        return list(await asyncio.gather(*(_run_on_own_connection(q, p) for q, p in queries)))
+    
     def process_comparison_data(
         self,
         current_data: List[Dict[str, Any]],
@@ -2,11 +2,19 @@
 基础数据同步服务类
 提供通用的数据同步逻辑
 """
+import hashlib
 import logging
+import time
+import uuid
 from typing import List, Tuple, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.core.config import settings
+from app.core.events import publish_data_changed
+from app.services.partition_service import PartitionService
+from app.services.sync_state_service import DayChecksum, SyncStateService, date_range, to_segments
+
 logger = logging.getLogger("app.services.base_sync_service")
 ALLOWED_SYNC_TABLES = frozenset(
     {
@@ -14,6 +22,8 @@ ALLOWED_SYNC_TABLES = frozenset(
         "fact_bi_ads_facebook_campaign",
     }
 )
+SYNC_WRITE_MODES = frozenset({"replace", "upsert", "staging"})
+ROW_HASH_COLUMN = "row_hash"
 
 
 def _log_print(*args, **kwargs) -> None:
@@ -33,6 +43,11 @@ def _log_print(*args, **kwargs) -> None:
 
 class BaseSyncService:
     """数据同步服务基类"""
+
+    # 子类需声明：主键列（不含 createtime 以外的范围列时也要包含 createtime）与数据列
+    KEY_COLUMNS: Tuple[str, ...] = ()
+    DATA_COLUMNS: Tuple[str, ...] = ()
+    PLATFORM: str = ""  # 数据变更事件中的平台名
     
     def __init__(self, db: Session, table_name: str):
         """
@@ -46,6 +61,9 @@ class BaseSyncService:
             raise ValueError(f"不允许的同步表名: {table_name}")
         self.db = db
         self.table_name = table_name
+        self.last_write_stats: Dict[str, Any] = {}  # 最近一次写入的统计（行数、耗时等）
+        self.day_checksum: Optional[DayChecksum] = None  # 当前同步区间按天累计的行数和校验和
+        self.day_fingerprints: Dict[str, str] = {}  # 本次同步读取到的上游每天汇总指纹（变化检测用）
     
     def delete_data_in_range(self, start_date: str, end_date: str) -> None:
         """
@@ -55,10 +73,23 @@ class BaseSyncService:
             start_date: 开始日期
             end_date: 结束日期
         """
-        delete_query = text(f"DELETE FROM {self.table_name} WHERE createtime BETWEEN :start_date AND :end_date")
+        delete_query = text(
+            f"DELETE FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+            f"WHERE createtime BETWEEN :start_date AND :end_date"
+        )
         self.db.execute(delete_query, {"start_date": start_date, "end_date": end_date})
         _log_print(f"🗑️  已删除日期范围 {start_date} 到 {end_date} 的数据")
     
+    def partition_selection(self, start_date: str, end_date: str) -> str:
+        """
+        生成显式分区选择子句（表未分区时返回空字符串）
+
+        Returns:
+            例如 " PARTITION (p202601, p202602)"，直接拼接在表名之后
+        """
+        partitions = PartitionService(self.db).partitions_for_range(self.table_name, start_date, end_date)
+        return f" PARTITION ({', '.join(partitions)})" if partitions else ""
+    
     def batch_insert(
         self, 
         insert_query: text, 
@@ -96,6 +127,505 @@ class BaseSyncService:
         _log_print(f"✅ 成功插入 {inserted_count} 条数据")
         return inserted_count
     
+    # ==================== 写入模式（replace / upsert / staging） ====================
+
+    @property
+    def write_mode(self) -> str:
+        """当前写入模式（配置非法时回退 replace）"""
+        mode = (settings.SYNC_WRITE_MODE or "replace").strip().lower()
+        return mode if mode in SYNC_WRITE_MODES else "replace"
+
+    @property
+    def _all_columns(self) -> Tuple[str, ...]:
+        """写入的列（replace 模式不写 row_hash，未执行迁移脚本的表也能同步）"""
+        columns = self.KEY_COLUMNS + self.DATA_COLUMNS
+        if self.write_mode == "replace":
+            return columns
+        return columns + (ROW_HASH_COLUMN,)
+
+    @property
+    def _update_columns(self) -> Tuple[str, ...]:
+        """按主键覆盖写入时更新的列（写入列去掉主键列）"""
+        return tuple(col for col in self._all_columns if col not in self.KEY_COLUMNS)
+
+    def _build_insert_query(self, upsert: bool = False) -> text:
+        """根据列定义生成插入语句（upsert=True 时追加 ON DUPLICATE KEY UPDATE）"""
+        columns = self._all_columns
+        sql = (
+            f"INSERT INTO {self.table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f':{col}' for col in columns)})"
+        )
+        if upsert:
+            updates = ", ".join(f"{col} = VALUES({col})" for col in self._update_columns)
+            sql += f" ON DUPLICATE KEY UPDATE {updates}"
+        return text(sql)
+
+    def _scope_clause(self, scope: Optional[Dict[str, Any]], alias: str = "") -> str:
+        """生成同步窗口的过滤条件（日期范围 + 账户等附加范围列）"""
+        prefix = f"{alias}." if alias else ""
+        clause = f"{prefix}createtime BETWEEN :start_date AND :end_date"
+        for column in (scope or {}):
+            clause += f" AND {prefix}{column} = :{column}"
+        return clause
+
+    def compute_row_hash(self, row: Dict[str, Any]) -> str:
+        """计算数据列的内容哈希（用于跳过未变化的行）"""
+        parts = []
+        for column in self.DATA_COLUMNS:
+            value = row.get(column)
+            if value is None:
+                parts.append("")
+            elif isinstance(value, float):
+                parts.append(f"{value:.6f}")
+            else:
+                parts.append(str(value))
+        return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _row_key(self, row: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(row.get(column)) for column in self.KEY_COLUMNS)
+
+    def _classify_rows(
+        self,
+        data_dicts: List[Dict[str, Any]],
+        existing: Dict[Tuple[str, ...], Optional[str]],
+        seen_keys: Optional[set],
+        stats: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        """计算内容哈希并与现有行比对，返回新增/变化的行（同时累加统计，seen_keys 不为 None 时记录已见主键）"""
+        changed_rows = []
+        for row in data_dicts:
+            row[ROW_HASH_COLUMN] = self.compute_row_hash(row)
+            key = self._row_key(row)
+            if seen_keys is not None:
+                seen_keys.add(key)
+            if key not in existing:
+                stats["inserted"] += 1
+                changed_rows.append(row)
+            elif existing[key] != row[ROW_HASH_COLUMN]:
+                stats["updated"] += 1
+                changed_rows.append(row)
+            else:
+                stats["unchanged"] += 1
+        return changed_rows
+
+    def load_existing_hashes(
+        self,
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None
+    ) -> Dict[Tuple[str, ...], Optional[str]]:
+        """读取同步窗口内现有行的主键与内容哈希"""
+        query = text(
+            f"SELECT {', '.join(self.KEY_COLUMNS)}, {ROW_HASH_COLUMN} "
+            f"FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+            f"WHERE {self._scope_clause(scope)}"
+        )
+        params = {"start_date": start_date, "end_date": end_date, **(scope or {})}
+        existing = {}
+        for row in self.db.execute(query, params):
+            values = tuple(row)
+            existing[tuple(str(value) for value in values[:-1])] = values[-1]
+        return existing
+
+    def load_hashes_for_rows(
+        self,
+        data_dicts: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str
+    ) -> Dict[Tuple[str, ...], Optional[str]]:
+        """按主键读取一批行在表中的现有内容哈希（只查询这批主键，不读取整个窗口）"""
+        if not data_dicts:
+            return {}
+        params = {}
+        tuples = []
+        for i, row in enumerate(data_dicts):
+            names = []
+            for j, column in enumerate(self.KEY_COLUMNS):
+                params[f"k{i}_{j}"] = row.get(column)
+                names.append(f":k{i}_{j}")
+            tuples.append(f"({', '.join(names)})")
+        key_list = ", ".join(self.KEY_COLUMNS)
+        query = text(
+            f"SELECT {key_list}, {ROW_HASH_COLUMN} "
+            f"FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+            f"WHERE ({key_list}) IN ({', '.join(tuples)})"
+        )
+        existing = {}
+        for row in self.db.execute(query, params):
+            values = tuple(row)
+            existing[tuple(str(value) for value in values[:-1])] = values[-1]
+        return existing
+
+    def create_key_table(self, temporary: bool = True) -> str:
+        """
+        创建只含主键列的空表，返回表名
+
+        主键在建表语句内声明：CREATE TEMPORARY TABLE 不会隐式提交（ALTER TABLE 会）；
+        temporary=False 时创建普通表，可跨提交使用，但建表本身会隐式提交
+        """
+        prefix = "tmp_sync_keys" if temporary else f"{self.table_name}__keys"
+        key_table = f"{prefix}_{uuid.uuid4().hex[:12]}"
+        key_list = ", ".join(self.KEY_COLUMNS)
+        self.db.execute(text(
+            f"CREATE {'TEMPORARY ' if temporary else ''}TABLE {key_table} (PRIMARY KEY ({key_list})) "
+            f"SELECT {key_list} FROM {self.table_name} WHERE 1 = 0"
+        ))
+        return key_table
+
+    def insert_keys(self, key_table: str, data_dicts: List[Dict[str, Any]], batch_size: int = 1000) -> None:
+        """把行的主键写入主键表（重复主键忽略）"""
+        key_list = ", ".join(self.KEY_COLUMNS)
+        insert_keys = text(
+            f"INSERT IGNORE INTO {key_table} ({key_list}) "
+            f"VALUES ({', '.join(f':{col}' for col in self.KEY_COLUMNS)})"
+        )
+        keys = [{col: row.get(col) for col in self.KEY_COLUMNS} for row in data_dicts]
+        for i in range(0, len(keys), batch_size):
+            self.db.execute(insert_keys, keys[i:i + batch_size])
+
+    def delete_rows_missing_from(
+        self,
+        key_table: str,
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """删除同步窗口内主键不在主键表中的行（一次反连接删除），返回删除的行数"""
+        join_condition = " AND ".join(f"t.{col} = k.{col}" for col in self.KEY_COLUMNS)
+        result = self.db.execute(
+            text(
+                f"DELETE t FROM {self.table_name}{self.partition_selection(start_date, end_date)} t "
+                f"LEFT JOIN {key_table} k ON {join_condition} "
+                f"WHERE {self._scope_clause(scope, alias='t')} AND k.{self.KEY_COLUMNS[0]} IS NULL"
+            ),
+            {"start_date": start_date, "end_date": end_date, **(scope or {})},
+        )
+        return result.rowcount or 0
+
+    def delete_missing_rows(
+        self,
+        keys: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        删除同步窗口内上游已不存在的行（临时表 + 一次反连接删除）
+
+        Args:
+            keys: 本次同步到的全部主键
+            start_date: 开始日期
+            end_date: 结束日期
+            scope: 附加范围列（如 account_id）
+            batch_size: 主键写入临时表的批次大小
+
+        Returns:
+            删除的行数
+        """
+        temp_table = self.create_key_table(temporary=True)
+        try:
+            self.insert_keys(temp_table, keys, batch_size)
+            return self.delete_rows_missing_from(temp_table, start_date, end_date, scope)
+        finally:
+            self.db.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {temp_table}"))
+
+    def upsert_rows(
+        self,
+        data_dicts: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True,
+        batch_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        增量写入：按内容哈希跳过未变化的行，ON DUPLICATE KEY UPDATE 写入新增/变化行，
+        并用一次反连接删除窗口内上游已消失的行。全部操作在同一事务内提交。
+
+        Args:
+            data_dicts: 数据字典列表（需包含 KEY_COLUMNS 与 DATA_COLUMNS）
+            start_date: 开始日期
+            end_date: 结束日期
+            scope: 附加范围列（如 {"account_id": "123"}）
+            delete_missing: 是否删除窗口内上游已不存在的行
+            batch_size: 每批写入的记录数
+
+        Returns:
+            {"inserted", "updated", "unchanged", "deleted"} 统计
+        """
+        existing = self.load_existing_hashes(start_date, end_date, scope)
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        seen_keys = set()
+        changed_rows = self._classify_rows(data_dicts, existing, seen_keys, stats)
+
+        try:
+            upsert_query = self._build_insert_query(upsert=True)
+            for i in range(0, len(changed_rows), batch_size):
+                self.db.execute(upsert_query, changed_rows[i:i + batch_size])
+
+            if delete_missing and any(key not in seen_keys for key in existing):
+                keys = [{col: row.get(col) for col in self.KEY_COLUMNS} for row in data_dicts]
+                stats["deleted"] = self.delete_missing_rows(keys, start_date, end_date, scope, batch_size)
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        _log_print(
+            f"✅ 增量写入完成: 新增 {stats['inserted']} | 更新 {stats['updated']} | "
+            f"未变化 {stats['unchanged']} | 删除 {stats['deleted']}"
+        )
+        return stats
+
+    def _swap_from_staging(
+        self,
+        staging_table: str,
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True
+    ) -> float:
+        """在一个短事务内用暂存表替换目标窗口，返回替换耗时（秒）"""
+        columns = ", ".join(self._all_columns)
+        params = {"start_date": start_date, "end_date": end_date, **(scope or {})}
+        swap_start = time.time()
+        try:
+            if delete_missing:
+                self.db.execute(
+                    text(
+                        f"DELETE FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+                        f"WHERE {self._scope_clause(scope)}"
+                    ),
+                    params,
+                )
+                self.db.execute(text(
+                    f"INSERT INTO {self.table_name} ({columns}) SELECT {columns} FROM {staging_table}"
+                ))
+            else:
+                updates = ", ".join(f"{col} = VALUES({col})" for col in self._update_columns)
+                self.db.execute(text(
+                    f"INSERT INTO {self.table_name} ({columns}) SELECT {columns} FROM {staging_table} "
+                    f"ON DUPLICATE KEY UPDATE {updates}"
+                ))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return time.time() - swap_start
+
+    def staging_swap_rows(
+        self,
+        data_dicts: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True,
+        batch_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        暂存表写入：先把全部数据批量装载到本次运行专属的暂存表（只在装载结束时提交一次），
+        再在一个短事务内用暂存表替换目标窗口，读者只会看到替换前或替换后的完整快照。
+
+        Args:
+            data_dicts: 数据字典列表
+            start_date: 开始日期
+            end_date: 结束日期
+            scope: 附加范围列（如 {"account_id": "123"}）
+            delete_missing: 是否先清空目标窗口（False 时按主键覆盖写入）
+            batch_size: 每条多行 INSERT 的记录数
+
+        Returns:
+            {"rows", "load_seconds", "swap_seconds"} 统计
+        """
+        staging_table = f"{self.table_name}__stg_{uuid.uuid4().hex[:8]}"
+        columns = ", ".join(self._all_columns)
+
+        # CREATE TABLE 会隐式提交，放在装载和替换之前执行
+        self.db.execute(text(f"CREATE TABLE {staging_table} LIKE {self.table_name}"))
+        try:
+            load_start = time.time()
+            insert_staging = text(
+                f"INSERT INTO {staging_table} ({columns}) "
+                f"VALUES ({', '.join(f':{col}' for col in self._all_columns)})"
+            )
+            for row in data_dicts:
+                row[ROW_HASH_COLUMN] = self.compute_row_hash(row)
+            # executemany 会被驱动改写为多行 INSERT，整个装载只提交一次
+            for i in range(0, len(data_dicts), batch_size):
+                self.db.execute(insert_staging, data_dicts[i:i + batch_size])
+            self.db.commit()
+            load_seconds = time.time() - load_start
+
+            swap_seconds = self._swap_from_staging(staging_table, start_date, end_date, scope, delete_missing)
+        finally:
+            self.db.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+
+        stats = {"rows": len(data_dicts), "load_seconds": round(load_seconds, 3), "swap_seconds": round(swap_seconds, 3)}
+        _log_print(
+            f"✅ 暂存表写入完成: {stats['rows']} 条 | 装载 {stats['load_seconds']:.2f} 秒 | "
+            f"替换 {stats['swap_seconds']:.2f} 秒"
+        )
+        return stats
+
+    def write_rows(
+        self,
+        data_dicts: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        按配置的写入模式写入同步窗口的数据
+
+        - replace: 先删除窗口数据再批量插入（旧行为）
+        - upsert: 按内容哈希增量写入，见 upsert_rows
+        - staging: 暂存表装载后单事务替换，见 staging_swap_rows
+
+        Args:
+            data_dicts: 数据字典列表
+            start_date: 开始日期
+            end_date: 结束日期
+            scope: 附加范围列（如 {"account_id": "123"}），键名需与 delete_data_in_range 的参数一致
+            delete_missing: replace 模式下是否先清空窗口；upsert 模式下是否删除已消失的行
+            batch_size: 每批写入的记录数
+
+        Returns:
+            写入后窗口内与上游一致的记录数
+        """
+        mode = self.write_mode
+        if mode == "upsert":
+            stats = self.upsert_rows(data_dicts, start_date, end_date, scope, delete_missing, batch_size)
+            self.last_write_stats = {"mode": mode, **stats}
+            return len(data_dicts)
+        if mode == "staging":
+            stats = self.staging_swap_rows(data_dicts, start_date, end_date, scope, delete_missing, batch_size)
+            self.last_write_stats = {"mode": mode, **stats}
+            return len(data_dicts)
+
+        write_start = time.time()
+        if delete_missing:
+            self.delete_data_in_range(start_date, end_date, **(scope or {}))
+        for row in data_dicts:
+            row[ROW_HASH_COLUMN] = self.compute_row_hash(row)
+        count = self.batch_insert(self._build_insert_query(), data_dicts, batch_size=batch_size)
+        if not count:
+            # 上游窗口为空时 batch_insert 不会提交，单独提交窗口删除
+            self.db.commit()
+        self.last_write_stats = {"mode": mode, "rows": count, "write_seconds": round(time.time() - write_start, 3)}
+        return count
+    
+    def open_window_writer(
+        self,
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True,
+        batch_size: int = 1000
+    ) -> "StreamingWindowWriter":
+        """
+        打开同步窗口的流式写入器（数据分批到达时使用，写入模式与 write_rows 一致）
+
+        用法: writer.write(batch) 若干次后 writer.finish()；出错时 writer.abort()
+        """
+        return StreamingWindowWriter(self, start_date, end_date, scope, delete_missing, batch_size)
+    
+    def row_digest(self, row: Dict[str, Any]) -> str:
+        """行摘要（主键 + 内容哈希），用于按天汇总校验和"""
+        parts = self._row_key(row) + (row.get(ROW_HASH_COLUMN) or self.compute_row_hash(row),)
+        return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def track_written_rows(self, data_dicts: List[Dict[str, Any]]) -> None:
+        """把已写入（或确认与上游一致）的行计入当前同步区间的按天校验和"""
+        if self.day_checksum is None:
+            return
+        for row in data_dicts:
+            self.day_checksum.add(str(row["createtime"])[:10], self.row_digest(row))
+
+    def plan_sync_segments(
+        self,
+        account_id: Optional[str],
+        start_date: str,
+        end_date: str,
+        skip_fresh_seconds: int = 0
+    ) -> List[Tuple[str, str]]:
+        """
+        按同步状态规划本次同步的连续日期区间（失败或中断的日期优先，其余按日期升序）
+
+        未启用同步状态或读取失败时返回完整窗口
+        """
+        if not settings.SYNC_STATE_ENABLED:
+            return [(start_date, end_date)]
+        try:
+            retry_days, pending_days, skipped_days = SyncStateService(self.db).plan(
+                self.PLATFORM, account_id, start_date, end_date, skip_fresh_seconds
+            )
+        except Exception as e:
+            self.db.rollback()
+            _log_print(f"⚠️ 读取同步状态失败，按完整窗口同步: {e}")
+            return [(start_date, end_date)]
+        segments = to_segments(retry_days) + to_segments(pending_days)
+        _log_print(
+            f"📋 同步计划: 优先重试 {len(retry_days)} 天 | 待同步 {len(pending_days)} 天 | "
+            f"跳过近期已同步 {len(skipped_days)} 天 | {len(segments)} 个连续区间"
+        )
+        return segments
+
+    def begin_sync_segment(self, account_id: Optional[str], start_date: str, end_date: str) -> None:
+        """开始同步一个区间：标记为 running 并重置按天校验和"""
+        if not settings.SYNC_STATE_ENABLED:
+            return
+        self.day_checksum = DayChecksum()
+        try:
+            SyncStateService(self.db).mark_running(self.PLATFORM, account_id, date_range(start_date, end_date))
+        except Exception as e:
+            self.db.rollback()
+            _log_print(f"⚠️ 写入同步状态失败: {e}")
+
+    def finish_sync_segment(
+        self,
+        account_id: Optional[str],
+        start_date: str,
+        end_date: str,
+        failed_days: Optional[set] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """结束同步一个区间：成功的日期记录行数和校验和，failed_days 中的日期记录为失败"""
+        if not settings.SYNC_STATE_ENABLED:
+            return
+        failed_days = failed_days or set()
+        days = date_range(start_date, end_date)
+        checksum = self.day_checksum or DayChecksum()
+        self.day_checksum = None
+        try:
+            state = SyncStateService(self.db)
+            state.mark_success(
+                self.PLATFORM, account_id,
+                checksum.result(d for d in days if d not in failed_days),
+                self.day_fingerprints,
+            )
+            state.mark_failed(self.PLATFORM, account_id, [d for d in days if d in failed_days], error)
+        except Exception as e:
+            self.db.rollback()
+            _log_print(f"⚠️ 写入同步状态失败: {e}")
+
+    def notify_data_changed(self, start_date: str, end_date: str, account_id: str = None) -> None:
+        """
+        发布同步窗口的数据变更事件（缓存据此失效重叠的键）
+        
+        upsert 模式下窗口内没有任何新增、更新或删除时不发布
+        """
+        stats = self.last_write_stats or {}
+        if stats.get("mode") == "upsert" and not (
+            stats.get("inserted") or stats.get("updated") or stats.get("deleted")
+        ):
+            _log_print(f"ℹ️ {start_date} 到 {end_date} 数据无变化，跳过缓存失效")
+            return
+        publish_data_changed(self.PLATFORM, start_date, end_date, account_id)
+    
     def create_sync_result(
         self, 
         success: bool, 
@@ -115,9 +645,142 @@ class BaseSyncService:
         Returns:
             同步结果字典
         """
-        return {
+        result = {
             "success": success,
             "message": message,
             "records_synced": records_synced,
             "errors": errors or []
         }
+        if success and self.last_write_stats:
+            result["write_stats"] = dict(self.last_write_stats)
+        return result
+
+
+
+class StreamingWindowWriter:
+    """
+    同步窗口的流式写入器：数据按批写入，窗口级操作在 finish 时完成，内存中只保留当前批次
+
+    - replace / staging: 每批装载到暂存表，finish 时单事务替换目标窗口，读者不会看到写到一半的窗口
+    - upsert: 每批按主键读取这批行的现有哈希，只写入新增/变化行并提交，已见主键写入主键表；
+      finish 时与主键表反连接删除上游已消失的行
+    """
+
+    def __init__(
+        self,
+        service: BaseSyncService,
+        start_date: str,
+        end_date: str,
+        scope: Optional[Dict[str, Any]] = None,
+        delete_missing: bool = True,
+        batch_size: int = 1000
+    ):
+        self.service = service
+        self.db = service.db
+        self.mode = service.write_mode
+        self.start_date = start_date
+        self.end_date = end_date
+        self.scope = scope
+        self.delete_missing = delete_missing
+        self.batch_size = batch_size
+        self.rows = 0
+        self.stats = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        self._started = time.time()
+        self._staging_table: Optional[str] = None
+        self._keys_table: Optional[str] = None
+
+        if self.mode == "upsert":
+            if delete_missing:
+                # 已见主键放在数据库里（普通表可跨批次提交使用，建表的隐式提交发生在写入之前）
+                self._keys_table = service.create_key_table(temporary=False)
+            self._insert_query = service._build_insert_query(upsert=True)
+        else:
+            self._staging_table = f"{service.table_name}__stg_{uuid.uuid4().hex[:8]}"
+            # CREATE TABLE 会隐式提交，放在装载之前执行
+            self.db.execute(text(f"CREATE TABLE {self._staging_table} LIKE {service.table_name}"))
+            columns = service._all_columns
+            self._insert_query = text(
+                f"INSERT INTO {self._staging_table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(f':{col}' for col in columns)})"
+            )
+
+    def write(self, data_dicts: List[Dict[str, Any]]) -> None:
+        """写入一批数据"""
+        if not data_dicts:
+            return
+        service = self.service
+        if self.mode == "upsert":
+            rows = []
+            for i in range(0, len(data_dicts), self.batch_size):
+                batch = data_dicts[i:i + self.batch_size]
+                existing = service.load_hashes_for_rows(batch, self.start_date, self.end_date)
+                rows.extend(service._classify_rows(batch, existing, None, self.stats))
+            if self._keys_table:
+                service.insert_keys(self._keys_table, data_dicts, self.batch_size)
+        else:
+            for row in data_dicts:
+                row[ROW_HASH_COLUMN] = service.compute_row_hash(row)
+            rows = data_dicts
+
+        for i in range(0, len(rows), self.batch_size):
+            self.db.execute(self._insert_query, rows[i:i + self.batch_size])
+        # 暂存表的装载只在 finish 时提交一次
+        if self.mode == "upsert":
+            self.db.commit()
+        self.rows += len(data_dicts)
+        _log_print(f"⏳ 流式写入进度: {self.rows} 条")
+
+    def finish(self) -> int:
+        """完成窗口写入（删除已消失的行 / 暂存表替换），返回写入的记录数"""
+        service = self.service
+        if self.mode == "upsert":
+            try:
+                if self._keys_table:
+                    self.stats["deleted"] = service.delete_rows_missing_from(
+                        self._keys_table, self.start_date, self.end_date, self.scope
+                    )
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            finally:
+                self._drop_tables()
+            service.last_write_stats = {"mode": self.mode, **self.stats}
+            _log_print(
+                f"✅ 流式增量写入完成: 新增 {self.stats['inserted']} | 更新 {self.stats['updated']} | "
+                f"未变化 {self.stats['unchanged']} | 删除 {self.stats['deleted']}"
+            )
+        else:
+            try:
+                self.db.commit()
+                load_seconds = time.time() - self._started
+                swap_seconds = service._swap_from_staging(
+                    self._staging_table, self.start_date, self.end_date, self.scope, self.delete_missing
+                )
+            finally:
+                self._drop_tables()
+            service.last_write_stats = {
+                "mode": self.mode,
+                "rows": self.rows,
+                "load_seconds": round(load_seconds, 3),
+                "swap_seconds": round(swap_seconds, 3),
+            }
+            _log_print(f"✅ 流式暂存表写入完成: {self.rows} 条 | 替换 {swap_seconds:.2f} 秒")
+        return self.rows
+
+    def abort(self) -> None:
+        """
+        放弃写入：回滚未提交的批次，删除暂存表和主键表
+
+        upsert 模式下已提交的批次保留且不删除任何行；replace / staging 模式下目标窗口保持不变。
+        """
+        try:
+            self.db.rollback()
+        finally:
+            self._drop_tables()
+
+    def _drop_tables(self) -> None:
+        for table in (self._staging_table, self._keys_table):
+            if table:
+                self.db.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        self._staging_table = self._keys_table = None
@@ -0,0 +1,154 @@
+"""
+Facebook 广告创意/预览持久化存储
+进程内有界 LRU（前端）+ Redis（跨进程、跨次同步），键包含 ad_id 与创意版本（creative id + 广告 updated_time），
+广告未变化时直接复用已下载的图片 URL 和预览，不再重复请求
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.creative_store")
+
+CREATIVE_KINDS = ("creative", "preview")
+KEY_PREFIX = "fbcreative"
+
+
+def creative_version(creative_id: Optional[str], updated_time: Optional[str]) -> Optional[str]:
+    """创意版本标识（任一部分缺失时返回 None，表示无法判断是否变化）"""
+    if not creative_id or not updated_time:
+        return None
+    return f"{creative_id}:{updated_time}"
+
+
+class CreativeStore:
+    """创意/预览存储（线程安全，Redis 不可用时只使用进程内 LRU）"""
+
+    def __init__(self, max_entries: int, memory_ttl: int, redis_ttl: int):
+        """
+        Args:
+            max_entries: 进程内 LRU 最大条目数
+            memory_ttl: 进程内条目存活时间（秒）
+            redis_ttl: Redis 条目存活时间（秒），长期未出现的广告自然过期
+        """
+        self._memory: TTLCache = TTLCache(maxsize=max(1, max_entries), ttl=max(1, memory_ttl))
+        self._lock = threading.Lock()
+        self.redis_ttl = redis_ttl
+        self.stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "unversioned": 0,  # 无法获取版本、只能重新下载的次数
+            "stored": 0,
+        }
+
+    @staticmethod
+    def _key(kind: str, ad_id: str, version: str) -> str:
+        return f"{KEY_PREFIX}:{kind}:{ad_id}:{version}"
+
+    def get_many(self, kind: str, versions: Dict[str, Optional[str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量读取（先进程内 LRU，再 Redis MGET）
+
+        Args:
+            kind: 'creative' 或 'preview'
+            versions: {ad_id: 版本}，版本为 None 的广告视为未命中
+
+        Returns:
+            命中的 {ad_id: 数据}
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[str, str]] = []
+        with self._lock:
+            for ad_id, version in versions.items():
+                if not version:
+                    self.stats["unversioned"] += 1
+                    continue
+                key = self._key(kind, ad_id, version)
+                data = self._memory.get(key)
+                if data is not None:
+                    found[ad_id] = data
+                    self.stats["memory_hits"] += 1
+                else:
+                    pending.append((ad_id, key))
+
+        redis_client = cache_manager.redis_client
+        if pending and redis_client:
+            try:
+                values = redis_client.mget([key for _, key in pending])
+                with self._lock:
+                    for (ad_id, key), raw in zip(pending, values):
+                        if raw is None:
+                            continue
+                        data = cache_manager.codec.decode(raw)
+                        found[ad_id] = data
+                        self._memory[key] = data
+                        self.stats["redis_hits"] += 1
+            except Exception as e:
+                logger.warning(f"⚠️ 读取创意存储失败: {str(e)}")
+
+        with self._lock:
+            self.stats["misses"] += sum(1 for ad_id, _ in pending if ad_id not in found)
+        return found
+
+    def set_many(self, kind: str, items: Dict[str, Tuple[Optional[str], Dict[str, Any]]]) -> None:
+        """
+        批量写入（版本为 None 的条目不保存）
+
+        Args:
+            kind: 'creative' 或 'preview'
+            items: {ad_id: (版本, 数据)}
+        """
+        entries = {
+            self._key(kind, ad_id, version): data
+            for ad_id, (version, data) in items.items()
+            if version and data is not None
+        }
+        if not entries:
+            return
+        with self._lock:
+            for key, data in entries.items():
+                self._memory[key] = data
+            self.stats["stored"] += len(entries)
+
+        redis_client = cache_manager.redis_client
+        if redis_client:
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for key, data in entries.items():
+                    pipe.setex(key, self.redis_ttl, cache_manager.codec.encode(data))
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"⚠️ 写入创意存储失败: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"] + stats["unversioned"]
+        stats["hit_rate"] = f"{hits / lookups * 100:.1f}%" if lookups else "N/A"
+        stats["redis_enabled"] = cache_manager.redis_client is not None
+        return stats
+
+
+_store: Optional[CreativeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_creative_store(memory_ttl: int = 3600) -> CreativeStore:
+    """获取进程内共享的创意存储"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CreativeStore(
+                settings.FACEBOOK_CREATIVE_MEMORY_ENTRIES,
+                memory_ttl,
+                settings.FACEBOOK_CREATIVE_STORE_TTL_SECONDS,
+            )
+        return _store
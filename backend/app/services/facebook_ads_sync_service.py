@@ -21,19 +21,18 @@ Facebook Ads API 数据同步服务
 - 缓存命中后可节省 50%+ 的API请求
 """
 import time
-import json
 import requests
 import threading
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.ad import Ad
 from facebook_business.adobjects.adcreative import AdCreative
+from facebook_business.adobjects.adreportrun import AdReportRun
 from facebook_business.exceptions import FacebookRequestError
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from requests.adapters import HTTPAdapter
@@ -42,6 +41,13 @@ from functools import lru_cache
 import hashlib
 
 from app.services.base_sync_service import BaseSyncService
+from app.services.facebook_rollup_service import FacebookRollupService
+from app.services.sync_pipeline import StreamingPipeline
+from app.services.facebook_rate_governor import GovernedFacebookAdsApi, get_rate_governor
+from app.services.creative_store import creative_version, get_creative_store
+from app.services.ad_creative_dimension_service import AdCreativeDimensionService
+from app.services.facebook_async_client import AsyncGraphClient, run_sync
+from app.services.sync_state_service import STATUS_SUCCESS, SyncStateService, date_range, to_segments
 from app.core.config import settings
 
 logger = logging.getLogger("app.services.facebook_ads_sync_service")
@@ -157,61 +163,6 @@ class PerformanceConfig:
         return configs.get(profile.lower(), PerformanceConfig.DEFAULT)
 
 
-# ==================== 缓存类 ====================
-class CreativeCache:
-    """广告创意和预览缓存（内存缓存）"""
-    def __init__(self, ttl: int = 3600):
-        """
-        初始化缓存
-        
-        Args:
-            ttl: 缓存过期时间（秒），默认1小时
-        """
-        self.cache = {}
-        self.ttl = ttl
-        self.lock = threading.Lock()
-    
-    def _is_expired(self, timestamp: float) -> bool:
-        """检查缓存是否过期"""
-        return time.time() - timestamp > self.ttl
-    
-    def get(self, ad_id: str, cache_type: str = 'creative') -> Optional[Dict]:
-        """获取缓存的创意或预览数据"""
-        with self.lock:
-            key = f"{cache_type}:{ad_id}"
-            if key in self.cache:
-                timestamp, data = self.cache[key]
-                if not self._is_expired(timestamp):
-                    return data
-                else:
-                    # 删除过期缓存
-                    del self.cache[key]
-        return None
-    
-    def set(self, ad_id: str, data: Dict, cache_type: str = 'creative'):
-        """设置缓存"""
-        with self.lock:
-            key = f"{cache_type}:{ad_id}"
-            self.cache[key] = (time.time(), data)
-    
-    def clear_expired(self):
-        """清理过期缓存"""
-        with self.lock:
-            expired_keys = []
-            for key, (timestamp, _) in self.cache.items():
-                if self._is_expired(timestamp):
-                    expired_keys.append(key)
-            for key in expired_keys:
-                del self.cache[key]
-    
-    def get_stats(self) -> Dict[str, int]:
-        """获取缓存统计信息"""
-        with self.lock:
-            total = len(self.cache)
-            expired = sum(1 for ts, _ in self.cache.values() if self._is_expired(ts))
-            return {'total': total, 'valid': total - expired, 'expired': expired}
-
-
 class FacebookAdsDataSyncService(BaseSyncService):
     """Facebook Ads 数据同步服务（高性能版本）
     
@@ -225,8 +176,33 @@ class FacebookAdsDataSyncService(BaseSyncService):
     # 配置常量 - 默认值（可通过构造函数覆盖）
     MAX_RETRIES = 3
     
-    # 类级别的缓存实例（所有实例共享）
-    _creative_cache = None
+    # 表结构（主键 + 数据列）
+    PLATFORM = "facebook"
+    KEY_COLUMNS = ("campaign_id", "adset_id", "ad_id", "createtime")
+    DATA_COLUMNS = (
+        "account_id", "campaign_name", "adset_name", "ad_name",
+        "impression", "spend", "clicks",
+        "purchases_roas", "reach", "unique_link_clicks", "adds_to_cart",
+        "adds_payment_info", "purchases",
+    )
+    
+    # Ad 级别 Insights 字段（同步读取与异步报表共用）
+    INSIGHTS_FIELDS = [
+        'ad_id',
+        'ad_name',
+        'adset_id',
+        'adset_name',
+        'campaign_id',
+        'campaign_name',
+        'impressions',
+        'spend',
+        'clicks',
+        'reach',
+        'actions',
+        'unique_actions',  # 独立操作（包括独立链接点击）
+        'action_values',
+        'purchase_roas'
+    ]
     
     def __init__(self, db: Session, performance_profile: str = 'default', custom_config: dict = None):
         """
@@ -256,19 +232,21 @@ class FacebookAdsDataSyncService(BaseSyncService):
         self.DB_BATCH_SIZE = config.get('db_batch_size', 10000)
         self.CACHE_TTL = config.get('cache_ttl', 3600)
         
-        # 初始化类级别缓存（如果还未初始化）
-        if FacebookAdsDataSyncService._creative_cache is None:
-            FacebookAdsDataSyncService._creative_cache = CreativeCache(ttl=self.CACHE_TTL)
-        
         # 初始化实例变量
         self.api_initialized = False
+        self.api = None  # 带账户限速的 FacebookAdsApi 实例
+        self.rate_governor = None  # 当前账户的自适应限速器
         self.ad_account = None
         self.access_token = None
         self.perf_stats = PerformanceStats()
         self.session = self._create_http_session()  # 创建优化的 HTTP 会话
-        self.cache = FacebookAdsDataSyncService._creative_cache  # 使用类级别的共享缓存
-        self.cache_hits = 0  # 缓存命中次数
-        self.cache_misses = 0  # 缓存未命中次数
+        self.creative_store = get_creative_store(self.CACHE_TTL)  # 进程内 LRU + Redis 的创意/预览存储
+        self.cache_hits = 0  # 本次同步创意/预览命中次数
+        self.cache_misses = 0  # 本次同步创意/预览需要下载的次数
+        self.version_requests = 0  # 本次同步查询创意版本的请求数
+        self._pending_creatives: Dict[str, Tuple[Optional[str], Optional[str]]] = {}  # 待写入维度表的创意
+        self._pending_creatives_lock = threading.Lock()
+        self.failed_windows: List[Tuple[str, str]] = []  # 最近一次获取中读取失败的日期窗口
         self.performance_profile = performance_profile  # 记录使用的配置档案
     
     def _create_http_session(self) -> requests.Session:
@@ -279,7 +257,7 @@ class FacebookAdsDataSyncService(BaseSyncService):
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],  # 429 交给账户限速器处理，不在连接层静默重试
             allowed_methods=["GET", "POST"]
         )
         
@@ -312,8 +290,10 @@ class FacebookAdsDataSyncService(BaseSyncService):
     def initialize_api(self, access_token: str, ad_account_id: str) -> bool:
         """初始化 Facebook API"""
         try:
-            FacebookAdsApi.init(access_token=access_token)
-            self.ad_account = AdAccount(ad_account_id)
+            self.api = GovernedFacebookAdsApi.init(access_token=access_token)
+            self.rate_governor = get_rate_governor(ad_account_id, self.MAX_CONCURRENT_WORKERS)
+            self.api.governor = self.rate_governor
+            self.ad_account = AdAccount(ad_account_id, api=self.api)
             self.access_token = access_token  # 保存 access_token 用于 Batch API
             self.api_initialized = True
             _log_print("✅ Facebook Ads API 初始化成功")
@@ -374,175 +354,93 @@ class FacebookAdsDataSyncService(BaseSyncService):
 
         return None
     
+    def _governed_get(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        """经过账户限速器发送 GET 请求，并用响应的用量头调整限速"""
+        governor = self.rate_governor if settings.FACEBOOK_RATE_GOVERNOR_ENABLED else None
+        if governor is None:
+            return self.session.get(url, params=params, timeout=self.REQUEST_TIMEOUT)
+        with governor.slot():
+            response = self.session.get(url, params=params, timeout=self.REQUEST_TIMEOUT)
+        governor.observe_headers(response.headers)
+        return response
+    
+    def _on_throttled(self, retry: int) -> float:
+        """
+        处理限流响应
+        
+        启用限速器时只暂停该账户（后续请求在获取许可时等待），否则按指数退避休眠
+        
+        Returns:
+            等待的秒数
+        """
+        if self.rate_governor and settings.FACEBOOK_RATE_GOVERNOR_ENABLED:
+            return self.rate_governor.observe_throttle()
+        wait_time = min(self.RETRY_DELAY * (2 ** retry), 60)  # 最多等待60秒
+        time.sleep(wait_time)
+        return wait_time
+    
     def get_batch_creatives_and_previews(self, ad_ids: List[str]) -> Tuple[Dict, Dict]:
         """
         使用Facebook Batch API同时批量获取创意和预览信息（最快方式）
-        可以在一个请求中获取多个广告的创意和预览
-        带重试机制和错误处理
+        
+        多个批次同时在途（受账户限速器约束），失败的子请求单独重试，
+        批次大小按响应耗时在 5~50 之间自适应
         """
         if not self.USE_BATCH_API or not ad_ids or not self.access_token:
             return {}, {}
 
-        creative_info = {}
-        preview_info = {}
-
         total = len(ad_ids)
         _log_print(f"🚀 使用Batch API批量获取创意和预览信息...")
-        _log_print(f"   广告总数: {total}, 批次大小: {self.BATCH_SIZE}")
+        _log_print(
+            f"   广告总数: {total}, 初始批次大小: {self.BATCH_SIZE}, "
+            f"同时在途批次: {settings.FACEBOOK_BATCH_API_INFLIGHT}"
+        )
 
         self.perf_stats.start_timer("Batch API 获取")
         start_time = time.time()
 
-        # 分批处理
-        batches = [ad_ids[i:i + self.BATCH_SIZE] for i in range(0, len(ad_ids), self.BATCH_SIZE)]
-
-        completed = 0
-        failed_batches = []
-
-        def set_batch_empty(batch):
-            """设置批次为空值"""
-            for ad_id in batch:
-                creative_info[ad_id] = {'image_url': None}
-                if self.ENABLE_PREVIEW:
-                    preview_info[ad_id] = {'body': None}
-
-        def process_batch_results(batch, results, current_batch_idx):
-            """处理批次结果（优化版）"""
-            for i, ad_id in enumerate(batch):
-                # 处理创意
-                creative_idx = i * 2 if self.ENABLE_PREVIEW else i
-                if creative_idx < len(results) and results[creative_idx].get('code') == 200:
-                    try:
-                        data = json.loads(results[creative_idx]['body'])
-                        # 从返回的数据中提取creative信息
-                        image_url = self.extract_image_url_from_creative(data)
-                        result = {'image_url': image_url}
-                        creative_info[ad_id] = result
-                        # 同时缓存结果
-                        self.cache.set(ad_id, result, 'creative')
-                    except Exception as e:
-                        creative_info[ad_id] = {'image_url': None}
-                else:
-                    creative_info[ad_id] = {'image_url': None}
-
-                # 处理预览
-                if self.ENABLE_PREVIEW:
-                    preview_idx = i * 2 + 1
-                    if preview_idx < len(results) and results[preview_idx].get('code') == 200:
-                        try:
-                            data = json.loads(results[preview_idx]['body'])
-                            preview_body = data.get('data', [{}])[0].get('body')
-                            result = {'body': preview_body}
-                            preview_info[ad_id] = result
-                            # 同时缓存结果
-                            self.cache.set(ad_id, result, 'preview')
-                        except Exception as e:
-                            preview_info[ad_id] = {'body': None}
-                    else:
-                        preview_info[ad_id] = {'body': None}
-
-        for batch_idx, batch in enumerate(batches, 1):
-            success = False
-
-            for retry in range(self.MAX_RETRIES):
-                try:
-                    # 构建批量请求（优化版）
-                    # 直接请求creative的完整信息，避免二次请求
-                    batch_requests = []
-                    for ad_id in batch:
-                        # 获取广告的创意完整信息（一次性获取所有需要的字段）
-                        batch_requests.append({
-                            "method": "GET",
-                            "relative_url": f"{ad_id}?fields=creative{{image_url,image_hash,object_story_spec}}"
-                        })
-                    
-                    # 第二步：如果需要预览，添加预览请求
-                    if self.ENABLE_PREVIEW:
-                        for ad_id in batch:
-                            batch_requests.append({
-                                "method": "GET",
-                                "relative_url": f"{ad_id}/previews?ad_format=DESKTOP_FEED_STANDARD"
-                            })
-
-                    # 发送请求（使用连接池会话）
-                    response = self.session.post(
-                        'https://graph.facebook.com/v21.0/',
-                        data={'access_token': self.access_token, 'batch': json.dumps(batch_requests)},
-                        timeout=self.REQUEST_TIMEOUT
-                    )
-
-                    if response.status_code == 200:
-                        resp_json = response.json()
-                        process_batch_results(batch, resp_json, batch_idx)
-                        completed += len(batch)
-                        success = True
-
-                        # 进度条
-                        progress = '█' * int(completed/total * 30) + '░' * (30 - int(completed/total * 30))
-                        _log_print(f"   [{progress}] {completed}/{total} ({completed/total*100:.1f}%)", end='\r')
-                        if batch_idx < len(batches):
-                            time.sleep(0.1)
-                        break
-
-                    elif response.status_code == 429:
-                        # 速率限制 - 使用指数退避
-                        if retry < self.MAX_RETRIES - 1:
-                            wait_time = min(self.RETRY_DELAY * (2 ** retry), 60)  # 最多等待60秒
-                            _log_print(f"\n   ⚠️  速率限制，等待 {wait_time:.0f} 秒... (尝试 {retry + 1}/{self.MAX_RETRIES})")
-                            time.sleep(wait_time)
-                        else:
-                            _log_print(f"\n   ❌ 批次 {batch_idx} 失败（超过重试次数）")
-                            failed_batches.append(batch_idx)
-                            set_batch_empty(batch)
-                    else:
-                        # 其他错误 - 短暂等待后重试
-                        if retry < self.MAX_RETRIES - 1:
-                            _log_print(f"\n   ⚠️  请求失败 (状态码: {response.status_code})，等待 2 秒后重试...")
-                            time.sleep(2)
-                        else:
-                            _log_print(f"\n   ❌ 批次 {batch_idx} 失败")
-                            failed_batches.append(batch_idx)
-                            set_batch_empty(batch)
+        client = self._create_async_client()
+        requests_list = self._creative_requests(ad_ids, include_preview=self.ENABLE_PREVIEW)
+
+        async def fetch_all() -> Dict:
+            async with client:
+                return await client.batch_many(
+                    requests_list,
+                    batch_size=self.BATCH_SIZE,
+                    max_inflight_batches=settings.FACEBOOK_BATCH_API_INFLIGHT,
+                    target_seconds=settings.FACEBOOK_BATCH_API_TARGET_SECONDS,
+                    desc="Batch API",
+                )
 
-                except Exception as e:
-                    if retry >= self.MAX_RETRIES - 1:
-                        _log_print(f"\n   ❌ 批次 {batch_idx} 异常: {e}")
-                        failed_batches.append(batch_idx)
-                        set_batch_empty(batch)
-                    else:
-                        time.sleep(2)
+        results = run_sync(fetch_all())
+        creative_info, preview_info = self._parse_creative_payloads(results)
 
         elapsed = time.time() - start_time
         self.perf_stats.end_timer("Batch API 获取")
 
         _log_print(f"\n   ✅ Batch API获取完成（耗时: {elapsed:.2f}秒, 速度: {total/elapsed:.1f} 条/秒）")
-        if failed_batches:
-            _log_print(f"   ⚠️  失败批次数: {len(failed_batches)}/{len(batches)}")
+        _log_print(
+            f"   📦 批次数: {client.stats['batches']}, 最终批次大小: {client.stats['batch_size']}, "
+            f"子请求重试: {client.stats['retries']}"
+        )
+        if client.stats['failed']:
+            _log_print(f"   ⚠️  失败子请求数: {client.stats['failed']}/{len(requests_list)}")
         _log_print()
 
         return creative_info, preview_info
     
     def _fetch_creative(self, ad_id: str) -> Tuple[str, Dict]:
-        """获取单个广告创意（带缓存优化）"""
-        # 先检查缓存
-        cached_data = self.cache.get(ad_id, 'creative')
-        if cached_data is not None:
-            self.cache_hits += 1
-            return ad_id, cached_data
-        
-        self.cache_misses += 1
-        
+        """获取单个广告创意"""
         try:
-            ad = Ad(ad_id)
+            ad = Ad(ad_id, api=self.api)
             ad_data = ad.api_get(fields=['creative'])
 
             if not ad_data.get('creative'):
                 result = {'image_url': None}
-                self.cache.set(ad_id, result, 'creative')
                 return ad_id, result
 
             creative_id = ad_data['creative'].get('id')
-            creative = AdCreative(creative_id)
+            creative = AdCreative(creative_id, api=self.api)
             creative_data = creative.api_get(fields=[
                 'image_url',
                 'image_hash',
@@ -575,8 +473,6 @@ class FacebookAdsDataSyncService(BaseSyncService):
                 image_url = f"https://graph.facebook.com/{img_hash}/picture"
 
             result = {'image_url': image_url}
-            # 缓存结果
-            self.cache.set(ad_id, result, 'creative')
             return ad_id, result
 
         except Exception as e:
@@ -584,28 +480,18 @@ class FacebookAdsDataSyncService(BaseSyncService):
             return ad_id, result
 
     def _fetch_preview(self, ad_id: str) -> Tuple[str, Dict]:
-        """获取单个广告预览（带缓存优化）"""
-        # 先检查缓存
-        cached_data = self.cache.get(ad_id, 'preview')
-        if cached_data is not None:
-            self.cache_hits += 1
-            return ad_id, cached_data
-        
-        self.cache_misses += 1
-        
+        """获取单个广告预览"""
         try:
-            ad = Ad(ad_id)
+            ad = Ad(ad_id, api=self.api)
             previews = ad.get_previews(params={
                 'ad_format': 'DESKTOP_FEED_STANDARD'
             })
 
             if previews:
                 result = {'body': previews[0].get('body')}
-                self.cache.set(ad_id, result, 'preview')
                 return ad_id, result
             
             result = {'body': None}
-            self.cache.set(ad_id, result, 'preview')
             return ad_id, result
 
         except Exception as e:
@@ -663,15 +549,101 @@ class FacebookAdsDataSyncService(BaseSyncService):
 
     def get_ad_creatives_batch(self, ad_ids: List[str]) -> Dict:
         """批量获取广告创意（性能优化版）"""
+        if settings.FACEBOOK_ASYNC_FETCH_ENABLED and self.access_token:
+            return self.fetch_creatives_and_previews_async(ad_ids, include_preview=False)[0]
         return self.concurrent_fetch(ad_ids, self._fetch_creative, "🎨 正在获取广告创意信息")
 
     def get_ad_previews_batch(self, ad_ids: List[str]) -> Dict:
         """批量获取广告预览（性能优化版）"""
+        if settings.FACEBOOK_ASYNC_FETCH_ENABLED and self.access_token:
+            return self.fetch_creatives_and_previews_async(ad_ids, include_creative=False)[1]
         return self.concurrent_fetch(ad_ids, self._fetch_preview, "🖼️  正在获取广告预览")
     
+    def _create_async_client(self) -> AsyncGraphClient:
+        """创建异步 Graph 客户端（共享账户限速器）"""
+        return AsyncGraphClient(
+            self.access_token,
+            max_concurrency=self.MAX_CONCURRENT_WORKERS,
+            timeout=self.REQUEST_TIMEOUT,
+            max_retries=self.MAX_RETRIES,
+            governor=self.rate_governor if settings.FACEBOOK_RATE_GOVERNOR_ENABLED else None,
+        )
+    
+    @staticmethod
+    def _creative_requests(ad_ids: List[str], include_creative: bool = True, include_preview: bool = True) -> List:
+        """构建创意/预览请求列表，结果键为 (类型, ad_id)"""
+        requests_list = []
+        if include_creative:
+            requests_list.extend(
+                (('creative', ad_id), ad_id, {'fields': 'creative{image_url,image_hash,object_story_spec}'})
+                for ad_id in ad_ids
+            )
+        if include_preview:
+            requests_list.extend(
+                (('preview', ad_id), f"{ad_id}/previews", {'ad_format': 'DESKTOP_FEED_STANDARD'})
+                for ad_id in ad_ids
+            )
+        return requests_list
+    
+    def _parse_creative_payloads(self, results: Dict) -> Tuple[Dict, Dict]:
+        """把 {(类型, ad_id): 响应 JSON} 解析为 (creative_info, preview_info)，失败的广告值为空"""
+        creative_info = {}
+        preview_info = {}
+        for (kind, ad_id), payload in results.items():
+            if kind == 'creative':
+                image_url = None
+                if payload and payload.get('creative'):
+                    try:
+                        image_url = self.extract_image_url_from_creative(payload)
+                    except Exception:
+                        image_url = None
+                creative_info[ad_id] = {'image_url': image_url}
+            else:
+                previews = (payload or {}).get('data') or [{}]
+                preview_info[ad_id] = {'body': previews[0].get('body')}
+        return creative_info, preview_info
+    
+    def fetch_creatives_and_previews_async(
+        self,
+        ad_ids: List[str],
+        include_creative: bool = True,
+        include_preview: bool = True
+    ) -> Tuple[Dict, Dict]:
+        """
+        在单个事件循环中并发获取创意和预览（共享一个 httpx 连接池，在途请求数不超过 MAX_CONCURRENT_WORKERS）
+        
+        创意通过一次字段展开请求（creative{...}）获取，不再先查广告再查创意
+        
+        Returns:
+            (creative_info, preview_info)，获取失败的广告值为空
+        """
+        requests_list = self._creative_requests(ad_ids, include_creative, include_preview)
+        client = self._create_async_client()
+        
+        async def fetch_all() -> Dict:
+            async with client:
+                return await client.get_many(requests_list, desc="创意/预览")
+        
+        _log_print(
+            f"🎨 正在获取 {len(ad_ids)} 个广告的{'创意' if include_creative else ''}{'和' if include_creative and include_preview else ''}"
+            f"{'预览' if include_preview else ''}（异步模式，{client.max_concurrency} 并发，HTTP/{'2' if client.http2 else '1.1'}）..."
+        )
+        start_time = time.time()
+        results = run_sync(fetch_all())
+        
+        creative_info, preview_info = self._parse_creative_payloads(results)
+        
+        elapsed = time.time() - start_time
+        speed = len(results) / elapsed if elapsed > 0 else 0
+        _log_print(
+            f"\n   ✅ 完成 {len(results)} 个请求（失败 {client.stats['failed']}，限流 {client.stats['throttled']}，"
+            f"耗时: {elapsed:.2f}秒，速度: {speed:.1f} 条/秒）\n"
+        )
+        return creative_info, preview_info
+    
     def get_ad_insights(self, ad_id: str, date: str) -> Optional[Dict[str, Any]]:
         """获取单个广告在特定日期的效果数据"""
-        ad = Ad(ad_id)
+        ad = Ad(ad_id, api=self.api)
         
         insights_data = ad.get_insights(
             fields=['impressions', 'spend', 'clicks', 'reach', 'purchase_roas', 'inline_link_clicks', 'actions'],
@@ -802,6 +774,299 @@ class FacebookAdsDataSyncService(BaseSyncService):
             _log_print(f"   ⚠️  跳过 {ad_name} ({date}): {e}")
         return None
     
+    def _insights_params(self, start_date: str, end_date: str, limit: int = None) -> Dict[str, Any]:
+        """Ad 级别、按天拆分、只取有花费广告的 Insights 查询参数"""
+        return {
+            'level': 'ad',  # 获取广告级别的数据
+            'time_range': {
+                'since': start_date,
+                'until': end_date
+            },
+            'time_increment': 1,  # 按天返回数据（重要！）
+            'filtering': [
+                {
+                    'field': 'spend',
+                    'operator': 'GREATER_THAN',
+                    'value': 0
+                }
+            ],
+            'limit': limit if limit else 1000  # 限制获取条数
+        }
+    
+    def _parse_insight_row(self, insight: Dict) -> Optional[Dict[str, Any]]:
+        """
+        解析一条 Insights 记录（添加了 time_increment: 1 后，每个广告的每一天各一条）
+        
+        Returns:
+            广告×天数据字典，花费为0时返回None
+        """
+        spend = float(insight.get('spend', 0))
+        if spend == 0:
+            return None
+        
+        # 提取actions数据
+        actions = {act.get('action_type'): int(act.get('value', 0))
+                   for act in insight.get('actions', [])}
+        unique_actions = {act.get('action_type'): int(act.get('value', 0))
+                          for act in insight.get('unique_actions', [])}
+        
+        return {
+            'ad_id': insight.get('ad_id'),
+            'ad_name': insight.get('ad_name'),
+            'adset_id': insight.get('adset_id'),
+            'adset_name': insight.get('adset_name'),
+            'campaign_id': insight.get('campaign_id'),
+            'campaign_name': insight.get('campaign_name'),
+            'impressions': int(insight.get('impressions', 0)),
+            'spend': spend,
+            'clicks': int(insight.get('clicks', 0)),
+            'reach': int(insight.get('reach', 0)),
+            'purchase_roas': self._extract_purchase_roas(insight),
+            'purchase': actions.get('purchase', 0),
+            'add_to_cart': actions.get('add_to_cart', 0),
+            'add_payment_info': actions.get('add_payment_info', 0),
+            'unique_link_click': unique_actions.get('link_click', 0),
+            'date': insight.get('date_start')  # API返回的日期，格式：YYYY-MM-DD
+        }
+    
+    def _parse_insights(self, insights) -> List[Dict[str, Any]]:
+        """解析 Insights 结果（游标翻页时可能抛出 FacebookRequestError）"""
+        ads_list = []
+        for i, insight in enumerate(insights, 1):
+            try:
+                ad_data = self._parse_insight_row(insight)
+            except Exception as e:
+                _log_print(f"   ⚠️  处理第 {i} 条数据时出错: {e}")
+                continue
+            if ad_data:
+                ads_list.append(ad_data)
+            # 每处理1000条显示一次进度
+            if i % 1000 == 0:
+                _log_print(f"   ⏳ 已处理 {i} 条广告数据...")
+        return ads_list
+    
+    def _fetch_insight_rows(self, start_date: str, end_date: str, limit: int = None) -> List[Dict[str, Any]]:
+        """同步读取日期窗口内的广告×天数据（不含创意和预览）"""
+        insights = self.ad_account.get_insights(
+            fields=self.INSIGHTS_FIELDS,
+            params=self._insights_params(start_date, end_date, limit)
+        )
+        return self._parse_insights(insights)
+    
+    def _fetch_creative_versions(self, ad_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量查询广告的创意版本（creative id + 广告 updated_time），每次请求最多50个广告
+        
+        Returns:
+            {ad_id: 版本}；查询失败的广告版本为 None（只能重新下载）
+        """
+        versions: Dict[str, Optional[str]] = {ad_id: None for ad_id in ad_ids}
+        if not self.access_token:
+            return versions
+        
+        for i in range(0, len(ad_ids), 50):
+            chunk = ad_ids[i:i + 50]
+            try:
+                response = self._governed_get(
+                    'https://graph.facebook.com/v21.0/',
+                    params={
+                        'ids': ','.join(chunk),
+                        'fields': 'creative{id},updated_time',
+                        'access_token': self.access_token,
+                    }
+                )
+                self.version_requests += 1
+                if response.status_code == 429:
+                    self._on_throttled(0)
+                    continue
+                if response.status_code != 200:
+                    continue
+                for ad_id, node in response.json().items():
+                    versions[ad_id] = creative_version(
+                        (node.get('creative') or {}).get('id'), node.get('updated_time')
+                    )
+            except Exception as e:
+                _log_print(f"   ⚠️  查询创意版本失败: {e}")
+        return versions
+    
+    def _fetch_mode_label(self) -> str:
+        """创意/预览获取方式（用于日志）"""
+        if self.USE_BATCH_API:
+            return 'Batch API'
+        if settings.FACEBOOK_ASYNC_FETCH_ENABLED:
+            return f'异步客户端 ({self.MAX_CONCURRENT_WORKERS} 并发)'
+        return f'高并发线程池 ({self.MAX_CONCURRENT_WORKERS} 线程)'
+    
+    def _download_creatives_and_previews(self, ad_ids: List[str]) -> Tuple[Dict, Dict]:
+        """下载广告创意和预览信息（Batch API、异步客户端或高并发线程池）"""
+        if self.USE_BATCH_API:
+            # 使用Batch API同时获取创意和预览（最快方式）
+            return self.get_batch_creatives_and_previews(ad_ids)
+        
+        if settings.FACEBOOK_ASYNC_FETCH_ENABLED and self.access_token:
+            return self.fetch_creatives_and_previews_async(ad_ids, include_preview=self.ENABLE_PREVIEW)
+        
+        # 使用传统并发方式分别获取
+        creative_info = self.get_ad_creatives_batch(ad_ids)
+        preview_info = self.get_ad_previews_batch(ad_ids) if self.ENABLE_PREVIEW else {}
+        return creative_info, preview_info
+    
+    def _fetch_creatives_and_previews(self, ad_ids: List[str]) -> Tuple[Dict, Dict]:
+        """
+        获取广告创意和预览信息
+        
+        先按创意版本读取持久化存储，只下载新广告或创意已变化的广告，下载结果按版本写回存储
+        """
+        versions = self._fetch_creative_versions(ad_ids)
+        creative_info = self.creative_store.get_many('creative', versions)
+        preview_info = self.creative_store.get_many('preview', versions) if self.ENABLE_PREVIEW else {}
+        
+        missing = [
+            ad_id for ad_id in ad_ids
+            if ad_id not in creative_info or (self.ENABLE_PREVIEW and ad_id not in preview_info)
+        ]
+        self.cache_hits += len(ad_ids) - len(missing)
+        self.cache_misses += len(missing)
+        if not missing:
+            _log_print(f"   ✅ {len(ad_ids)} 个广告的创意和预览均未变化，全部复用存储")
+            self._record_creatives(ad_ids, creative_info, preview_info)
+            return creative_info, preview_info
+        
+        _log_print(f"   🎨 复用 {len(ad_ids) - len(missing)} 个广告的创意，需下载 {len(missing)} 个")
+        fetched_creatives, fetched_previews = self._download_creatives_and_previews(missing)
+        creative_info.update(fetched_creatives)
+        preview_info.update(fetched_previews or {})
+        
+        # 下载失败（返回空值）的条目不写回，下次同步重试
+        self.creative_store.set_many('creative', {
+            ad_id: (versions.get(ad_id), data)
+            for ad_id, data in fetched_creatives.items()
+            if data.get('image_url')
+        })
+        if self.ENABLE_PREVIEW:
+            self.creative_store.set_many('preview', {
+                ad_id: (versions.get(ad_id), data)
+                for ad_id, data in (fetched_previews or {}).items()
+                if data.get('body')
+            })
+        self._record_creatives(ad_ids, creative_info, preview_info)
+        return creative_info, preview_info
+    
+    def _record_creatives(self, ad_ids: List[str], creative_info: Dict, preview_info: Dict) -> None:
+        """记录待写入创意维度表的图片和预览（同一广告只保留一份）"""
+        with self._pending_creatives_lock:
+            for ad_id in ad_ids:
+                self._pending_creatives[ad_id] = (
+                    creative_info.get(ad_id, {}).get('image_url'),
+                    (preview_info or {}).get(ad_id, {}).get('body'),
+                )
+    
+    def flush_creative_dimension(self, account_id: str = None) -> None:
+        """把本次同步获取的创意写入维度表（只写入变化的内容，失败只记录日志）"""
+        with self._pending_creatives_lock:
+            creatives, self._pending_creatives = self._pending_creatives, {}
+        if not creatives:
+            return
+        self.perf_stats.start_timer("创意维度表写入")
+        try:
+            AdCreativeDimensionService(self.db).upsert(creatives, account_id)
+        except Exception as e:
+            _log_print(f"❌ 写入创意维度表失败（不影响效果数据）: {e}")
+        finally:
+            self.perf_stats.end_timer("创意维度表写入")
+    
+    def _build_data_tuples(self, ads_list: List[Dict[str, Any]], account_id: str = None) -> List[Tuple]:
+        """生成数据库记录元组（创意和预览写入维度表 dim_ad_creative，不再随每天的记录重复保存）"""
+        all_data_tuples = []
+        for ad_data in ads_list:
+            # 每条记录已包含具体日期，不需要再按日期展开
+            all_data_tuples.append((
+                ad_data['campaign_id'],
+                ad_data['adset_id'],
+                ad_data['ad_id'],
+                account_id,
+                ad_data['campaign_name'],
+                ad_data['adset_name'],
+                ad_data['ad_name'],
+                ad_data['impressions'],
+                ad_data['spend'],
+                ad_data['clicks'],
+                ad_data['purchase_roas'],
+                ad_data['reach'],
+                ad_data['unique_link_click'],
+                ad_data['add_to_cart'],
+                ad_data['add_payment_info'],
+                ad_data['purchase'],
+                ad_data['date']      # 17. createtime (日期)
+            ))
+        return all_data_tuples
+    
+    def _split_date_windows(self, start_date: str, end_date: str, days_per_window: int) -> List[Tuple[str, str]]:
+        """将日期范围切分为连续的窗口"""
+        days_per_window = max(1, days_per_window)
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        windows = []
+        current_start = start_dt
+        while current_start <= end_dt:
+            current_end = min(current_start + timedelta(days=days_per_window - 1), end_dt)
+            windows.append((current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d')))
+            current_start = current_end + timedelta(days=1)
+        return windows
+    
+    def _fetch_insight_chunks(
+        self,
+        windows: List[Tuple[str, str]],
+        limit: int = None
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[Tuple[str, str], str]]]:
+        """
+        并发读取多个日期窗口的广告×天数据（不含创意和预览）
+        
+        并发数由 FACEBOOK_INSIGHTS_CHUNK_WORKERS 控制，每个窗口的耗时记录在 PerformanceStats 中。
+        
+        Args:
+            windows: 日期窗口列表 [(开始日期, 结束日期)]
+            limit: 限制获取的广告数量
+            
+        Returns:
+            (广告×天数据列表, [(失败窗口, 错误信息)])
+        """
+        if not windows:
+            return [], []
+        
+        def fetch_chunk(batch_num: int, window: Tuple[str, str]) -> List[Dict[str, Any]]:
+            timer_key = f"批次 {batch_num} Insights ({window[0]} ~ {window[1]})"
+            self.perf_stats.start_timer(timer_key)
+            try:
+                return self._fetch_insight_rows(window[0], window[1], limit)
+            finally:
+                self.perf_stats.end_timer(timer_key)
+        
+        ads_list = []
+        failed = []
+        max_workers = max(1, min(settings.FACEBOOK_INSIGHTS_CHUNK_WORKERS, len(windows)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch_chunk, batch_num, window): (batch_num, window)
+                for batch_num, window in enumerate(windows, 1)
+            }
+            for future in as_completed(futures):
+                batch_num, window = futures[future]
+                try:
+                    rows = future.result()
+                except FacebookRequestError as e:
+                    error_msg = f"API请求失败 (代码: {e.api_error_code()}): {e.api_error_message()}"
+                    failed.append((window, error_msg))
+                    _log_print(f"   ⚠️  批次 {batch_num} ({window[0]} 到 {window[1]}) 失败: {error_msg}")
+                    continue
+                except Exception as e:
+                    failed.append((window, str(e)))
+                    _log_print(f"   ⚠️  批次 {batch_num} ({window[0]} 到 {window[1]}) 失败: {e}")
+                    continue
+                ads_list.extend(rows)
+                _log_print(f"   ✅ 批次 {batch_num} ({window[0]} 到 {window[1]}) 完成: 获取 {len(rows)} 条记录")
+        return ads_list, failed
+    
     def _fetch_ads_data_in_batches(
         self,
         start_date: str,
@@ -813,6 +1078,8 @@ class FacebookAdsDataSyncService(BaseSyncService):
         """
         分批获取广告数据（用于大日期范围）
         
+        各批次的 Insights 并发读取，全部完成后按去重后的 ad_id 统一获取一次创意和预览。
+        
         Args:
             start_date: 开始日期
             end_date: 结束日期
@@ -823,50 +1090,97 @@ class FacebookAdsDataSyncService(BaseSyncService):
         Returns:
             (成功标志, 数据列表, 错误信息)
         """
-        all_data_tuples = []
-        all_ad_ids = set()
+        windows = self._split_date_windows(start_date, end_date, days_per_batch)
+        _log_print(
+            f"📦 并发获取 {len(windows)} 个批次 "
+            f"(并发数: {max(1, min(settings.FACEBOOK_INSIGHTS_CHUNK_WORKERS, len(windows)))})"
+        )
         
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        ads_list, failed = self._fetch_insight_chunks(windows, limit)
+        self.failed_windows.extend(window for window, _ in failed)
+        if not ads_list:
+            return False, [], "所有批次均未获取到数据"
+        if failed:
+            # 部分批次失败不中断整个流程，失败窗口不写库并记录到同步状态，下次同步优先重试
+            _log_print(f"   ⚠️  {len(failed)} 个批次失败: {', '.join(f'{s}~{e}' for (s, e), _ in failed)}")
         
-        current_start = start_dt
-        batch_num = 1
+        # 各批次包含大量相同的广告，创意和预览只按去重后的 ad_id 获取一次
+        ad_ids = list({ad_data['ad_id'] for ad_data in ads_list})
+        self.perf_stats.start_timer("获取创意和预览")
+        self._fetch_creatives_and_previews(ad_ids)
+        self.perf_stats.end_timer("获取创意和预览")
         
-        while current_start <= end_dt:
-            # 计算当前批次的结束日期
-            current_end = min(current_start + timedelta(days=days_per_batch - 1), end_dt)
-            
-            batch_start_str = current_start.strftime('%Y-%m-%d')
-            batch_end_str = current_end.strftime('%Y-%m-%d')
-            
-            _log_print(f"\n📦 批次 {batch_num}: {batch_start_str} 到 {batch_end_str}")
-            
-            # 获取当前批次的数据
-            success, batch_data, error_msg = self._fetch_single_batch(
-                batch_start_str, 
-                batch_end_str, 
-                account_id, 
-                limit
-            )
-            
-            if not success:
-                _log_print(f"   ⚠️  批次 {batch_num} 失败: {error_msg}")
-                # 继续处理下一批次，不中断整个流程
-            else:
-                all_data_tuples.extend(batch_data)
-                _log_print(f"   ✅ 批次 {batch_num} 完成: 获取 {len(batch_data)} 条记录")
-            
-            # 移动到下一批次
-            current_start = current_end + timedelta(days=1)
-            batch_num += 1
+        all_data_tuples = self._build_data_tuples(ads_list, account_id)
+        _log_print(f"\n✅ 所有批次处理完成，共 {len(ad_ids)} 个广告，获取 {len(all_data_tuples)} 条记录")
+        return True, all_data_tuples, ""
+    
+    def iter_async_insights(
+        self,
+        windows: List[Tuple[str, str]],
+        limit: int = None
+    ) -> Iterator[Tuple[Tuple[str, str], Optional[Any]]]:
+        """
+        为每个日期窗口提交一个异步报表任务（AdReportRun），统一轮询，任务完成即产出结果游标
         
-        if not all_data_tuples:
-            return False, [], "所有批次均未获取到数据"
+        调用方处理已完成任务的结果时，其余任务仍在 Facebook 服务端运行。
+        任务提交失败、执行失败或超时的窗口产出 (窗口, None)，由调用方回退到同步读取。
         
-        _log_print(f"\n✅ 所有批次处理完成，共获取 {len(all_data_tuples)} 条记录")
-        return True, all_data_tuples, ""
+        Args:
+            windows: 日期窗口列表 [(开始日期, 结束日期)]
+            limit: 每页条数
+            
+        Yields:
+            (日期窗口, Insights 结果游标或None)
+        """
+        pending = {}
+        for window in windows:
+            try:
+                job = self.ad_account.get_insights(
+                    fields=self.INSIGHTS_FIELDS,
+                    params=self._insights_params(window[0], window[1], limit),
+                    is_async=True
+                )
+                pending[window] = job
+                _log_print(f"🧾 已提交异步报表 {window[0]} 到 {window[1]}（任务 {job.get_id()}）")
+            except FacebookRequestError as e:
+                _log_print(f"   ⚠️  提交异步报表失败 {window[0]} 到 {window[1]}: {e.api_error_message()}")
+                yield window, None
+        
+        deadline = time.time() + settings.FACEBOOK_ASYNC_INSIGHTS_TIMEOUT_SECONDS
+        while pending:
+            time.sleep(settings.FACEBOOK_ASYNC_INSIGHTS_POLL_SECONDS)
+            for window, job in list(pending.items()):
+                try:
+                    job.api_get(fields=[
+                        AdReportRun.Field.async_status,
+                        AdReportRun.Field.async_percent_completion,
+                    ])
+                except FacebookRequestError as e:
+                    _log_print(f"   ⚠️  查询异步报表状态失败 {window[0]} 到 {window[1]}: {e.api_error_message()}")
+                    continue
+                
+                status = job.get(AdReportRun.Field.async_status)
+                if status == 'Job Completed':
+                    del pending[window]
+                    _log_print(f"   ✅ 异步报表完成 {window[0]} 到 {window[1]}")
+                    yield window, job.get_insights(params={'limit': limit if limit else 1000})
+                elif status in ('Job Failed', 'Job Skipped'):
+                    del pending[window]
+                    _log_print(f"   ⚠️  异步报表{status} {window[0]} 到 {window[1]}，回退到同步读取")
+                    yield window, None
+                else:
+                    _log_print(
+                        f"   ⏳ 异步报表进度 {window[0]} 到 {window[1]}: "
+                        f"{status} {job.get(AdReportRun.Field.async_percent_completion, 0)}%"
+                    )
+            
+            if pending and time.time() > deadline:
+                for window in list(pending):
+                    _log_print(f"   ⚠️  异步报表超时 {window[0]} 到 {window[1]}，回退到同步读取")
+                    del pending[window]
+                    yield window, None
     
-    def _fetch_single_batch(
+    def _fetch_ads_data_async(
         self,
         start_date: str,
         end_date: str,
@@ -874,151 +1188,59 @@ class FacebookAdsDataSyncService(BaseSyncService):
         limit: int = None
     ) -> Tuple[bool, List[Tuple], str]:
         """
-        获取单个批次的数据（内部方法）
+        使用异步报表获取大日期范围的广告数据
+        
+        每 FACEBOOK_ASYNC_INSIGHTS_DAYS_PER_JOB 天一个服务端任务，任务完成即读取结果；
+        创意和预览在所有窗口读取完成后按去重后的 ad_id 统一获取一次。
         
-        Args:
-            start_date: 开始日期
-            end_date: 结束日期
-            account_id: 广告账户ID
-            limit: 限制获取的广告数量
-            
         Returns:
             (成功标志, 数据列表, 错误信息)
         """
-        try:
-            # 获取广告insights
-            insights = self.ad_account.get_insights(
-                fields=[
-                    'ad_id',
-                    'ad_name',
-                    'adset_id',
-                    'adset_name',
-                    'campaign_id',
-                    'campaign_name',
-                    'impressions',
-                    'spend',
-                    'clicks',
-                    'reach',
-                    'actions',
-                    'unique_actions',
-                    'action_values',
-                    'purchase_roas'
-                ],
-                params={
-                    'level': 'ad',
-                    'time_range': {
-                        'since': start_date,
-                        'until': end_date
-                    },
-                    'time_increment': 1,
-                    'filtering': [
-                        {
-                            'field': 'spend',
-                            'operator': 'GREATER_THAN',
-                            'value': 0
-                        }
-                    ],
-                    'limit': limit if limit else 1000
-                }
-            )
-            
-            # 处理数据
-            ads_list = []
-            ad_ids_set = set()
-            
-            for insight in insights:
-                try:
-                    spend = float(insight.get('spend', 0))
-                    if spend == 0:
-                        continue
-                    
-                    ad_id = insight.get('ad_id')
-                    ad_ids_set.add(ad_id)
-                    
-                    actions = {act.get('action_type'): int(act.get('value', 0))
-                              for act in insight.get('actions', [])}
-                    unique_actions = {act.get('action_type'): int(act.get('value', 0))
-                                     for act in insight.get('unique_actions', [])}
-                    
-                    purchase_roas = self._extract_purchase_roas(insight)
-                    date = insight.get('date_start')
-                    
-                    ad_data = {
-                        'ad_id': ad_id,
-                        'ad_name': insight.get('ad_name'),
-                        'adset_id': insight.get('adset_id'),
-                        'adset_name': insight.get('adset_name'),
-                        'campaign_id': insight.get('campaign_id'),
-                        'campaign_name': insight.get('campaign_name'),
-                        'impressions': int(insight.get('impressions', 0)),
-                        'spend': spend,
-                        'clicks': int(insight.get('clicks', 0)),
-                        'reach': int(insight.get('reach', 0)),
-                        'purchase_roas': purchase_roas,
-                        'purchase': actions.get('purchase', 0),
-                        'add_to_cart': actions.get('add_to_cart', 0),
-                        'add_payment_info': actions.get('add_payment_info', 0),
-                        'unique_link_click': unique_actions.get('link_click', 0),
-                        'date': date
-                    }
-                    
-                    ads_list.append(ad_data)
-                    
-                except Exception as e:
-                    continue
-            
-            if not ads_list:
-                return True, [], ""
-            
-            # 获取创意和预览信息
-            ad_ids = list(ad_ids_set)
-            
-            if self.USE_BATCH_API:
-                creative_info, preview_info = self.get_batch_creatives_and_previews(ad_ids)
-            else:
-                creative_info = self.get_ad_creatives_batch(ad_ids)
-                if self.ENABLE_PREVIEW:
-                    preview_info = self.get_ad_previews_batch(ad_ids)
-                else:
-                    preview_info = {}
-            
-            # 生成数据记录
-            all_data_tuples = []
-            for ad_data in ads_list:
-                ad_id = ad_data['ad_id']
-                image_url = creative_info.get(ad_id, {}).get('image_url')
-                preview_body = preview_info.get(ad_id, {}).get('body') if preview_info else None
-                
-                all_data_tuples.append((
-                    ad_data['campaign_id'],
-                    ad_data['adset_id'],
-                    ad_data['ad_id'],
-                    account_id,
-                    ad_data['campaign_name'],
-                    ad_data['adset_name'],
-                    ad_data['ad_name'],
-                    ad_data['impressions'],
-                    ad_data['spend'],
-                    ad_data['clicks'],
-                    ad_data['purchase_roas'],
-                    ad_data['reach'],
-                    ad_data['unique_link_click'],
-                    ad_data['add_to_cart'],
-                    ad_data['add_payment_info'],
-                    ad_data['purchase'],
-                    image_url,           # 17. image_url
-                    preview_body,        # 18. preview_url
-                    ad_data['date']      # 19. createtime (日期)
-                ))
-            
-            return True, all_data_tuples, ""
-            
-        except FacebookRequestError as e:
-            error_msg = f"API请求失败 (代码: {e.api_error_code()}): {e.api_error_message()}"
-            return False, [], error_msg
-        except Exception as e:
-            error_msg = f"获取数据失败: {str(e)}"
-            return False, [], error_msg
+        windows = self._split_date_windows(start_date, end_date, settings.FACEBOOK_ASYNC_INSIGHTS_DAYS_PER_JOB)
+        _log_print(f"🧾 使用异步报表获取 {start_date} 到 {end_date}（{len(windows)} 个任务）")
+        
+        self.perf_stats.start_timer("异步报表 Insights")
+        ads_list = []
+        fallback_windows = []
+        for window, insights in self.iter_async_insights(windows, limit):
+            if insights is None:
+                fallback_windows.append(window)
+                continue
+            try:
+                ads_list.extend(self._parse_insights(insights))
+            except FacebookRequestError as e:
+                fallback_windows.append(window)
+                _log_print(f"   ⚠️  读取异步报表 {window[0]} 到 {window[1]} 失败: {e.api_error_message()}")
+        self.perf_stats.end_timer("异步报表 Insights")
+        
+        # 回退：按7天分片并发同步读取失败的窗口
+        failed_windows = []
+        if fallback_windows:
+            chunks = [
+                chunk
+                for window in fallback_windows
+                for chunk in self._split_date_windows(window[0], window[1], 7)
+            ]
+            rows, failed = self._fetch_insight_chunks(chunks, limit)
+            ads_list.extend(rows)
+            failed_windows = [window for window, _ in failed]
+            self.failed_windows.extend(failed_windows)
+        
+        if failed_windows and not ads_list:
+            return False, [], f"{len(failed_windows)} 个日期窗口读取失败"
+        if failed_windows:
+            _log_print(f"   ⚠️  失败窗口: {', '.join(f'{s}~{e}' for s, e in failed_windows)}")
+        if not ads_list:
+            return True, [], ""
+        
+        ad_ids = list({ad_data['ad_id'] for ad_data in ads_list})
+        self.perf_stats.start_timer("获取创意和预览")
+        self._fetch_creatives_and_previews(ad_ids)
+        self.perf_stats.end_timer("获取创意和预览")
+        
+        all_data_tuples = self._build_data_tuples(ads_list, account_id)
+        _log_print(f"\n✅ 异步报表数据获取完成：{len(ad_ids)} 个广告，{len(all_data_tuples)} 条记录")
+        return True, all_data_tuples, ""
     
     def fetch_ads_data_optimized(
         self, 
@@ -1028,8 +1250,9 @@ class FacebookAdsDataSyncService(BaseSyncService):
         limit: int = None
     ) -> Tuple[bool, List[Tuple], str]:
         """
-        从 Facebook Ads API 获取广告数据（优化版本 - 支持日期分片）
-        使用账户级别的 Insights API 获取广告数据，自动将大的日期范围分割成小批次
+        从 Facebook Ads API 获取广告数据（优化版本 - 支持日期分片和异步报表）
+        使用账户级别的 Insights API 获取广告数据；超过7天的范围使用异步报表任务
+        （未启用时自动将大的日期范围分割成小批次同步读取）
         
         Args:
             start_date: 开始日期
@@ -1043,15 +1266,23 @@ class FacebookAdsDataSyncService(BaseSyncService):
         if not self.api_initialized or not self.ad_account:
             return False, [], "Facebook API 未初始化"
         
+        self.failed_windows = []
         try:
             # 计算日期范围天数
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
             end_dt = datetime.strptime(end_date, '%Y-%m-%d')
             total_days = (end_dt - start_dt).days + 1
             
-            # 如果日期范围超过7天，分批处理（每批7天）
+            # 如果日期范围超过7天，使用异步报表或分批处理（每批7天）
             MAX_DAYS_PER_BATCH = 7
             
+            if (
+                settings.FACEBOOK_ASYNC_INSIGHTS_ENABLED
+                and total_days > MAX_DAYS_PER_BATCH
+                and total_days >= settings.FACEBOOK_ASYNC_INSIGHTS_MIN_DAYS
+            ):
+                return self._fetch_ads_data_async(start_date, end_date, account_id, limit)
+            
             if total_days > MAX_DAYS_PER_BATCH:
                 _log_print(f"📆 日期范围较大（{total_days}天），将分成 {(total_days + MAX_DAYS_PER_BATCH - 1) // MAX_DAYS_PER_BATCH} 批处理...")
                 return self._fetch_ads_data_in_batches(start_date, end_date, account_id, limit, MAX_DAYS_PER_BATCH)
@@ -1059,175 +1290,25 @@ class FacebookAdsDataSyncService(BaseSyncService):
             # 使用账户级别的insights API，获取广告的效果数据
             _log_print("⚡ 正在批量获取广告效果数据...")
             self.perf_stats.start_timer("获取 Insights 数据")
-
-            # 获取广告insights（Ad级别）
-            insights = self.ad_account.get_insights(
-                fields=[
-                    'ad_id',
-                    'ad_name',
-                'adset_id',
-                    'adset_name',
-                'campaign_id',
-                    'campaign_name',
-                    'impressions',
-                    'spend',
-                    'clicks',
-                    'reach',
-                    'actions',
-                    'unique_actions',  # 独立操作（包括独立链接点击）
-                    'action_values',
-                    'purchase_roas'
-                ],
-                params={
-                    'level': 'ad',  # 获取广告级别的数据
-                    'time_range': {
-                        'since': start_date,
-                        'until': end_date
-                    },
-                    'time_increment': 1,  # 按天返回数据（重要！）
-                    'filtering': [
-                        {
-                            'field': 'spend',
-                            'operator': 'GREATER_THAN',
-                            'value': 0
-                        }
-                    ],
-                    'limit': limit if limit else 1000  # 限制获取条数
-                }
-            )
-
+            ads_list = self._fetch_insight_rows(start_date, end_date, limit)
             self.perf_stats.end_timer("获取 Insights 数据")
-
-            _log_print("📥 正在处理数据...")
-            self.perf_stats.start_timer("处理 Insights 数据")
-
-            ads_list = []
-            ad_ids_set = set()  # 使用set收集唯一的ad_id用于获取创意和预览
+            
+            # 收集唯一的ad_id用于获取创意和预览
+            ad_ids = list({ad_data['ad_id'] for ad_data in ads_list})
+            total_spend = sum(ad_data['spend'] for ad_data in ads_list)
             all_data_tuples = []
-            total_spend = 0
-
-            # 处理所有insights数据
-            # 注意：添加了time_increment: 1后，API会为每个广告的每一天返回一条记录
-            # 例如：7天数据，每个广告会返回7条记录
-            for i, insight in enumerate(insights, 1):
-                try:
-                    # 提取花费
-                    spend = float(insight.get('spend', 0))
-
-                    # 只处理花费大于0的广告
-                    if spend == 0:
-                        continue
-
-                    total_spend += spend
-                    ad_id = insight.get('ad_id')
-                    ad_ids_set.add(ad_id)  # 收集唯一的ad_id
-
-                    # 提取actions数据
-                    actions = {act.get('action_type'): int(act.get('value', 0))
-                              for act in insight.get('actions', [])}
-                    unique_actions = {act.get('action_type'): int(act.get('value', 0))
-                                     for act in insight.get('unique_actions', [])}
-
-                    # 提取purchase_roas
-                    purchase_roas = self._extract_purchase_roas(insight)
-
-                    # 获取日期（API返回的date_start字段）
-                    date = insight.get('date_start')  # 格式：YYYY-MM-DD
-
-                    # 组装广告数据（包含日期）
-                    ad_data = {
-                        'ad_id': ad_id,
-                        'ad_name': insight.get('ad_name'),
-                        'adset_id': insight.get('adset_id'),
-                        'adset_name': insight.get('adset_name'),
-                        'campaign_id': insight.get('campaign_id'),
-                        'campaign_name': insight.get('campaign_name'),
-                        'impressions': int(insight.get('impressions', 0)),
-                        'spend': spend,
-                        'clicks': int(insight.get('clicks', 0)),
-                        'reach': int(insight.get('reach', 0)),
-                        'purchase_roas': purchase_roas,
-                        'purchase': actions.get('purchase', 0),
-                        'add_to_cart': actions.get('add_to_cart', 0),
-                        'add_payment_info': actions.get('add_payment_info', 0),
-                        'unique_link_click': unique_actions.get('link_click', 0),
-                        'date': date  # 添加日期字段
-                    }
-
-                    ads_list.append(ad_data)
-
-                    # 每处理100条显示一次进度
-                    if i % 100 == 0:
-                        _log_print(f"   已处理 {i} 条广告数据...")
-
-                except Exception as e:
-                    _log_print(f"   ⚠️  处理第 {i} 条数据时出错: {e}")
-                    continue
-                
-            self.perf_stats.end_timer("处理 Insights 数据")
             
-            # 转换为列表用于获取创意和预览
-            ad_ids = list(ad_ids_set)
-
             # 获取广告创意和预览信息
             if ads_list and ad_ids:
                 _log_print()
-
-                # 启动性能计时
                 self.perf_stats.start_timer("获取创意和预览")
-
-                if self.USE_BATCH_API:
-                    # 使用Batch API同时获取创意和预览（最快方式）
-                    creative_info, preview_info = self.get_batch_creatives_and_previews(ad_ids)
-                else:
-                    # 使用传统并发方式分别获取
-                    creative_info = self.get_ad_creatives_batch(ad_ids)
-                    if self.ENABLE_PREVIEW:
-                        preview_info = self.get_ad_previews_batch(ad_ids)
-                    else:
-                        preview_info = {}
-
+                self._fetch_creatives_and_previews(ad_ids)
                 self.perf_stats.end_timer("获取创意和预览")
-
+                
                 # 将创意和预览信息合并到广告数据中，生成最终数据记录
                 _log_print("📝 正在生成数据记录...")
                 self.perf_stats.start_timer("生成数据记录")
-                
-                # 初始化数据列表
-                all_data_tuples = []
-                
-                # 批量处理，减少循环开销
-                # 注意：ads_list中的每条记录已经包含了具体的日期（date字段）
-                for ad_data in ads_list:
-                    ad_id = ad_data['ad_id']
-                    
-                    # 获取图片URL和预览（使用 get 方法避免多次查找）
-                    image_url = creative_info.get(ad_id, {}).get('image_url')
-                    preview_body = preview_info.get(ad_id, {}).get('body') if preview_info else None
-                    
-                    # 创建一条记录（不需要循环日期，因为数据已经按天分开了）
-                    all_data_tuples.append((
-                        ad_data['campaign_id'],
-                        ad_data['adset_id'],
-                        ad_data['ad_id'],
-                        account_id,
-                        ad_data['campaign_name'],
-                        ad_data['adset_name'],
-                        ad_data['ad_name'],
-                        ad_data['impressions'],
-                        ad_data['spend'],
-                        ad_data['clicks'],
-                        ad_data['purchase_roas'],
-                        ad_data['reach'],
-                        ad_data['unique_link_click'],
-                        ad_data['add_to_cart'],
-                        ad_data['add_payment_info'],
-                        ad_data['purchase'],
-                        image_url,
-                        preview_body,
-                        ad_data['date']  # 使用API返回的具体日期
-                    ))
-                
+                all_data_tuples = self._build_data_tuples(ads_list, account_id)
                 self.perf_stats.end_timer("生成数据记录")
 
             _log_print(f"\n✅ 数据获取完成！")
@@ -1265,7 +1346,8 @@ class FacebookAdsDataSyncService(BaseSyncService):
         """
         if account_id:
             delete_query = text(
-                f"DELETE FROM {self.table_name} WHERE createtime BETWEEN :start_date AND :end_date AND account_id = :account_id"
+                f"DELETE FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+                f"WHERE createtime BETWEEN :start_date AND :end_date AND account_id = :account_id"
             )
             self.db.execute(delete_query, {"start_date": start_date, "end_date": end_date, "account_id": account_id})
             _log_print(f"🗑️  已删除账户 {account_id} 日期范围 {start_date} 到 {end_date} 的数据")
@@ -1273,67 +1355,46 @@ class FacebookAdsDataSyncService(BaseSyncService):
             # 如果没有指定账户ID，调用父类方法
             super().delete_data_in_range(start_date, end_date)
     
+    def _tuples_to_dicts(self, data_list: List[Tuple]) -> List[Dict[str, Any]]:
+        """将数据记录元组转换为写库用的字典"""
+        data_dicts = []
+        for r in data_list:
+            # 确保数据结构正确
+            if len(r) >= 19:
+                # 旧格式：包含 image_url 和 preview_url，创意转入维度表
+                with self._pending_creatives_lock:
+                    self._pending_creatives[r[2]] = (r[16], r[17])
+                createtime = r[18]
+            elif len(r) == 17:
+                createtime = r[16]
+            else:
+                _log_print(f"   ⚠️  警告: 数据长度异常 (长度={len(r)}), 跳过此条")
+                continue
+            
+            data_dicts.append({
+                'campaign_id': r[0], 'adset_id': r[1], 'ad_id': r[2], 'account_id': r[3],
+                'campaign_name': r[4], 'adset_name': r[5], 'ad_name': r[6],
+                'impression': r[7], 'spend': r[8], 'clicks': r[9],
+                'purchases_roas': r[10], 'reach': r[11], 'unique_link_clicks': r[12],
+                'adds_to_cart': r[13], 'adds_payment_info': r[14], 'purchases': r[15],
+                'createtime': createtime
+            })
+        return data_dicts
+    
     def insert_data(self, data_list: List[Tuple], start_date: str, end_date: str, account_id: str = None) -> Tuple[bool, int, str]:
-        """批量插入数据（插入前先删除指定日期区间和账户的数据）"""
-        if not data_list:
-            return True, 0, "没有数据需要插入"
+        """
+        批量写入数据（按 SYNC_WRITE_MODE 覆盖或增量写入指定日期区间和账户的数据）
         
+        data_list 为空时仍按空窗口写入，删除上游已消失的行
+        """
         try:
-            # 删除指定日期区间和账户的数据
-            self.delete_data_in_range(start_date, end_date, account_id)
-            
-            # 批量插入新数据（包括 image_url 和 preview_url）
-            insert_query = text("""
-                INSERT INTO fact_bi_ads_facebook_campaign (
-                    campaign_id, adset_id, ad_id, account_id,
-                    campaign_name, adset_name, ad_name,
-                    impression, spend, clicks, 
-                    purchases_roas, reach, unique_link_clicks, adds_to_cart, 
-                    adds_payment_info, purchases, image_url, preview_url, createtime
-                )
-                VALUES (
-                    :campaign_id, :adset_id, :ad_id, :account_id,
-                    :campaign_name, :adset_name, :ad_name,
-                    :impression, :spend, :clicks,
-                    :purchases_roas, :reach, :unique_link_clicks, :adds_to_cart,
-                    :adds_payment_info, :purchases, :image_url, :preview_url, :createtime
-                )
-            """)
-            
-            data_dicts = []
-            for r in data_list:
-                # 确保数据结构正确
-                if len(r) >= 19:
-                    # 新格式：包含 image_url 和 preview_url
-                    data_dict = {
-                        'campaign_id': r[0], 'adset_id': r[1], 'ad_id': r[2], 'account_id': r[3],
-                        'campaign_name': r[4], 'adset_name': r[5], 'ad_name': r[6],
-                        'impression': r[7], 'spend': r[8], 'clicks': r[9],
-                        'purchases_roas': r[10], 'reach': r[11], 'unique_link_clicks': r[12],
-                        'adds_to_cart': r[13], 'adds_payment_info': r[14], 'purchases': r[15],
-                        'image_url': r[16],
-                        'preview_url': r[17],
-                        'createtime': r[18]
-                    }
-                elif len(r) == 17:
-                    # 旧格式：不包含 image_url 和 preview_url
-                    data_dict = {
-                        'campaign_id': r[0], 'adset_id': r[1], 'ad_id': r[2], 'account_id': r[3],
-                        'campaign_name': r[4], 'adset_name': r[5], 'ad_name': r[6],
-                        'impression': r[7], 'spend': r[8], 'clicks': r[9],
-                        'purchases_roas': r[10], 'reach': r[11], 'unique_link_clicks': r[12],
-                        'adds_to_cart': r[13], 'adds_payment_info': r[14], 'purchases': r[15],
-                        'image_url': None,
-                        'preview_url': None,
-                        'createtime': r[16]
-                    }
-                else:
-                    _log_print(f"   ⚠️  警告: 数据长度异常 (长度={len(r)}), 跳过此条")
-                    continue
-                
-                data_dicts.append(data_dict)
-            
-            count = self.batch_insert(insert_query, data_dicts, batch_size=self.DB_BATCH_SIZE)
+            data_dicts = self._tuples_to_dicts(data_list)
+            scope = {"account_id": account_id} if account_id else None
+            count = self.write_rows(data_dicts, start_date, end_date, scope, batch_size=self.DB_BATCH_SIZE)
+            self.track_written_rows(data_dicts)
+            self.flush_creative_dimension(account_id)
+            self.refresh_rollups(start_date, end_date, account_id)
+            self.notify_data_changed(start_date, end_date, account_id)
             return True, count, ""
             
         except Exception as e:
@@ -1342,6 +1403,139 @@ class FacebookAdsDataSyncService(BaseSyncService):
             self.db.rollback()
             return False, 0, error_msg
     
+    def stream_ads_to_database(
+        self,
+        start_date: str,
+        end_date: str,
+        account_id: str = None,
+        limit: int = None
+    ) -> Tuple[bool, int, str]:
+        """
+        流式同步：Insights 页面 → 转换（补充创意/预览）→ 写库 三段通过有界队列并行执行
+        
+        后续页面仍在读取时前面的批次已写入数据库，在途行数不超过
+        FACEBOOK_STREAMING_MAX_INFLIGHT_ROWS，峰值内存与日期范围大小无关。
+        创意和预览按 ad_id 去重，只对首次出现的广告获取一次。
+        
+        Returns:
+            (成功标志, 写入的记录数, 错误信息)
+        """
+        if not self.api_initialized or not self.ad_account:
+            return False, 0, "Facebook API 未初始化"
+        
+        batch_rows = max(1, settings.FACEBOOK_STREAMING_BATCH_ROWS)
+        
+        def stream_rows(insights, emit) -> None:
+            batch = []
+            for insight in insights:
+                try:
+                    ad_data = self._parse_insight_row(insight)
+                except Exception as e:
+                    _log_print(f"   ⚠️  处理数据时出错: {e}")
+                    continue
+                if ad_data:
+                    batch.append(ad_data)
+                    if len(batch) >= batch_rows:
+                        emit(batch)
+                        batch = []
+            emit(batch)
+        
+        def chunk_task(window: Tuple[str, str]):
+            def run(emit) -> None:
+                timer_key = f"流式读取 Insights ({window[0]} ~ {window[1]})"
+                self.perf_stats.start_timer(timer_key)
+                try:
+                    stream_rows(self.ad_account.get_insights(
+                        fields=self.INSIGHTS_FIELDS,
+                        params=self._insights_params(window[0], window[1], limit)
+                    ), emit)
+                finally:
+                    self.perf_stats.end_timer(timer_key)
+            return run
+        
+        def async_task(windows: List[Tuple[str, str]]):
+            def run(emit) -> None:
+                for window, insights in self.iter_async_insights(windows, limit):
+                    if insights is not None:
+                        stream_rows(insights, emit)
+                        continue
+                    for chunk in self._split_date_windows(window[0], window[1], 7):
+                        chunk_task(chunk)(emit)
+            return run
+        
+        total_days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if settings.FACEBOOK_ASYNC_INSIGHTS_ENABLED and total_days >= max(8, settings.FACEBOOK_ASYNC_INSIGHTS_MIN_DAYS):
+            fetch_tasks = [async_task(self._split_date_windows(
+                start_date, end_date, settings.FACEBOOK_ASYNC_INSIGHTS_DAYS_PER_JOB
+            ))]
+        else:
+            fetch_tasks = [chunk_task(window) for window in self._split_date_windows(start_date, end_date, 7)]
+        
+        enriched_ids = set()
+        
+        def transform(ads_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            new_ids = list({ad_data['ad_id'] for ad_data in ads_batch} - enriched_ids)
+            if new_ids:
+                self._fetch_creatives_and_previews(new_ids)
+                enriched_ids.update(new_ids)
+            return self._tuples_to_dicts(self._build_data_tuples(ads_batch, account_id))
+        
+        scope = {"account_id": account_id} if account_id else None
+        pipeline = StreamingPipeline(
+            settings.FACEBOOK_STREAMING_MAX_INFLIGHT_ROWS,
+            batch_rows,
+            fetch_workers=settings.FACEBOOK_INSIGHTS_CHUNK_WORKERS,
+        )
+        _log_print(
+            f"🌊 流式同步 {start_date} 到 {end_date}: {len(fetch_tasks)} 个读取任务 | "
+            f"每批 {batch_rows} 条 | 最多在途 {settings.FACEBOOK_STREAMING_MAX_INFLIGHT_ROWS} 条"
+        )
+        
+        writer = None
+        
+        def write(rows: List[Dict[str, Any]]) -> None:
+            writer.write(rows)
+            self.track_written_rows(rows)
+        
+        try:
+            writer = self.open_window_writer(start_date, end_date, scope, batch_size=self.DB_BATCH_SIZE)
+            stats = pipeline.run(fetch_tasks, transform, write)
+            count = writer.finish()
+        except FacebookRequestError as e:
+            if writer:
+                writer.abort()
+            error_msg = f"API请求失败 (代码: {e.api_error_code()}): {e.api_error_message()}"
+            _log_print(f"❌ {error_msg}")
+            return False, 0, error_msg
+        except Exception as e:
+            if writer:
+                writer.abort()
+            error_msg = f"流式同步失败: {str(e)}"
+            _log_print(f"❌ {error_msg}")
+            return False, 0, error_msg
+        
+        _log_print(
+            f"✅ 流式同步完成: 读取 {stats['rows_fetched']} 条 | 写入 {count} 条 | "
+            f"{len(enriched_ids)} 个广告 | 背压等待 {stats['producer_waits']} 次 | "
+            f"队列峰值 {stats['max_queued_batches']} 批"
+        )
+        self.flush_creative_dimension(account_id)
+        self.refresh_rollups(start_date, end_date, account_id)
+        self.notify_data_changed(start_date, end_date, account_id)
+        return True, count, ""
+    
+    def refresh_rollups(self, start_date: str, end_date: str, account_id: str = None) -> None:
+        """刷新同步窗口内的日汇总表（失败只记录日志，不影响明细同步结果）"""
+        if not settings.FACEBOOK_ROLLUP_ENABLED:
+            return
+        self.perf_stats.start_timer("汇总表刷新")
+        try:
+            FacebookRollupService(self.db).refresh(start_date, end_date, account_id)
+        except Exception as e:
+            _log_print(f"❌ 刷新 Facebook 日汇总表失败（看板将读取到旧汇总，可执行回填脚本修复）: {e}")
+        finally:
+            self.perf_stats.end_timer("汇总表刷新")
+    
     def _create_error_result(self, message: str, error: str = None) -> Dict[str, Any]:
         """创建错误结果字典"""
         return self.create_sync_result(False, message, 0, [error or message])
@@ -1355,7 +1549,9 @@ class FacebookAdsDataSyncService(BaseSyncService):
         max_workers: int = 10,
         account_id_for_db: str = None,
         limit: int = None,
-        proxy_url: str = None
+        proxy_url: str = None,
+        skip_fresh_seconds: int = 0,
+        detect_changes: bool = False
     ) -> Dict[str, Any]:
         """
         同步广告数据（优化版本）
@@ -1368,11 +1564,14 @@ class FacebookAdsDataSyncService(BaseSyncService):
             max_workers: 并发线程数（默认10，用于fallback模式）
             account_id_for_db: 账户ID（不带act_前缀，用于保存到数据库）
             limit: 限制获取的广告数量（None表示获取全部）
+            skip_fresh_seconds: 大于 0 时跳过在该时间内已成功同步的日期（需启用 SYNC_STATE_ENABLED）
+            detect_changes: 先用一次账户级按天汇总请求做变化检测，只对汇总变化的日期读取广告级数据
             
         Returns:
             同步结果
             
-        注意: 会自动覆盖指定日期范围内的现有数据
+        注意: 会自动覆盖指定日期范围内的现有数据；
+        启用同步状态时按天记录结果，失败或中断的日期在下次同步时优先重试
         
         性能优化：
         - 使用账户级别 Insights API 一次性获取所有广告数据（速度快10-15倍）
@@ -1386,11 +1585,11 @@ class FacebookAdsDataSyncService(BaseSyncService):
         _log_print(f"📅 日期范围: {start_date} 到 {end_date}")
         _log_print(f"⚙️  性能配置: {self.performance_profile.upper()}")
         _log_print(f"{'─'*60}")
-        _log_print(f"🔧 优化模式: {'Batch API' if self.USE_BATCH_API else f'高并发线程池 ({self.MAX_CONCURRENT_WORKERS} 线程)'}")
+        _log_print(f"🔧 优化模式: {self._fetch_mode_label()}")
         _log_print(f"📸 获取预览: {'是' if self.ENABLE_PREVIEW else '否'}")
         _log_print(f"🌐 HTTP连接池: {self.CONNECTION_POOL_SIZE} 连接 | 超时: {self.REQUEST_TIMEOUT}秒")
         _log_print(f"💾 数据库批次: {self.DB_BATCH_SIZE} 条/批")
-        _log_print(f"💿 缓存TTL: {self.CACHE_TTL}秒 ({self.CACHE_TTL//3600}小时)")
+        _log_print(f"💿 创意存储: 内存 {settings.FACEBOOK_CREATIVE_MEMORY_ENTRIES} 条 / {self.CACHE_TTL}秒 | Redis {settings.FACEBOOK_CREATIVE_STORE_TTL_SECONDS // 86400}天")
         _log_print(f"⚠️  注意: 将覆盖此日期范围内的现有数据")
         _log_print(f"{'='*60}\n")
 
@@ -1406,23 +1605,29 @@ class FacebookAdsDataSyncService(BaseSyncService):
         # 确定保存到数据库的账户ID（不带前缀）
         final_account_id_for_db = account_id_for_db if account_id_for_db else ad_account_id.replace('act_', '')
         
-        success, data_list, error_msg = self.fetch_ads_data_optimized(
-            start_date, end_date, final_account_id_for_db, limit
-        )
-        
-        if not success:
-            return self._create_error_result(error_msg or "获取数据失败", error_msg)
-        
-        _log_print(f"✅ 成功获取 {len(data_list)} 条广告数据")
+        segments = self.plan_sync_segments(final_account_id_for_db, start_date, end_date, skip_fresh_seconds)
+        self.day_fingerprints = {}
+        if detect_changes and segments and settings.SYNC_STATE_ENABLED:
+            segments = self._skip_unchanged_days(final_account_id_for_db, segments)
+        if not segments:
+            _log_print("✅ 所有日期均在近期成功同步，本次跳过")
         
-        # 插入数据
-        _log_print("\n💾 写入数据库...")
-        self.perf_stats.start_timer("数据库插入")
-        success, count, error_msg = self.insert_data(data_list, start_date, end_date, final_account_id_for_db)
-        self.perf_stats.end_timer("数据库插入")
+        count = 0
+        errors = []
+        for segment_start, segment_end in segments:
+            if len(segments) > 1:
+                _log_print(f"\n📆 同步区间 {segment_start} 到 {segment_end}")
+            self.begin_sync_segment(final_account_id_for_db, segment_start, segment_end)
+            success, segment_count, error_msg, failed_days = self._sync_window(
+                segment_start, segment_end, final_account_id_for_db, limit
+            )
+            self.finish_sync_segment(final_account_id_for_db, segment_start, segment_end, failed_days, error_msg)
+            count += segment_count
+            if failed_days:
+                errors.append(error_msg or f"{segment_start} 到 {segment_end} 中 {len(failed_days)} 天读取失败")
         
-        if not success:
-            return self._create_error_result(error_msg or "插入数据失败", error_msg)
+        if errors and not count:
+            return self.create_sync_result(False, errors[0], 0, errors)
         
         elapsed_time = time.time() - start_time
         
@@ -1431,7 +1636,7 @@ class FacebookAdsDataSyncService(BaseSyncService):
         _log_print(f"📊 共同步 {count} 条广告记录（包含每天的数据）")
         _log_print(f"⏱️  总耗时: {elapsed_time:.2f} 秒")
         _log_print(f"⚡ 平均速度: {count/elapsed_time:.2f} 条/秒")
-        _log_print(f"🔧 优化模式: {'Batch API' if self.USE_BATCH_API else f'高并发线程池 ({self.MAX_CONCURRENT_WORKERS} 线程)'}")
+        _log_print(f"🔧 优化模式: {self._fetch_mode_label()}")
         
         # 性能提示
         if elapsed_time > 0 and count > 0:
@@ -1458,11 +1663,160 @@ class FacebookAdsDataSyncService(BaseSyncService):
             _log_print(f"  缓存命中: {self.cache_hits} 次")
             _log_print(f"  缓存未命中: {self.cache_misses} 次")
             _log_print(f"  缓存命中率: {cache_hit_rate:.1f}%")
-            cache_stats = self.cache.get_stats()
-            _log_print(f"  缓存总条目: {cache_stats['total']} (有效: {cache_stats['valid']}, 过期: {cache_stats['expired']})")
+            _log_print(f"  版本查询请求: {self.version_requests} 次")
+            store_stats = self.creative_store.get_stats()
+            _log_print(
+                f"  创意存储（累计）: 内存命中 {store_stats['memory_hits']} | Redis命中 {store_stats['redis_hits']} | "
+                f"未命中 {store_stats['misses']} | 无版本 {store_stats['unversioned']} | "
+                f"命中率 {store_stats['hit_rate']} | 内存条目 {store_stats['memory_entries']}"
+                f"{'' if store_stats['redis_enabled'] else ' (Redis 不可用)'}"
+            )
             if cache_hit_rate > 0:
                 saved_requests = self.cache_hits
                 _log_print(f"  💡 节省了约 {saved_requests} 次API请求！")
             _log_print(f"{'='*60}\n")
         
+        # 显示限速统计
+        if self.rate_governor and settings.FACEBOOK_RATE_GOVERNOR_ENABLED:
+            governor_stats = self.rate_governor.get_stats()
+            _log_print(
+                f"🚦 限速统计: 并发 {governor_stats['concurrency']} | 速率 {governor_stats['rps']} 次/秒 | "
+                f"用量 {governor_stats['usage_pct']}% | 请求 {governor_stats['requests']} | "
+                f"限流 {governor_stats['throttled']} 次 | 暂停 {governor_stats['paused_seconds']} 秒"
+            )
+        
+        if errors:
+            return self.create_sync_result(
+                False, f"部分日期同步失败，已同步 {count} 条广告数据（耗时 {elapsed_time:.2f}秒）", count, errors
+            )
         return self.create_sync_result(True, f"成功同步 {count} 条广告数据（耗时 {elapsed_time:.2f}秒）", count)
+    
+    def fetch_daily_total_fingerprints(self, start_date: str, end_date: str) -> Dict[str, str]:
+        """
+        一次账户级 time_increment=1 请求获取每天的汇总，并计算每天的指纹
+        
+        汇总包含花费、展示、点击、触达、各类转化、独立转化（写入 unique_link_clicks）和 ROAS，任一指标变化指纹即变化；
+        没有返回数据的日期（无投放）使用空汇总的指纹
+        
+        Returns:
+            {日期: 指纹}
+        """
+        insights = self.ad_account.get_insights(
+            fields=['date_start', 'spend', 'impressions', 'clicks', 'reach', 'actions', 'unique_actions', 'purchase_roas'],
+            params={
+                'level': 'account',
+                'time_range': {'since': start_date, 'until': end_date},
+                'time_increment': 1,
+            }
+        )
+        totals = {}
+        for insight in insights:
+            actions = sorted(
+                f"{item.get('action_type')}={item.get('value')}" for item in insight.get('actions') or []
+            )
+            unique_actions = sorted(
+                f"{item.get('action_type')}={item.get('value')}" for item in insight.get('unique_actions') or []
+            )
+            roas = sorted(
+                f"{item.get('action_type')}={item.get('value')}" for item in insight.get('purchase_roas') or []
+            )
+            parts = [
+                insight.get('spend'), insight.get('impressions'), insight.get('clicks'), insight.get('reach'),
+                ','.join(actions), ','.join(unique_actions), ','.join(roas),
+            ]
+            totals[insight['date_start']] = hashlib.md5(
+                '\x1f'.join('' if part is None else str(part) for part in parts).encode('utf-8')
+            ).hexdigest()
+        empty = hashlib.md5('\x1f'.join([''] * 7).encode('utf-8')).hexdigest()
+        return {day: totals.get(day, empty) for day in date_range(start_date, end_date)}
+    
+    def _skip_unchanged_days(self, account_id: str, segments: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        变化检测：上次成功同步时记录的汇总指纹与本次一致的日期不再读取广告级数据
+        
+        检测请求失败时返回原区间（按完整窗口同步）
+        """
+        days = [day for segment in segments for day in date_range(*segment)]
+        start_date, end_date = min(days), max(days)
+        self.perf_stats.start_timer("变化检测")
+        try:
+            fingerprints = self.fetch_daily_total_fingerprints(start_date, end_date)
+            state_service = SyncStateService(self.db)
+            state = state_service.load(self.PLATFORM, account_id, start_date, end_date)
+        except Exception as e:
+            self.db.rollback()
+            _log_print(f"⚠️  变化检测失败，按完整窗口同步: {e}")
+            return segments
+        finally:
+            self.perf_stats.end_timer("变化检测")
+        
+        unchanged = [
+            day for day in days
+            if (state.get(day) or {}).get('status') == STATUS_SUCCESS
+            and state[day].get('source_fingerprint') == fingerprints.get(day)
+        ]
+        unchanged_days = set(unchanged)
+        changed = [day for day in days if day not in unchanged_days]
+        self.day_fingerprints = fingerprints
+        try:
+            state_service.mark_verified(self.PLATFORM, account_id, unchanged)
+        except Exception as e:
+            self.db.rollback()
+            _log_print(f"⚠️  写入同步状态失败: {e}")
+        _log_print(
+            f"🔍 变化检测: {len(days)} 天中 {len(changed)} 天汇总有变化需要重新读取，{len(unchanged)} 天未变化已跳过"
+        )
+        return to_segments(changed)
+    
+    def _sync_window(
+        self,
+        start_date: str,
+        end_date: str,
+        account_id: str,
+        limit: int = None
+    ) -> Tuple[bool, int, str, set]:
+        """
+        同步一个连续日期区间（流式或先取后写）
+        
+        先取后写模式下部分窗口读取失败时，只写入成功读取的连续日期，失败日期的现有数据保持不变
+        
+        Returns:
+            (成功标志, 写入的记录数, 错误信息, 失败的日期集合)
+        """
+        all_days = set(date_range(start_date, end_date))
+        if settings.FACEBOOK_STREAMING_SYNC_ENABLED:
+            # 流式同步：边读取边写库
+            self.perf_stats.start_timer("流式同步")
+            success, count, error_msg = self.stream_ads_to_database(start_date, end_date, account_id, limit)
+            self.perf_stats.end_timer("流式同步")
+            if not success:
+                return False, 0, error_msg or "流式同步失败", all_days
+            return True, count, "", set()
+        
+        success, data_list, error_msg = self.fetch_ads_data_optimized(start_date, end_date, account_id, limit)
+        if not success:
+            return False, 0, error_msg or "获取数据失败", all_days
+        
+        _log_print(f"✅ 成功获取 {len(data_list)} 条广告数据")
+        failed_days = {day for window in self.failed_windows for day in date_range(*window)} & all_days
+        write_segments = to_segments(day for day in date_range(start_date, end_date) if day not in failed_days)
+        
+        # 插入数据
+        _log_print("\n💾 写入数据库...")
+        self.perf_stats.start_timer("数据库插入")
+        count = 0
+        try:
+            for segment_start, segment_end in write_segments:
+                rows = data_list if not failed_days else [
+                    r for r in data_list if segment_start <= str(r[-1])[:10] <= segment_end
+                ]
+                success, segment_count, error_msg = self.insert_data(rows, segment_start, segment_end, account_id)
+                if not success:
+                    return False, count, error_msg or "插入数据失败", all_days
+                count += segment_count
+        finally:
+            self.perf_stats.end_timer("数据库插入")
+        
+        if failed_days:
+            return True, count, f"{len(failed_days)} 天读取失败: {', '.join(sorted(failed_days))}", failed_days
+        return True, count, "", set()
@@ -0,0 +1,337 @@
+"""
+Facebook Graph API 异步批量请求
+单线程事件循环 + 一个共享连接池（可用时启用 HTTP/2 多路复用），用信号量限制在途请求数，
+替代每次调用都新建几十上百个线程、每个线程阻塞等待一个 requests 调用的做法
+"""
+import asyncio
+import importlib.util
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Deque, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from app.services.facebook_rate_governor import (
+    APP_THROTTLE_ERROR_CODES,
+    THROTTLE_ERROR_CODES,
+    AccountRateGovernor,
+    pause_all_governors,
+)
+
+logger = logging.getLogger("app.services.facebook_async_client")
+
+GRAPH_API_URL = "https://graph.facebook.com/v21.0"
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # httpx 的 HTTP/2 支持依赖 h2 包
+MAX_BATCH_SIZE = 50  # Graph Batch API 单次最多 50 个子请求
+MIN_BATCH_SIZE = 5
+
+# 单个请求：(结果键, 相对路径, 查询参数)
+GraphRequest = Tuple[Hashable, str, Dict[str, Any]]
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    在同步代码中运行协程
+
+    调用线程没有事件循环时直接 asyncio.run；
+    已在事件循环中（如在 FastAPI 协程里直接调用同步服务）时改在一个独立线程中运行，避免嵌套事件循环
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fb-async") as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _error_code(payload: Any) -> Optional[int]:
+    error = payload.get("error") if isinstance(payload, dict) else None
+    return error.get("code") if isinstance(error, dict) else None
+
+
+def _is_throttle_payload(payload: Any) -> bool:
+    return _error_code(payload) in THROTTLE_ERROR_CODES
+
+
+def _is_throttled(response: httpx.Response, payload: Any) -> bool:
+    return response.status_code == 429 or _is_throttle_payload(payload)
+
+
+def _relative_url(path: str, params: Dict[str, Any]) -> str:
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+class AsyncGraphClient:
+    """Graph API 异步客户端（通过 async with 使用，连接池在上下文内共享）"""
+
+    def __init__(
+        self,
+        access_token: str,
+        max_concurrency: int = 50,
+        timeout: float = 30,
+        max_retries: int = 3,
+        governor: Optional[AccountRateGovernor] = None
+    ):
+        """
+        Args:
+            access_token: 访问令牌
+            max_concurrency: 最大在途请求数（同时也是连接池大小）
+            timeout: 单个请求超时（秒）
+            max_retries: 限流或网络错误时的最大尝试次数
+            governor: 账户限速器（为 None 时只受并发数限制）
+        """
+        self.access_token = access_token
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.governor = governor
+        self.http2 = HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"requests": 0, "failed": 0, "throttled": 0, "retries": 0, "batches": 0, "batch_size": 0}
+
+    async def __aenter__(self) -> "AsyncGraphClient":
+        # trust_env 默认开启，setup_proxy 设置的 HTTPS_PROXY 同样生效
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+        self._client = None
+
+    async def _send(self, path: str, params: Dict[str, Any], data: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """发送请求（data 不为 None 时为 POST 表单），经过账户限速器"""
+        url = f"{GRAPH_API_URL}/{path}"
+        if self.governor is None:
+            if data is not None:
+                return await self._client.post(url, params=params, data=data)
+            return await self._client.get(url, params=params)
+        async with self.governor.async_slot():
+            if data is not None:
+                response = await self._client.post(url, params=params, data=data)
+            else:
+                response = await self._client.get(url, params=params)
+        self.governor.observe_headers(response.headers)
+        return response
+
+    async def _throttled(self, attempt: int, payload: Any = None) -> None:
+        """限流：有限速器时暂停账户（应用级限流暂停所有账户），否则指数退避"""
+        self.stats["throttled"] += 1
+        if self.governor is not None:
+            seconds = self.governor.observe_throttle()
+            if _error_code(payload) in APP_THROTTLE_ERROR_CODES:
+                pause_all_governors(seconds)
+        else:
+            await asyncio.sleep(min(15 * (2 ** attempt), 60))
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        GET 请求（限流时暂停账户后重试，网络错误时短暂等待后重试）
+
+        Returns:
+            响应 JSON；重试用尽或返回错误时为 None
+        """
+        params = {**(params or {}), "access_token": self.access_token}
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                self.stats["requests"] += 1
+                if attempt:
+                    self.stats["retries"] += 1
+                try:
+                    response = await self._send(path, params)
+                    payload = response.json()
+                except (httpx.HTTPError, ValueError):
+                    await asyncio.sleep(2)
+                    continue
+                if _is_throttled(response, payload):
+                    await self._throttled(attempt, payload)
+                    continue
+                if response.status_code != 200:
+                    break
+                return payload
+        self.stats["failed"] += 1
+        return None
+
+    async def get_many(self, requests: List[GraphRequest], desc: str = "") -> Dict[Hashable, Optional[Any]]:
+        """
+        并发执行一组 GET 请求（在途数不超过 max_concurrency）
+
+        Returns:
+            {结果键: 响应 JSON 或 None}
+        """
+        results: Dict[Hashable, Optional[Any]] = {}
+        total = len(requests)
+        if not total:
+            return results
+        pending = iter(requests)
+        completed = 0
+        started = last_update = time.time()
+
+        async def worker() -> None:
+            # 固定数量的工作协程依次领取请求，不为每个请求创建任务
+            nonlocal completed, last_update
+            for key, path, params in pending:
+                results[key] = await self.get(path, params)
+                completed += 1
+                now = time.time()
+                if desc and (now - last_update >= 1.0 or completed == total):
+                    speed = completed / (now - started) if now > started else 0
+                    progress = '█' * int(completed / total * 30) + '░' * (30 - int(completed / total * 30))
+                    _log_print(f"   [{progress}] {completed}/{total} ({completed / total * 100:.1f}%) - {speed:.1f} 条/秒", end='\r')
+                    last_update = now
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, total))))
+        return results
+
+    async def batch_many(
+        self,
+        requests: List[GraphRequest],
+        batch_size: int = MAX_BATCH_SIZE,
+        max_inflight_batches: int = 4,
+        target_seconds: float = 8.0,
+        desc: str = ""
+    ) -> Dict[Hashable, Optional[Any]]:
+        """
+        通过 Batch API 执行一组 GET 请求
+
+        - 多个批次同时在途（仍受信号量和账户限速器约束）
+        - 失败的子请求单独重新排队，不影响同批次中成功的子请求
+        - 批次大小按响应耗时自适应：超过目标耗时或有子请求超时减半，低于目标一半时逐步放大
+
+        Args:
+            requests: 子请求列表
+            batch_size: 初始批次大小（上限 50）
+            max_inflight_batches: 同时在途的批次数
+            target_seconds: 单个批次的目标耗时（秒）
+            desc: 非空时输出进度
+
+        Returns:
+            {结果键: 子请求响应 JSON 或 None}
+        """
+        results: Dict[Hashable, Optional[Any]] = {}
+        total = len(requests)
+        if not total:
+            return results
+        queue: Deque[Tuple[GraphRequest, int]] = deque((request, 0) for request in requests)
+        outstanding = total  # 尚未得到最终结果的子请求数
+        size = max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, batch_size))
+        started = last_update = time.time()
+
+        def settle(key: Hashable, payload: Optional[Any]) -> None:
+            nonlocal outstanding
+            results[key] = payload
+            outstanding -= 1
+            if payload is None:
+                self.stats["failed"] += 1
+
+        def retry_or_fail(item: GraphRequest, attempt: int) -> None:
+            if attempt + 1 < self.max_retries:
+                self.stats["retries"] += 1
+                queue.append((item, attempt + 1))
+            else:
+                settle(item[0], None)
+
+        async def send_batch(batch: List[Tuple[GraphRequest, int]]) -> Tuple[Optional[httpx.Response], Any]:
+            body = [{"method": "GET", "relative_url": _relative_url(path, params)} for (_, path, params), _ in batch]
+            self.stats["requests"] += 1
+            self.stats["batches"] += 1
+            async with self._semaphore:
+                try:
+                    response = await self._send("", {}, data={"access_token": self.access_token, "batch": json.dumps(body)})
+                    return response, response.json()
+                except (httpx.HTTPError, ValueError):
+                    return None, None
+
+        async def worker() -> None:
+            nonlocal size, last_update
+            while outstanding > 0:
+                if not queue:
+                    # 其他批次仍在途，其中失败的子请求可能重新排队
+                    await asyncio.sleep(0.05)
+                    continue
+                batch = [queue.popleft() for _ in range(min(size, len(queue)))]
+                batch_started = time.time()
+                response, payload = await send_batch(batch)
+                elapsed = time.time() - batch_started
+                max_attempt = max(attempt for _, attempt in batch)
+
+                if response is None or response.status_code != 200 or not isinstance(payload, list):
+                    # 整个批次失败：所有子请求重新排队
+                    if response is not None and _is_throttled(response, payload):
+                        await self._throttled(max_attempt, payload)
+                    else:
+                        await asyncio.sleep(1)
+                    for item, attempt in batch:
+                        retry_or_fail(item, attempt)
+                    size = max(MIN_BATCH_SIZE, size // 2)
+                    continue
+
+                throttled = None
+                timed_out = False
+                for index, (item, attempt) in enumerate(batch):
+                    sub = payload[index] if index < len(payload) else None
+                    if not sub:
+                        # 子请求在平台侧超时（返回 null）
+                        timed_out = True
+                        retry_or_fail(item, attempt)
+                        continue
+                    try:
+                        sub_body = json.loads(sub.get("body") or "null")
+                    except ValueError:
+                        sub_body = None
+                    code = sub.get("code")
+                    if code == 200:
+                        settle(item[0], sub_body)
+                    elif code == 429 or _is_throttle_payload(sub_body):
+                        throttled = sub_body or {}
+                        retry_or_fail(item, attempt)
+                    elif code is None or code >= 500:
+                        retry_or_fail(item, attempt)
+                    else:
+                        settle(item[0], None)
+                if throttled is not None:
+                    await self._throttled(max_attempt, throttled)
+
+                if timed_out or throttled is not None or elapsed > target_seconds:
+                    size = max(MIN_BATCH_SIZE, size // 2)
+                elif elapsed < target_seconds / 2:
+                    size = min(MAX_BATCH_SIZE, size + max(1, size // 4))
+                self.stats["batch_size"] = size
+
+                now = time.time()
+                completed = total - outstanding
+                if desc and (now - last_update >= 1.0 or completed == total):
+                    speed = completed / (now - started) if now > started else 0
+                    progress = '█' * int(completed / total * 30) + '░' * (30 - int(completed / total * 30))
+                    _log_print(f"   [{progress}] {completed}/{total} ({completed / total * 100:.1f}%) - {speed:.1f} 条/秒，批次大小 {size}", end='\r')
+                    last_update = now
+
+        await asyncio.gather(*(worker() for _ in range(max(1, max_inflight_batches))))
+        return results
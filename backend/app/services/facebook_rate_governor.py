@@ -0,0 +1,344 @@
+"""
+Facebook API 自适应限速
+解析每个响应的 X-Business-Use-Case-Usage / X-Ad-Account-Usage / X-App-Usage 头，
+按广告账户以 AIMD 方式调整允许的并发数和请求速率：用量低于目标时线性放大，
+接近配额时成倍收缩，遇到限流错误（17/613/80000+ 等）或平台给出恢复时间时暂停该账户的请求
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from facebook_business.api import FacebookAdsApi
+from facebook_business.exceptions import FacebookRequestError
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.facebook_rate_governor")
+
+# 限流相关的错误码：应用/用户/页面级限流、广告账户级限流、业务用例（BUC）限流
+THROTTLE_ERROR_CODES = frozenset({4, 17, 32, 613}) | frozenset(range(80000, 80015))
+APP_THROTTLE_ERROR_CODES = frozenset({4})  # 应用级限流：所有账户共用同一个应用配额
+DEFAULT_ACCOUNT_KEY = "default"
+DECREASE_INTERVAL_SECONDS = 1.0  # 两次收缩之间的最小间隔，避免同一轮响应把并发压到最低
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    """大小写不敏感地读取响应头"""
+    if not headers:
+        return None
+    value = headers.get(name) if hasattr(headers, "get") else None
+    if value is None:
+        lowered = name.lower()
+        for key, item in dict(headers).items():
+            if str(key).lower() == lowered:
+                return item
+    return value
+
+
+def _load_json(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _max_pct(entry: Dict[str, Any]) -> float:
+    return max(float(entry.get(field) or 0) for field in ("call_count", "total_cputime", "total_time"))
+
+
+def parse_usage_headers(headers: Any) -> Tuple[float, float]:
+    """
+    解析 Facebook 用量响应头
+
+    Returns:
+        (最高用量百分比, 平台给出的恢复等待秒数)；没有用量头时返回 (-1, 0)
+    """
+    usage = -1.0
+    regain_seconds = 0.0
+
+    app_usage = _load_json(_header(headers, "X-App-Usage"))
+    if isinstance(app_usage, dict):
+        usage = max(usage, _max_pct(app_usage))
+
+    account_usage = _load_json(_header(headers, "X-Ad-Account-Usage"))
+    if isinstance(account_usage, dict):
+        account_pct = float(account_usage.get("acc_id_util_pct") or 0)
+        usage = max(usage, account_pct)
+        if account_pct >= 100:
+            regain_seconds = max(regain_seconds, float(account_usage.get("reset_time_duration") or 0))
+
+    buc_usage = _load_json(_header(headers, "X-Business-Use-Case-Usage"))
+    if isinstance(buc_usage, dict):
+        for entries in buc_usage.values():
+            for entry in entries if isinstance(entries, list) else [entries]:
+                if not isinstance(entry, dict):
+                    continue
+                usage = max(usage, _max_pct(entry))
+                # estimated_time_to_regain_access 单位为分钟
+                regain_seconds = max(regain_seconds, float(entry.get("estimated_time_to_regain_access") or 0) * 60)
+
+    return usage, regain_seconds
+
+
+def is_throttle_error(error: FacebookRequestError) -> bool:
+    """是否为限流错误"""
+    try:
+        return error.api_error_code() in THROTTLE_ERROR_CODES or error.http_status() == 429
+    except Exception:
+        return False
+
+
+class AccountRateGovernor:
+    """
+    单个广告账户的 AIMD 限速器（线程安全）
+
+    - 并发：同时在途的请求数不超过 limit
+    - 速率：相邻请求的发出时间间隔不小于 1 / rps
+    """
+
+    def __init__(self, account_id: str, max_concurrency: int):
+        self.account_id = account_id
+        self.min_concurrency = max(1, settings.FACEBOOK_RATE_MIN_CONCURRENCY)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.min_rps = max(0.1, settings.FACEBOOK_RATE_MIN_RPS)
+        self.max_rps = max(self.min_rps, settings.FACEBOOK_RATE_MAX_RPS)
+        self.target_pct = settings.FACEBOOK_RATE_TARGET_USAGE_PCT
+        self.limit = float(max(self.min_concurrency, self.max_concurrency // 4))
+        self.rps = max(self.min_rps, min(self.max_rps, settings.FACEBOOK_RATE_INITIAL_RPS))
+        self.usage_pct = -1.0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._next_send_at = 0.0
+        self._last_decrease_at = 0.0
+        self._consecutive_throttles = 0
+        self._cond = threading.Condition()
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "increases": 0,
+            "decreases": 0,
+            "paused_seconds": 0.0,
+            "waited_seconds": 0.0,
+        }
+
+    # ---------- 请求许可 ----------
+
+    def acquire(self) -> None:
+        """等待一个请求许可（暂停期、并发上限、速率间隔）"""
+        started = time.time()
+        with self._cond:
+            while True:
+                now = time.time()
+                if now < self.paused_until:
+                    self._cond.wait(self.paused_until - now)
+                    continue
+                if self.in_flight >= int(self.limit):
+                    self._cond.wait(0.5)
+                    continue
+                break
+            self.in_flight += 1
+            send_at = max(now, self._next_send_at)
+            self._next_send_at = send_at + 1.0 / self.rps
+        delay = send_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        with self._cond:
+            self.stats["requests"] += 1
+            self.stats["waited_seconds"] += time.time() - started
+
+    async def acquire_async(self) -> None:
+        """acquire 的协程版本（轮询等待，不阻塞事件循环）"""
+        started = time.time()
+        while True:
+            with self._cond:
+                now = time.time()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.in_flight >= int(self.limit):
+                    wait = 0.05
+                else:
+                    self.in_flight += 1
+                    send_at = max(now, self._next_send_at)
+                    self._next_send_at = send_at + 1.0 / self.rps
+                    break
+            await asyncio.sleep(min(wait, 1.0))
+        delay = send_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        with self._cond:
+            self.stats["requests"] += 1
+            self.stats["waited_seconds"] += time.time() - started
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """请求许可上下文"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self) -> AsyncIterator[None]:
+        """请求许可上下文（协程版本）"""
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # ---------- 反馈 ----------
+
+    def _decrease(self, factor: float, now: float) -> None:
+        if now - self._last_decrease_at < DECREASE_INTERVAL_SECONDS:
+            return
+        self._last_decrease_at = now
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+        self.rps = max(self.min_rps, self.rps * factor)
+        self.stats["decreases"] += 1
+
+    def _pause(self, seconds: float, now: float) -> None:
+        until = now + seconds
+        if until > self.paused_until:
+            self.stats["paused_seconds"] += until - max(now, self.paused_until)
+            self.paused_until = until
+
+    def observe_headers(self, headers: Any) -> None:
+        """根据响应的用量头调整并发和速率"""
+        usage, regain_seconds = parse_usage_headers(headers)
+        if usage < 0:
+            return
+        now = time.time()
+        with self._cond:
+            self.usage_pct = usage
+            if regain_seconds > 0:
+                self._pause(regain_seconds, now)
+                self._decrease(0.5, now)
+            elif usage >= self.target_pct:
+                # 越接近配额收缩越多（目标处 0.7，用满时 0.5）
+                overshoot = min(1.0, (usage - self.target_pct) / max(1.0, 100 - self.target_pct))
+                self._decrease(0.7 - 0.2 * overshoot, now)
+            elif usage < self.target_pct * 0.8:
+                self._consecutive_throttles = 0
+                # 线性放大：每个响应增加 1/limit，相当于每一轮并发 +1
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(1.0, self.limit))
+                self.rps = min(self.max_rps, self.rps + settings.FACEBOOK_RATE_RPS_STEP / max(1.0, self.limit))
+                self.stats["increases"] += 1
+            self._cond.notify_all()
+
+    def observe_throttle(self, retry_after: float = 0) -> float:
+        """
+        收到限流错误：收缩到最低并暂停（连续限流时暂停时间倍增，最长5分钟）
+
+        Returns:
+            本次暂停的秒数
+        """
+        now = time.time()
+        with self._cond:
+            self.stats["throttled"] += 1
+            self._last_decrease_at = 0.0
+            self._decrease(0.5, now)
+            self.limit = float(self.min_concurrency)
+            backoff = settings.FACEBOOK_RATE_THROTTLE_PAUSE_SECONDS * (2 ** min(self._consecutive_throttles, 5))
+            self._consecutive_throttles += 1
+            seconds = max(retry_after, min(backoff, 300.0))
+            self._pause(seconds, now)
+            return seconds
+
+    def pause(self, seconds: float) -> None:
+        """暂停该账户的请求（不调整并发和速率）"""
+        with self._cond:
+            self._pause(seconds, time.time())
+            self._cond.notify_all()
+
+    def remaining_pause(self) -> float:
+        with self._cond:
+            return max(0.0, self.paused_until - time.time())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "account_id": self.account_id,
+                "concurrency": int(self.limit),
+                "rps": round(self.rps, 2),
+                "usage_pct": round(self.usage_pct, 1),
+                "in_flight": self.in_flight,
+                **{key: round(value, 2) if isinstance(value, float) else value for key, value in self.stats.items()},
+            }
+
+
+_governors: Dict[str, AccountRateGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_rate_governor(account_id: Optional[str], max_concurrency: int = 64) -> AccountRateGovernor:
+    """获取（进程内共享的）广告账户限速器，同一账户的多个同步共享配额"""
+    key = (account_id or DEFAULT_ACCOUNT_KEY).replace("act_", "")
+    with _governors_lock:
+        governor = _governors.get(key)
+        if governor is None:
+            governor = _governors[key] = AccountRateGovernor(key, max_concurrency)
+        elif max_concurrency > governor.max_concurrency:
+            governor.max_concurrency = max_concurrency
+        return governor
+
+
+def pause_all_governors(seconds: float) -> None:
+    """应用级限流时暂停所有账户（多账户并行同步共用应用配额）"""
+    with _governors_lock:
+        governors = list(_governors.values())
+    for governor in governors:
+        governor.pause(seconds)
+
+
+class GovernedFacebookAdsApi(FacebookAdsApi):
+    """每次调用都经过账户限速器的 FacebookAdsApi（通过 GovernedFacebookAdsApi.init 创建）"""
+
+    governor: Optional[AccountRateGovernor] = None
+
+    def call(self, method, path, params=None, headers=None, files=None, url_override=None, api_version=None):
+        governor = self.governor
+        if governor is None or not settings.FACEBOOK_RATE_GOVERNOR_ENABLED:
+            return super().call(method, path, params, headers, files, url_override, api_version)
+
+        with governor.slot():
+            try:
+                response = super().call(method, path, params, headers, files, url_override, api_version)
+            except FacebookRequestError as e:
+                governor.observe_headers(e.http_headers())
+                if is_throttle_error(e):
+                    seconds = governor.observe_throttle()
+                    if e.api_error_code() in APP_THROTTLE_ERROR_CODES:
+                        pause_all_governors(seconds)
+                    _log_print(
+                        f"⚠️  账户 {governor.account_id} 触发限流 (代码: {e.api_error_code()})，暂停 {seconds:.0f} 秒"
+                    )
+                raise
+        governor.observe_headers(response.headers())
+        return response
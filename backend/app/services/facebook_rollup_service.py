@@ -0,0 +1,182 @@
+"""
+Facebook 日汇总表维护服务
+在明细表写入后，按同步窗口增量刷新 账户×天 / 广告系列×天 / 广告组×天 汇总表
+"""
+import logging
+import time
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.facebook_rollup_service")
+
+FACEBOOK_FACT_TABLE = "fact_bi_ads_facebook_campaign"
+
+# 查询粒度 -> 汇总表
+FACEBOOK_ROLLUP_TABLES = {
+    "account": "agg_bi_ads_facebook_account_daily",
+    "campaign": "agg_bi_ads_facebook_campaign_daily",
+    "adset": "agg_bi_ads_facebook_adset_daily",
+}
+
+# 各汇总表的刷新语句（INSERT ... SELECT，从明细表聚合）
+_ROLLUP_INSERT_SQL = {
+    "account": """
+        INSERT INTO agg_bi_ads_facebook_account_daily (
+            account_id, createtime,
+            impression, spend, clicks, reach, unique_link_clicks,
+            adds_to_cart, adds_payment_info, purchases, purchases_value,
+            ad_rows, ctr_ratio_sum, cpm_ratio_sum
+        )
+        SELECT
+            IFNULL(account_id, '') AS account_id,
+            createtime,
+            IFNULL(SUM(impression), 0),
+            IFNULL(SUM(spend), 0),
+            IFNULL(SUM(clicks), 0),
+            IFNULL(SUM(reach), 0),
+            IFNULL(SUM(unique_link_clicks), 0),
+            IFNULL(SUM(adds_to_cart), 0),
+            IFNULL(SUM(adds_payment_info), 0),
+            IFNULL(SUM(purchases), 0),
+            IFNULL(SUM(purchases_roas * spend), 0),
+            COUNT(*),
+            IFNULL(SUM(CASE WHEN impression > 0 THEN (clicks / impression * 100) ELSE 0 END), 0),
+            IFNULL(SUM(CASE WHEN impression > 0 THEN (spend / impression * 1000) ELSE 0 END), 0)
+        FROM fact_bi_ads_facebook_campaign
+        WHERE createtime BETWEEN :start_date AND :end_date
+          {account_filter}
+        GROUP BY IFNULL(account_id, ''), createtime
+    """,
+    "campaign": """
+        INSERT INTO agg_bi_ads_facebook_campaign_daily (
+            account_id, campaign_id, campaign_name, createtime,
+            impression, spend, clicks, unique_link_clicks, purchases, purchases_value
+        )
+        SELECT
+            IFNULL(account_id, '') AS account_id,
+            campaign_id,
+            IFNULL(campaign_name, '') AS campaign_name,
+            createtime,
+            IFNULL(SUM(impression), 0),
+            IFNULL(SUM(spend), 0),
+            IFNULL(SUM(clicks), 0),
+            IFNULL(SUM(unique_link_clicks), 0),
+            IFNULL(SUM(purchases), 0),
+            IFNULL(SUM(purchases_roas * spend), 0)
+        FROM fact_bi_ads_facebook_campaign
+        WHERE createtime BETWEEN :start_date AND :end_date
+          {account_filter}
+        GROUP BY IFNULL(account_id, ''), campaign_id, IFNULL(campaign_name, ''), createtime
+    """,
+    "adset": """
+        INSERT INTO agg_bi_ads_facebook_adset_daily (
+            account_id, adset_id, adset_name, createtime,
+            impression, spend, clicks, unique_link_clicks, purchases, purchases_value
+        )
+        SELECT
+            IFNULL(account_id, '') AS account_id,
+            adset_id,
+            IFNULL(adset_name, '') AS adset_name,
+            createtime,
+            IFNULL(SUM(impression), 0),
+            IFNULL(SUM(spend), 0),
+            IFNULL(SUM(clicks), 0),
+            IFNULL(SUM(unique_link_clicks), 0),
+            IFNULL(SUM(purchases), 0),
+            IFNULL(SUM(purchases_roas * spend), 0)
+        FROM fact_bi_ads_facebook_campaign
+        WHERE createtime BETWEEN :start_date AND :end_date
+          {account_filter}
+        GROUP BY IFNULL(account_id, ''), adset_id, IFNULL(adset_name, ''), createtime
+    """,
+}
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def get_rollup_table(grain: str) -> Optional[str]:
+    """
+    根据查询粒度返回可用的汇总表名
+
+    Args:
+        grain: 查询粒度 ('account', 'campaign', 'adset')
+
+    Returns:
+        汇总表名；未启用汇总表或粒度不支持时返回 None（调用方回退到明细表）
+    """
+    if not settings.FACEBOOK_ROLLUP_ENABLED:
+        return None
+    return FACEBOOK_ROLLUP_TABLES.get(grain)
+
+
+class FacebookRollupService:
+    """Facebook 日汇总表维护服务"""
+
+    def __init__(self, db: Session):
+        """
+        初始化服务
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    def refresh(self, start_date: str, end_date: str, account_id: str = None) -> Dict[str, float]:
+        """
+        按日期窗口（和账户）重建汇总行，所有汇总表在同一事务内替换
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            account_id: 账户ID（不含act_前缀，为空时刷新窗口内所有账户）
+
+        Returns:
+            各汇总表刷新耗时（秒）
+        """
+        params = {"start_date": start_date, "end_date": end_date}
+        account_filter = ""
+        if account_id:
+            account_filter = "AND account_id = :account_id"
+            params["account_id"] = account_id
+
+        timings = {}
+        try:
+            for grain, table_name in FACEBOOK_ROLLUP_TABLES.items():
+                grain_start = time.time()
+                self.db.execute(
+                    text(
+                        f"DELETE FROM {table_name} WHERE createtime BETWEEN :start_date AND :end_date "
+                        f"{'AND account_id = :account_id' if account_id else ''}"
+                    ),
+                    params,
+                )
+                self.db.execute(
+                    text(_ROLLUP_INSERT_SQL[grain].format(account_filter=account_filter)),
+                    params,
+                )
+                timings[grain] = time.time() - grain_start
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        scope = f"账户 {account_id}" if account_id else "全部账户"
+        detail = ", ".join(f"{grain} {duration:.2f}s" for grain, duration in timings.items())
+        _log_print(f"📚 已刷新 Facebook 日汇总表（{scope} {start_date} 到 {end_date}）: {detail}")
+        return timings
@@ -2,21 +2,25 @@
 Facebook Ads Dashboard业务逻辑服务（优化版，支持自动重试和缓存）
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import os
 from sqlalchemy import text
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
+from fastapi.concurrency import run_in_threadpool
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.services.base_service import BaseDashboardService
 from app.services.data_parser_config import get_parse_config
 from app.utils.chart_helpers import generate_chart_data, FACEBOOK_IMPRESSION_CHART_CONFIG, FACEBOOK_PURCHASE_CHART_CONFIG
-from app.utils.helpers import build_mysql_regex_union, escape_mysql_regex_literal, safe_divide
+from app.utils.helpers import build_mysql_regex_union, escape_mysql_regex_literal, get_week_comparison_bounds, safe_divide
 from app.core.config import settings
 from app.core.cache import cached
+from app.core.database import SessionLocal
+from app.services.facebook_rollup_service import FACEBOOK_FACT_TABLE, get_rollup_table
+from app.services.sync_state_service import SyncStateService, date_range, to_segments
 
 FACEBOOK_API_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, settings.FACEBOOK_API_MAX_WORKERS))
 logger = logging.getLogger("app.services.facebook_service")
@@ -56,6 +60,32 @@ class FacebookDashboardService(BaseDashboardService):
             _log_print(f"🔧 Facebook 代理已设置: {proxy_url}")
         else:
             _log_print("ℹ️ 未设置 Facebook 代理，使用直连")
+
+    def _fact_source(self, grain: str) -> Dict[str, str]:
+        """
+        按查询粒度选择数据源及对应的SQL片段（汇总表可用时优先读取日汇总表）
+
+        Args:
+            grain: 查询粒度 ('account', 'campaign', 'adset')
+
+        Returns:
+            table: 表名; purchases_value: 购买价值表达式;
+            ctr / cpm: 逐行平均CTR/CPM的聚合表达式（仅账户粒度）
+        """
+        rollup_table = get_rollup_table(grain)
+        if rollup_table:
+            return {
+                "table": rollup_table,
+                "purchases_value": "purchases_value",
+                "ctr": "IFNULL(SUM(ctr_ratio_sum) / NULLIF(SUM(ad_rows), 0), 0)",
+                "cpm": "IFNULL(SUM(cpm_ratio_sum) / NULLIF(SUM(ad_rows), 0), 0)",
+            }
+        return {
+            "table": FACEBOOK_FACT_TABLE,
+            "purchases_value": "purchases_roas * spend",
+            "ctr": "AVG(CASE WHEN impression > 0 THEN (clicks / impression * 100) ELSE 0 END)",
+            "cpm": "AVG(CASE WHEN impression > 0 THEN (spend / impression * 1000) ELSE 0 END)",
+        }
     
     @cached(prefix="facebook:impressions:db", ttl=settings.CACHE_TTL_MEDIUM)
     async def get_impressions_data(
@@ -68,26 +98,29 @@ class FacebookDashboardService(BaseDashboardService):
     ) -> Dict[str, Any]:
         """获取印象和触达数据（从数据库）- 已启用缓存"""
 
-        query = text("""
+        source = self._fact_source("account")
+        query = text(f"""
             SELECT
                 createtime,
                 SUM(impression) AS impressions,
                 SUM(reach) AS reach,
                 SUM(clicks) AS clicks,
                 SUM(unique_link_clicks) AS unique_link_clicks,
-                AVG(CASE WHEN impression > 0 THEN (clicks / impression * 100) ELSE 0 END) AS ctr,
-                AVG(CASE WHEN impression > 0 THEN (spend / impression * 1000) ELSE 0 END) AS cpm
-            FROM fact_bi_ads_facebook_campaign
+                {source["ctr"]} AS ctr,
+                {source["cpm"]} AS cpm
+            FROM {source["table"]}
             WHERE createtime BETWEEN :start_date AND :end_date
               AND (:account_id IS NULL OR account_id = :account_id)
             GROUP BY createtime
             ORDER BY createtime
         """)
         
-        # 执行查询
-        params = {"start_date": start_date, "end_date": end_date, "account_id": account_id}
-        current_rows = await self.execute_query(query, params)
-        current_data = [self._parse_impression_row(row) for row in current_rows]
+        # 执行查询（当前期与对比期在独立连接上并行）
+        queries = [(query, {"start_date": start_date, "end_date": end_date, "account_id": account_id})]
+        if compare_start_date and compare_end_date:
+            queries.append((query, {"start_date": compare_start_date, "end_date": compare_end_date, "account_id": account_id}))
+        period_rows = await self.execute_queries_parallel(*queries)
+        current_data = [self._parse_impression_row(row) for row in period_rows[0]]
         
         # 生成图表数据
         chart_data = generate_chart_data(current_data, "date", FACEBOOK_IMPRESSION_CHART_CONFIG)
@@ -110,9 +143,7 @@ class FacebookDashboardService(BaseDashboardService):
         
         # 处理对比数据
         if compare_start_date and compare_end_date:
-            compare_params = {"start_date": compare_start_date, "end_date": compare_end_date, "account_id": account_id}
-            compare_rows = await self.execute_query(query, compare_params)
-            compare_data = [self._parse_impression_row(row) for row in compare_rows]
+            compare_data = [self._parse_impression_row(row) for row in period_rows[1]]
             
             result = self.process_comparison_data(
                 current_data=current_data,
@@ -144,26 +175,29 @@ class FacebookDashboardService(BaseDashboardService):
     ) -> Dict[str, Any]:
         """获取购买和花费数据（从数据库）- 已启用缓存"""
 
-        query = text("""
+        source = self._fact_source("account")
+        query = text(f"""
             SELECT
                 createtime,
-                SUM(purchases_roas * spend) AS purchases_value,
+                SUM({source["purchases_value"]}) AS purchases_value,
                 SUM(spend) AS spend,
                 SUM(purchases) AS purchases,
                 SUM(adds_to_cart) AS adds_to_cart,
                 SUM(adds_payment_info) AS adds_payment_info,
-                IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS roas
-            FROM fact_bi_ads_facebook_campaign
+                IFNULL(SUM({source["purchases_value"]}) / NULLIF(SUM(spend), 0), 0) AS roas
+            FROM {source["table"]}
             WHERE createtime BETWEEN :start_date AND :end_date
               AND (:account_id IS NULL OR account_id = :account_id)
             GROUP BY createtime
             ORDER BY createtime
         """)
         
-        # 执行查询
-        params = {"start_date": start_date, "end_date": end_date, "account_id": account_id}
-        current_rows = await self.execute_query(query, params)
-        current_data = [self._parse_purchase_row(row) for row in current_rows]
+        # 执行查询（当前期与对比期在独立连接上并行）
+        queries = [(query, {"start_date": start_date, "end_date": end_date, "account_id": account_id})]
+        if compare_start_date and compare_end_date:
+            queries.append((query, {"start_date": compare_start_date, "end_date": compare_end_date, "account_id": account_id}))
+        period_rows = await self.execute_queries_parallel(*queries)
+        current_data = [self._parse_purchase_row(row) for row in period_rows[0]]
         
         # 生成图表数据
         chart_data = generate_chart_data(current_data, "date", FACEBOOK_PURCHASE_CHART_CONFIG)
@@ -191,9 +225,7 @@ class FacebookDashboardService(BaseDashboardService):
         
         # 处理对比数据
         if compare_start_date and compare_end_date:
-            compare_params = {"start_date": compare_start_date, "end_date": compare_end_date, "account_id": account_id}
-            compare_rows = await self.execute_query(query, compare_params)
-            compare_data = [self._parse_purchase_row(row) for row in compare_rows]
+            compare_data = [self._parse_purchase_row(row) for row in period_rows[1]]
             
             result = self.process_comparison_data(
                 current_data=current_data,
@@ -241,7 +273,8 @@ class FacebookDashboardService(BaseDashboardService):
     ) -> List[Dict[str, Any]]:
         """获取性能对比数据（用于面积图）- 已启用缓存"""
 
-        query = text("""
+        source = self._fact_source("account")
+        query = text(f"""
             WITH date_current AS (
                 SELECT
                     createtime,
@@ -251,11 +284,11 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(clicks) AS clicks,
                     SUM(unique_link_clicks) AS unique_link_clicks,
                     SUM(purchases) AS purchases,
-                    SUM(purchases_roas * spend) AS purchases_value,
+                    SUM({source["purchases_value"]}) AS purchases_value,
                     SUM(spend) AS spend,
                     SUM(adds_to_cart) AS adds_to_cart,
                     SUM(adds_payment_info) AS adds_payment_info
-                FROM fact_bi_ads_facebook_campaign
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time1 AND :end_time1
                   AND (:account_id IS NULL OR account_id = :account_id)
                 GROUP BY createtime
@@ -269,11 +302,11 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(clicks) AS compare_clicks,
                     SUM(unique_link_clicks) AS compare_unique_link_clicks,
                     SUM(purchases) AS compare_purchases,
-                    SUM(purchases_roas * spend) AS compare_purchases_value,
+                    SUM({source["purchases_value"]}) AS compare_purchases_value,
                     SUM(spend) AS compare_spend,
                     SUM(adds_to_cart) AS compare_adds_to_cart,
                     SUM(adds_payment_info) AS compare_adds_payment_info
-                FROM fact_bi_ads_facebook_campaign
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time2 AND :end_time2
                   AND (:account_id IS NULL OR account_id = :account_id)
                 GROUP BY createtime
@@ -324,7 +357,8 @@ class FacebookDashboardService(BaseDashboardService):
     ) -> List[Dict[str, Any]]:
         """获取Campaign Performance Overview数据 - 已启用缓存"""
         
-        query = text("""
+        source = self._fact_source("campaign")
+        query = text(f"""
             WITH date_current AS (
                 SELECT
                     campaign_id,
@@ -333,9 +367,9 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(spend) AS spend,
                     SUM(clicks) AS clicks,
                     SUM(purchases) AS purchases,
-                    SUM(purchases_roas * spend) AS purchases_value,
-                    IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS roas
-                FROM fact_bi_ads_facebook_campaign
+                    SUM({source["purchases_value"]}) AS purchases_value,
+                    IFNULL(SUM({source["purchases_value"]}) / NULLIF(SUM(spend), 0), 0) AS roas
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time1 AND :end_time1
                 GROUP BY campaign_id, campaign_name
                 HAVING SUM(spend) > 0
@@ -347,9 +381,9 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(spend) AS spend,
                     SUM(clicks) AS clicks,
                     SUM(purchases) AS purchases,
-                    SUM(purchases_roas * spend) AS purchases_value,
-                    IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS roas
-                FROM fact_bi_ads_facebook_campaign
+                    SUM({source["purchases_value"]}) AS purchases_value,
+                    IFNULL(SUM({source["purchases_value"]}) / NULLIF(SUM(spend), 0), 0) AS roas
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time2 AND :end_time2
                 GROUP BY campaign_id
             )
@@ -386,16 +420,24 @@ class FacebookDashboardService(BaseDashboardService):
         
         return [self._parse_campaign_performance_row(row) for row in rows]
     
-    @cached(prefix="facebook:ads_performance", ttl=settings.CACHE_TTL_LONG)
+    @cached(
+        prefix="facebook:ads_performance",
+        ttl=settings.CACHE_TTL_LONG,
+        range_builder=lambda arguments: get_week_comparison_bounds(arguments["variable_date"])
+    )
     async def get_ads_performance_overview(self, variable_date: str, account_id: str = None) -> List[Dict[str, Any]]:
         """获取Ads Performance Overview数据（产品表现）- 已启用缓存"""
         product_list = [name.strip() for name in settings.FACEBOOK_PRODUCT_NAMES_LIST if name and name.strip()]
         if not product_list:
             return []
 
+        # 显式限定扫描范围（上周一 ~ 本周日），使 createtime 分区裁剪生效
+        scan_start, scan_end = get_week_comparison_bounds(variable_date)
         params = {
             "variable_time": variable_date,
             "product_pattern": build_mysql_regex_union(product_list),
+            "scan_start": scan_start,
+            "scan_end": scan_end,
             "account_id": account_id,
         }
 
@@ -411,6 +453,7 @@ class FacebookDashboardService(BaseDashboardService):
             params[label_key] = product
             case_statements.append(f"WHEN campaign_name REGEXP :{regex_key} THEN :{label_key}")
         case_when_clause = "\n                  ".join(case_statements)
+        source = self._fact_source("campaign")
 
         query = text(f"""
             WITH date_range AS (
@@ -436,18 +479,19 @@ class FacebookDashboardService(BaseDashboardService):
                   {case_when_clause}
                   ELSE campaign_name
                 END AS campaign_name,
-                purchases, spend, purchases_roas, createtime
-              FROM fact_bi_ads_facebook_campaign, date_range
+                purchases, spend, {source["purchases_value"]} AS purchases_value, createtime
+              FROM {source["table"]}, date_range
               WHERE campaign_name REGEXP :product_pattern
+                AND createtime BETWEEN :scan_start AND :scan_end
                 AND (:account_id IS NULL OR account_id = :account_id)
             ),
             current_week_data AS (
               SELECT
                 campaign_id, campaign_name,
                 SUM(purchases) AS purchases,
-                SUM(purchases_roas * spend) AS purchases_value,
+                SUM(purchases_value) AS purchases_value,
                 SUM(spend) AS spend,
-                IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS roas
+                IFNULL(SUM(purchases_value) / NULLIF(SUM(spend), 0), 0) AS roas
               FROM data_detail, date_range
               WHERE createtime BETWEEN current_week_start AND current_week_end
               GROUP BY campaign_id, campaign_name
@@ -456,9 +500,9 @@ class FacebookDashboardService(BaseDashboardService):
               SELECT
                 campaign_id, campaign_name,
                 SUM(purchases) AS purchases,
-                SUM(purchases_roas * spend) AS purchases_value,
+                SUM(purchases_value) AS purchases_value,
                 SUM(spend) AS spend,
-                IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS roas
+                IFNULL(SUM(purchases_value) / NULLIF(SUM(spend), 0), 0) AS roas
               FROM data_detail, date_range
               WHERE createtime BETWEEN last_week_start AND last_week_end
               GROUP BY campaign_id, campaign_name
@@ -502,7 +546,8 @@ class FacebookDashboardService(BaseDashboardService):
     ) -> List[Dict[str, Any]]:
         """获取Ad Sets Performance Overview数据 - 已启用缓存"""
 
-        query = text("""
+        source = self._fact_source("adset")
+        query = text(f"""
             WITH date_current AS (
                 SELECT
                     adset_id, adset_name,
@@ -510,10 +555,10 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(spend) AS spend,
                     SUM(clicks) AS clicks,
                     SUM(purchases) AS purchases,
-                    SUM(purchases_roas * spend) AS purchases_value,
-                    IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS purchase_roas,
+                    SUM({source["purchases_value"]}) AS purchases_value,
+                    IFNULL(SUM({source["purchases_value"]}) / NULLIF(SUM(spend), 0), 0) AS purchase_roas,
                     SUM(unique_link_clicks) AS unique_link_clicks
-                FROM fact_bi_ads_facebook_campaign
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time1 AND :end_time1
                   AND (:account_id IS NULL OR account_id = :account_id)
                 GROUP BY adset_id, adset_name
@@ -524,10 +569,10 @@ class FacebookDashboardService(BaseDashboardService):
                     SUM(impression) AS impression,
                     SUM(spend) AS spend,
                     SUM(purchases) AS purchases,
-                    SUM(purchases_roas * spend) AS purchases_value,
-                    IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS purchase_roas,
+                    SUM({source["purchases_value"]}) AS purchases_value,
+                    IFNULL(SUM({source["purchases_value"]}) / NULLIF(SUM(spend), 0), 0) AS purchase_roas,
                     SUM(unique_link_clicks) AS unique_link_clicks
-                FROM fact_bi_ads_facebook_campaign
+                FROM {source["table"]}
                 WHERE createtime BETWEEN :start_time2 AND :end_time2
                   AND (:account_id IS NULL OR account_id = :account_id)
                 GROUP BY adset_id
@@ -565,11 +610,19 @@ class FacebookDashboardService(BaseDashboardService):
         end_time1: str,
         start_time2: str,
         end_time2: str,
-        account_id: str = None
+        account_id: str = None,
+        include_preview: bool = True
     ) -> List[Dict[str, Any]]:
-        """获取Ads Detail Performance Overview数据 - 已启用缓存"""
-
-        query = text("""
+        """
+        获取Ads Detail Performance Overview数据 - 已启用缓存
+        
+        图片和预览来自创意维度表 dim_ad_creative，include_preview=False 或未启用
+        FACEBOOK_CREATIVE_DIMENSION_ENABLED 时不关联维度表
+        """
+        include_preview = include_preview and settings.FACEBOOK_CREATIVE_DIMENSION_ENABLED
+        creative_columns = "C.image_url, C.preview_html AS preview_url" if include_preview else "NULL AS image_url, NULL AS preview_url"
+        creative_join = "LEFT JOIN dim_ad_creative C ON A.ad_id = C.ad_id" if include_preview else ""
+        query = text(f"""
             WITH date_current AS (
                 SELECT
                     ad_id, ad_name,
@@ -580,9 +633,7 @@ class FacebookDashboardService(BaseDashboardService):
                     IFNULL(SUM(purchases_roas * spend) / NULLIF(SUM(spend), 0), 0) AS purchase_roas,
                     SUM(unique_link_clicks) AS unique_link_clicks,
                     SUM(adds_payment_info) AS adds_payment_info,
-                    SUM(adds_to_cart) AS adds_to_cart,
-                    MAX(image_url) AS image_url,
-                    MAX(preview_url) AS preview_url
+                    SUM(adds_to_cart) AS adds_to_cart
                 FROM fact_bi_ads_facebook_campaign
                 WHERE createtime BETWEEN :start_time1 AND :end_time1
                   AND (:account_id IS NULL OR account_id = :account_id)
@@ -616,10 +667,10 @@ class FacebookDashboardService(BaseDashboardService):
                 CASE WHEN B.impression > 0 THEN (B.unique_link_clicks / B.impression * 100) ELSE 0 END AS ctr_previous,
                 CASE WHEN A.impression > 0 THEN (A.spend / A.impression * 1000) ELSE 0 END AS cpm,
                 CASE WHEN B.impression > 0 THEN (B.spend / B.impression * 1000) ELSE 0 END AS cpm_previous,
-                A.image_url,
-                A.preview_url
+                {creative_columns}
             FROM date_current A
                 LEFT JOIN date_compare B ON A.ad_id = B.ad_id
+                {creative_join}
         """)
         
         params = {
@@ -851,7 +902,7 @@ class FacebookDashboardService(BaseDashboardService):
             float(summary_data.get('cpm', 0))   # 原始CPM
         )
     
-    @cached(prefix="facebook:impressions", ttl=settings.CACHE_TTL_MEDIUM)
+    @cached(prefix="facebook:impressions", ttl=settings.CACHE_TTL_MEDIUM, invalidate_on_sync=False)
     async def get_impressions_data_from_api(
         self,
         start_date: str,
@@ -1091,7 +1142,7 @@ class FacebookDashboardService(BaseDashboardService):
             roas  # 原始ROAS
         )
     
-    @cached(prefix="facebook:purchases", ttl=settings.CACHE_TTL_MEDIUM)
+    @cached(prefix="facebook:purchases", ttl=settings.CACHE_TTL_MEDIUM, invalidate_on_sync=False)
     async def get_purchases_data_from_api(
         self,
         start_date: str,
@@ -1187,7 +1238,255 @@ class FacebookDashboardService(BaseDashboardService):
         except Exception as e:
             raise Exception(f"从Facebook API获取购买数据失败: {str(e)}")
     
-    @cached(prefix="facebook:overview", ttl=settings.CACHE_TTL_SHORT)
+    def _plan_overview_sources(
+        self,
+        account_id: str,
+        start_date: str,
+        end_date: str
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        规划总览数据来源
+        
+        Returns:
+            (读取本地表的日期, 需要实时查询的连续日期区间)
+        """
+        if not (settings.FACEBOOK_OVERVIEW_HYBRID_ENABLED and settings.SYNC_STATE_ENABLED):
+            return [], [(start_date, end_date)]
+        db = SessionLocal()
+        try:
+            settled = set(SyncStateService(db).settled_days(
+                self.PLATFORM, account_id, start_date, end_date, settings.FACEBOOK_OVERVIEW_SETTLE_HOURS
+            ))
+        except Exception as e:
+            _log_print(f"⚠️ 读取同步状态失败，全部实时查询: {e}")
+            return [], [(start_date, end_date)]
+        finally:
+            db.close()
+        all_days = date_range(start_date, end_date)
+        return (
+            [day for day in all_days if day in settled],
+            to_segments(day for day in all_days if day not in settled),
+        )
+    
+    async def _fetch_local_overview_daily(
+        self,
+        account_id: str,
+        days: List[str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        从本地表（优先账户日汇总表）读取指定日期的每日展示和购买数据
+        
+        广告行上的触达和独立链接点击按广告去重，按天相加会重复计算同一用户，
+        因此不从本地表读取，由调用方填入账户级的实时每日值
+        """
+        source = self._fact_source("account")
+        query = text(f"""
+            SELECT
+                createtime,
+                SUM(impression) AS impressions,
+                SUM(clicks) AS clicks,
+                SUM(spend) AS spend,
+                SUM(purchases) AS purchases,
+                SUM({source["purchases_value"]}) AS purchases_value,
+                SUM(adds_to_cart) AS adds_to_cart,
+                SUM(adds_payment_info) AS adds_payment_info
+            FROM {source["table"]}
+            WHERE createtime BETWEEN :start_date AND :end_date
+              AND account_id = :account_id
+            GROUP BY createtime
+        """)
+        # 当前期和对比期并行获取，共享的请求会话不能并发执行，使用独立连接
+        rows = await self._execute_detached(
+            query, {"start_date": min(days), "end_date": max(days), "account_id": account_id}
+        )
+        
+        wanted = set(days)
+        impressions_daily, purchases_daily = [], []
+        for row in rows:
+            day = str(row.createtime)[:10]
+            if day not in wanted:
+                continue
+            impressions_daily.append({
+                'date': day,
+                'impressions': int(row.impressions or 0),
+                'clicks': int(row.clicks or 0)
+            })
+            purchases_daily.append({
+                'date': day,
+                'spend': float(row.spend or 0),
+                'purchases': int(row.purchases or 0),
+                'purchases_value': float(row.purchases_value or 0),
+                'adds_to_cart': int(row.adds_to_cart or 0),
+                'adds_payment_info': int(row.adds_payment_info or 0)
+            })
+        return impressions_daily, purchases_daily
+    
+    @cached(prefix="facebook:overview:live_totals", ttl=settings.CACHE_TTL_SHORT, invalidate_on_sync=False)
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((ConnectionError, TimeoutError, Exception)),
+        reraise=True
+    )
+    def _fetch_live_total_metrics(self, account_id: str, start_date: str, end_date: str) -> Dict[str, int]:
+        """获取不可按天累加的指标（触达、独立链接点击）在整个日期范围的总值（单次实时调用，按范围缓存）"""
+        total_insights = AdAccount(account_id).get_insights(
+            fields=['reach', 'unique_actions'],
+            params={
+                'level': 'account',
+                'time_range': {
+                    'since': start_date,
+                    'until': end_date
+                }
+            }
+        )
+        
+        reach = 0
+        unique_link_clicks = 0
+        for item in total_insights:
+            reach = int(item.get('reach', 0))
+            for action in item.get('unique_actions') or []:
+                if action.get('action_type') == 'link_click':
+                    unique_link_clicks = int(action.get('value', 0))
+                    break
+            break
+        return {"reach": reach, "unique_link_clicks": unique_link_clicks}
+    
+    @cached(prefix="facebook:overview:live_daily_uniques", ttl=settings.CACHE_TTL_SHORT, invalidate_on_sync=False)
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((ConnectionError, TimeoutError, Exception)),
+        reraise=True
+    )
+    def _fetch_live_daily_unique_metrics(self, account_id: str, start_date: str, end_date: str) -> Dict[str, Dict[str, int]]:
+        """获取账户级每日触达和独立链接点击（单次实时调用覆盖整个日期范围，按范围缓存）"""
+        daily_insights = AdAccount(account_id).get_insights(
+            fields=['reach', 'unique_actions', 'date_start'],
+            params={
+                'level': 'account',
+                'time_range': {
+                    'since': start_date,
+                    'until': end_date
+                },
+                'time_increment': 1  # 按天返回
+            }
+        )
+        
+        daily_uniques = {}
+        for insight in daily_insights:
+            unique_link_clicks = 0
+            for action in insight.get('unique_actions') or []:
+                if action.get('action_type') == 'link_click':
+                    unique_link_clicks = int(action.get('value', 0))
+                    break
+            daily_uniques[insight.get('date_start')] = {
+                'reach': int(insight.get('reach', 0)),
+                'unique_link_clicks': unique_link_clicks
+            }
+        return daily_uniques
+    
+    async def _fetch_overview_period(
+        self,
+        ad_account: AdAccount,
+        account_id: str,
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, Any]:
+        """
+        获取一个期间的总览数据
+        
+        已完整同步的日期读取本地表，其余日期（通常只有当天）实时查询每日数据；
+        可累加指标由合并后的每日数据求和，比率由合计值计算；
+        触达和独立链接点击不可累加，期间总值和本地日期的每日值都取账户级实时数据
+        （各一次调用），并在 sources.liveTotalMetrics 中标明
+        
+        Returns:
+            impressions_daily / impressions_total / purchases_daily / purchases_total
+            （与原 Insights 解析结果结构相同）以及数据来源 sources
+        """
+        loop = asyncio.get_running_loop()
+        executor = FACEBOOK_API_EXECUTOR
+        local_days, live_segments = await run_in_threadpool(
+            self._plan_overview_sources, account_id.replace('act_', ''), start_date, end_date
+        )
+        live_days = sum(len(date_range(s, e)) for s, e in live_segments)
+        
+        if not local_days:
+            # 没有可用的本地数据：整个期间实时查询（总值直接取平台汇总）
+            impressions_daily, impressions_total, purchases_daily, purchases_total = await asyncio.gather(
+                loop.run_in_executor(executor, self._fetch_impressions_daily_insights, ad_account, start_date, end_date),
+                loop.run_in_executor(executor, self._fetch_impressions_total_insights, ad_account, start_date, end_date),
+                loop.run_in_executor(executor, self._fetch_purchases_daily_insights, ad_account, start_date, end_date),
+                loop.run_in_executor(executor, self._fetch_purchases_total_insights, ad_account, start_date, end_date)
+            )
+            return {
+                'impressions_daily': impressions_daily,
+                'impressions_total': impressions_total,
+                'purchases_daily': purchases_daily,
+                'purchases_total': purchases_total,
+                'sources': {"localDays": 0, "liveDays": live_days, "liveTotalMetrics": []}
+            }
+        
+        tasks = [
+            self._fetch_local_overview_daily(account_id.replace('act_', ''), local_days),
+            loop.run_in_executor(executor, self._fetch_live_total_metrics, account_id, start_date, end_date),
+            loop.run_in_executor(executor, self._fetch_live_daily_unique_metrics, account_id, start_date, end_date)
+        ]
+        for segment_start, segment_end in live_segments:
+            tasks.append(loop.run_in_executor(executor, self._fetch_impressions_daily_insights, ad_account, segment_start, segment_end))
+            tasks.append(loop.run_in_executor(executor, self._fetch_purchases_daily_insights, ad_account, segment_start, segment_end))
+        task_results = await asyncio.gather(*tasks)
+        
+        (impressions_daily, purchases_daily), live_totals, daily_uniques = task_results[:3]
+        # 本地日期的触达和独立链接点击使用账户级实时每日值，与实时日期口径一致
+        for item in impressions_daily:
+            item.update(daily_uniques.get(item['date']) or {'reach': 0, 'unique_link_clicks': 0})
+        for index in range(3, len(task_results), 2):
+            impressions_daily.extend(task_results[index])
+            purchases_daily.extend(task_results[index + 1])
+        impressions_daily.sort(key=lambda item: item['date'])
+        purchases_daily.sort(key=lambda item: item['date'])
+        _log_print(f"📊 Facebook 总览 {account_id} {start_date} 至 {end_date}: 本地表 {len(local_days)} 天，实时查询 {live_days} 天")
+        
+        impressions = sum(item['impressions'] for item in impressions_daily)
+        clicks = sum(item['clicks'] for item in impressions_daily)
+        spend = sum(item['spend'] for item in purchases_daily)
+        purchases_value = sum(item['purchases_value'] for item in purchases_daily)
+        return {
+            'impressions_daily': impressions_daily,
+            'impressions_total': (
+                impressions,
+                live_totals["reach"],
+                clicks,
+                live_totals["unique_link_clicks"],
+                clicks / impressions * 100 if impressions > 0 else 0,  # CTR
+                spend / impressions * 1000 if impressions > 0 else 0  # CPM
+            ),
+            'purchases_daily': purchases_daily,
+            'purchases_total': (
+                spend,
+                sum(item['purchases'] for item in purchases_daily),
+                purchases_value,
+                sum(item['adds_to_cart'] for item in purchases_daily),
+                sum(item['adds_payment_info'] for item in purchases_daily),
+                purchases_value / spend if spend > 0 else 0  # ROAS
+            ),
+            'sources': {
+                "localDays": len(local_days),
+                "liveDays": live_days,
+                "liveTotalMetrics": ["reach", "uniqueLinkClicks"]
+            }
+        }
+    
+    @cached(
+        prefix="facebook:overview",
+        ttl=settings.CACHE_TTL_SHORT,
+        range_builder=lambda arguments: (
+            min(filter(None, (arguments.get("start_date"), arguments.get("compare_start_date")))),
+            max(filter(None, (arguments.get("end_date"), arguments.get("compare_end_date"))))
+        )
+    )
     async def get_overview_data_from_api(
         self,
         start_date: str,
@@ -1214,37 +1513,14 @@ class FacebookDashboardService(BaseDashboardService):
             FacebookAdsApi.init(access_token=final_access_token)
             ad_account = AdAccount(final_account_id)
             
-            # ========== 使用线程池并行获取所有数据 ==========
-            loop = asyncio.get_running_loop()
-            executor = FACEBOOK_API_EXECUTOR
-
-            # 提交所有当前期间的API请求
-            futures = {
-                'impressions_daily': loop.run_in_executor(executor, self._fetch_impressions_daily_insights, ad_account, start_date, end_date),
-                'impressions_total': loop.run_in_executor(executor, self._fetch_impressions_total_insights, ad_account, start_date, end_date),
-                'purchases_daily': loop.run_in_executor(executor, self._fetch_purchases_daily_insights, ad_account, start_date, end_date),
-                'purchases_total': loop.run_in_executor(executor, self._fetch_purchases_total_insights, ad_account, start_date, end_date)
-            }
-
-            # 如果有对比日期，同时提交对比期间的请求
+            # ========== 当前期与对比期并行获取（各期间内已同步的日期读本地表） ==========
+            periods = [self._fetch_overview_period(ad_account, final_account_id, start_date, end_date)]
             if compare_start_date and compare_end_date:
-                futures['compare_impressions_daily'] = loop.run_in_executor(
-                    executor, self._fetch_impressions_daily_insights, ad_account, compare_start_date, compare_end_date
-                )
-                futures['compare_impressions_total'] = loop.run_in_executor(
-                    executor, self._fetch_impressions_total_insights, ad_account, compare_start_date, compare_end_date
-                )
-                futures['compare_purchases_daily'] = loop.run_in_executor(
-                    executor, self._fetch_purchases_daily_insights, ad_account, compare_start_date, compare_end_date
-                )
-                futures['compare_purchases_total'] = loop.run_in_executor(
-                    executor, self._fetch_purchases_total_insights, ad_account, compare_start_date, compare_end_date
-                )
-
-            # 等待所有请求完成并获取结果
-            future_keys = list(futures.keys())
-            future_results = await asyncio.gather(*futures.values())
-            results = dict(zip(future_keys, future_results))
+                periods.append(self._fetch_overview_period(ad_account, final_account_id, compare_start_date, compare_end_date))
+            period_results = await asyncio.gather(*periods)
+            results = dict(period_results[0])
+            if len(period_results) > 1:
+                results.update({f"compare_{key}": value for key, value in period_results[1].items()})
             
             # 解包当前期间的结果
             impressions_daily_data = results['impressions_daily']
@@ -1289,11 +1565,14 @@ class FacebookDashboardService(BaseDashboardService):
                     "addsPaymentInfo": total_adds_payment_info,
                     "roas": round(total_roas, 2),  # 显示时才四舍五入
                     "chartData": purchases_chart_data
-                }
+                },
+                "sources": {"current": results['sources']}
             }
             
             # 如果有对比日期范围，处理对比数据（已在线程池中并行获取）
             if compare_start_date and compare_end_date:
+                result["sources"]["compare"] = results['compare_sources']
+                
                 # ========== Impressions对比数据 ==========
                 # 从并行请求结果中获取数据
                 compare_impressions_daily_data = results['compare_impressions_daily']
@@ -0,0 +1,169 @@
+"""
+Google Ads 客户端进程内注册表
+按 配置文件 × 登录客户（MCC）缓存 GoogleAdsClient：google-ads.yaml 和服务账号密钥只加载一次，
+服务客户端（及其 gRPC 通道）长期复用，访问令牌由后台线程在过期前刷新，
+请求路径上不再承担客户端构建、建连和 OAuth 握手的开销
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from google.ads.googleads.client import GoogleAdsClient
+from google.auth.transport.requests import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.google_ads_client_registry")
+
+# 注册表键：(配置文件绝对路径, 登录客户ID)；查询的目标客户ID在每次调用时指定，不影响客户端
+ClientKey = Tuple[str, str]
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+class PooledGoogleAdsClient:
+    """共享的 Google Ads 客户端（服务客户端按名称缓存，其余属性透传给 GoogleAdsClient）"""
+
+    def __init__(self, client: GoogleAdsClient, key: ClientKey):
+        self._client = client
+        self.key = key
+        self._services: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._services_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def get_service(self, name: str, version: Optional[str] = None) -> Any:
+        """
+        获取服务客户端（首次创建后复用，gRPC 通道保持连接，可在多个线程间共享）
+
+        注意：通道在创建时读取代理环境变量，之后修改代理不影响已创建的通道
+        """
+        cache_key = (name, version)
+        service = self._services.get(cache_key)
+        if service is None:
+            with self._services_lock:
+                service = self._services.get(cache_key)
+                if service is None:
+                    kwargs = {"version": version} if version else {}
+                    service = self._services[cache_key] = self._client.get_service(name, **kwargs)
+        return service
+
+    def refresh_credentials(self, margin_seconds: float) -> bool:
+        """
+        访问令牌缺失或将在 margin_seconds 内过期时刷新
+
+        Returns:
+            是否执行了刷新
+        """
+        credentials = getattr(self._client, "credentials", None)
+        if credentials is None or not hasattr(credentials, "refresh"):
+            return False
+        with self._refresh_lock:
+            expiry = getattr(credentials, "expiry", None)  # google-auth 使用不带时区的 UTC 时间
+            if credentials.token and expiry and expiry - timedelta(seconds=margin_seconds) > datetime.utcnow():
+                return False
+            credentials.refresh(Request())
+            return True
+
+
+_clients: Dict[ClientKey, PooledGoogleAdsClient] = {}
+_clients_lock = threading.Lock()
+_load_lock = threading.Lock()  # 加载需要切换进程工作目录
+_refresher: Optional[threading.Thread] = None
+
+
+def _load_client(config_path: str, login_customer_id: str) -> GoogleAdsClient:
+    """从配置文件加载客户端（切换到配置文件所在目录，配置中的相对路径据此解析）"""
+    original_dir = os.getcwd()
+    config_dir = os.path.dirname(config_path)
+    config_filename = os.path.basename(config_path)
+    with _load_lock:
+        _log_print(f"📂 切换到配置目录: {config_dir}")
+        os.chdir(config_dir)
+        try:
+            client = GoogleAdsClient.load_from_storage(config_filename)
+        finally:
+            # 恢复原始工作目录
+            os.chdir(original_dir)
+    # 通过经理账户（MCC）访问子账户时，以配置的经理账户登录
+    if login_customer_id:
+        client.login_customer_id = login_customer_id
+    return client
+
+
+def _warm_up(client: PooledGoogleAdsClient) -> None:
+    """预先获取访问令牌并创建查询服务的通道（失败只记录日志，首个请求时会再次尝试）"""
+    try:
+        client.refresh_credentials(settings.GOOGLE_ADS_TOKEN_REFRESH_MARGIN_SECONDS)
+        client.get_service("GoogleAdsService")
+    except Exception as e:
+        _log_print(f"⚠️ Google Ads 客户端预热失败: {e}")
+
+
+def _refresh_loop() -> None:
+    """后台线程：定期刷新即将过期的访问令牌"""
+    interval = max(10, settings.GOOGLE_ADS_TOKEN_REFRESH_CHECK_SECONDS)
+    while True:
+        time.sleep(interval)
+        with _clients_lock:
+            clients = list(_clients.values())
+        for client in clients:
+            try:
+                if client.refresh_credentials(settings.GOOGLE_ADS_TOKEN_REFRESH_MARGIN_SECONDS):
+                    logger.debug("Google Ads 访问令牌已刷新: %s", client.key)
+            except Exception as e:
+                _log_print(f"⚠️ 刷新 Google Ads 访问令牌失败: {e}")
+
+
+def _ensure_refresher() -> None:
+    global _refresher
+    if _refresher is None or not _refresher.is_alive():
+        _refresher = threading.Thread(target=_refresh_loop, name="google-ads-token-refresh", daemon=True)
+        _refresher.start()
+
+
+def get_google_ads_client(config_path: str, login_customer_id: Optional[str] = None) -> PooledGoogleAdsClient:
+    """
+    获取（进程内共享的）Google Ads 客户端，首次调用时加载配置并预热
+
+    Args:
+        config_path: google-ads.yaml 路径
+        login_customer_id: 登录客户ID（默认读取 GOOGLE_ADS_LOGIN_CUSTOMER_ID，为空时使用配置文件中的值）
+
+    Raises:
+        加载配置失败时抛出原始异常（不缓存，下次调用重新加载）
+    """
+    if login_customer_id is None:
+        login_customer_id = settings.GOOGLE_ADS_LOGIN_CUSTOMER_ID or ""
+    key = (os.path.abspath(config_path), login_customer_id.replace("-", ""))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+        client = PooledGoogleAdsClient(_load_client(*key), key)
+        _clients[key] = client
+        _ensure_refresher()
+    _log_print("✅ Google Ads 客户端初始化成功")
+    _warm_up(client)
+    return client
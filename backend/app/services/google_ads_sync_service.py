@@ -10,7 +10,6 @@ import atexit
 import logging
 from threading import Lock
 from typing import List, Tuple, Optional, Dict, Any
-from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -19,7 +18,10 @@ from datetime import datetime, timedelta
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.services.base_sync_service import BaseSyncService
+from app.services.google_ads_client_registry import get_google_ads_client
+from app.services.sync_state_service import SyncStateService, date_range, to_segments
 from app.core.config import settings
+from app.core.database import SessionLocal
 
 logger = logging.getLogger("app.services.google_ads_sync_service")
 
@@ -75,6 +77,11 @@ class GoogleAdsDataSyncService(BaseSyncService):
     _cache_ttl = {}  # 缓存过期时间
     CACHE_DURATION = 300  # 缓存5分钟
     
+    # 表结构（主键 + 数据列）
+    PLATFORM = "google"
+    KEY_COLUMNS = ("campaign_id", "createtime")
+    DATA_COLUMNS = ("campaign", "impression", "conversions", "cost", "clicks", "conversion_value")
+    
     def __init__(self, db: Session, config_path: str = None):
         """
         初始化服务
@@ -100,6 +107,10 @@ class GoogleAdsDataSyncService(BaseSyncService):
                 self.config_path = config_path_from_env
         
         self.client = None
+        self.failed_dates: List[str] = []  # 最近一次并发获取中读取失败的日期
+        if settings.GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED:
+            # 按客户写入和覆盖（需先执行 customer_id 迁移脚本）
+            self.DATA_COLUMNS = ("customer_id",) + type(self).DATA_COLUMNS
         
     def setup_proxy(self, proxy_url: str = None):
         """设置代理环境变量"""
@@ -119,25 +130,11 @@ class GoogleAdsDataSyncService(BaseSyncService):
     def initialize_client(self):
         """
         初始化 Google Ads 客户端
-        使用简单直接的加载方式（已验证可工作）
+        从进程内注册表获取共享客户端：配置只加载一次，gRPC 通道和访问令牌在请求间复用
         """
         try:
-            # 切换到配置文件所在目录（关键！）
-            original_dir = os.getcwd()
-            config_dir = os.path.dirname(os.path.abspath(self.config_path))
-            config_filename = os.path.basename(self.config_path)
-            
-            _log_print(f"📂 切换到配置目录: {config_dir}")
-            os.chdir(config_dir)
-            
-            try:
-                # 使用简单的文件名加载（与成功的脚本一致）
-                self.client = GoogleAdsClient.load_from_storage(config_filename)
-                _log_print("✅ Google Ads 客户端初始化成功")
-                return True
-            finally:
-                # 恢复原始工作目录
-                os.chdir(original_dir)
+            self.client = get_google_ads_client(self.config_path)
+            return True
                 
         except Exception as e:
             _log_print(f"❌ 初始化 Google Ads 客户端失败: {e}")
@@ -156,18 +153,47 @@ class GoogleAdsDataSyncService(BaseSyncService):
             current += timedelta(days=1)
         return date_list
     
+    def _split_date_range(self, start_date: str, end_date: str, chunk_days: int) -> List[Tuple[str, str]]:
+        """把日期范围切分为每段最多 chunk_days 天的区间（chunk_days <= 0 时不切分）"""
+        if chunk_days <= 0:
+            return [(start_date, end_date)]
+        date_list = self._generate_date_list(start_date, end_date)
+        return [
+            (date_list[i], date_list[min(i + chunk_days, len(date_list)) - 1])
+            for i in range(0, len(date_list), chunk_days)
+        ]
+    
     def _fetch_single_date_data(
         self,
         customer_id: str,
         date: str
     ) -> Tuple[bool, List[Tuple], str]:
         """
-        获取单个日期的数据（用于并发处理）
+        获取单个日期的数据
         
         Args:
             customer_id: Google Ads 客户ID
             date: 日期
             
+        Returns:
+            (成功标志, 数据列表, 错误信息)
+        """
+        return self._fetch_range_data(customer_id, date, date)
+    
+    def _fetch_range_data(
+        self,
+        customer_id: str,
+        start_date: str,
+        end_date: str
+    ) -> Tuple[bool, List[Tuple], str]:
+        """
+        用一个 search_stream 获取日期区间内按天细分的数据（用于并发处理）
+        
+        Args:
+            customer_id: Google Ads 客户ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
         Returns:
             (成功标志, 数据列表, 错误信息)
         """
@@ -177,7 +203,7 @@ class GoogleAdsDataSyncService(BaseSyncService):
         try:
             ga_service = self.client.get_service("GoogleAdsService")
             
-            # SQL查询语句（单日）
+            # SQL查询语句（按 segments.date 细分，一次返回区间内每天的数据）
             query = f"""
                 SELECT campaign.id,
                        campaign.name,
@@ -188,7 +214,7 @@ class GoogleAdsDataSyncService(BaseSyncService):
                        metrics.conversions_value,
                        segments.date
                 FROM campaign
-                WHERE segments.date = '{date}'
+                WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
             """
             
             # 执行查询
@@ -225,7 +251,8 @@ class GoogleAdsDataSyncService(BaseSyncService):
             return True, ads_data, ""
             
         except Exception as e:
-            error_msg = f"获取 {date} 数据失败: {str(e)}"
+            period = start_date if start_date == end_date else f"{start_date} 到 {end_date}"
+            error_msg = f"获取 {period} 数据失败: {str(e)}"
             return False, [], error_msg
     
     def _generate_cache_key(self, customer_id: str, start_date: str, end_date: str, data_type: str = "summary") -> str:
@@ -260,30 +287,111 @@ class GoogleAdsDataSyncService(BaseSyncService):
         reraise=True  # 最终失败时抛出原始异常
     )
     def _fetch_summary_data(self, customer_id: str, start_date: str, end_date: str) -> Tuple[Dict, List]:
-        """获取单个时间段的汇总和每日数据（线程安全，支持自动重试，带缓存）"""
+        """
+        获取单个时间段的汇总和每日数据（线程安全，支持自动重试，带缓存）
+        
+        已完整同步的日期读取本地表，其余日期（通常只有当天）实时查询，
+        合并每日数据后由合计值计算点击率、平均 CPC 和单次转化成本
+        """
         # 检查缓存
         cache_key = self._generate_cache_key(customer_id, start_date, end_date, "summary")
         cached_data = self._get_from_cache(cache_key)
         if cached_data:
             return cached_data
         
-        # 每个线程获取自己的服务实例以保证线程安全
-        ga_service = self.client.get_service("GoogleAdsService")
+        db_days, live_segments = self._plan_summary_sources(customer_id, start_date, end_date)
+        daily_data = self._fetch_local_daily_data(customer_id, db_days) if db_days else []
+        for segment_start, segment_end in live_segments:
+            daily_data.extend(self._fetch_live_daily_data(customer_id, segment_start, segment_end))
+        daily_data.sort(key=lambda item: item["date"])
+        live_days = sum(len(date_range(s, e)) for s, e in live_segments)
+        _log_print(f"📊 {start_date} 至 {end_date}: 本地表 {len(db_days)} 天，实时查询 {live_days} 天")
         
-        # 汇总查询
-        summary_query = f"""
-            SELECT 
-                metrics.impressions,
-                metrics.clicks,
-                metrics.conversions,
-                metrics.conversions_value,
-                metrics.cost_micros,
-                metrics.ctr,
-                metrics.average_cpc,
-                metrics.cost_per_conversion
-            FROM customer
-            WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
+        # 缓存结果
+        result = (self._summarize_daily_data(daily_data), daily_data)
+        self._set_to_cache(cache_key, result)
+        
+        return result
+    
+    def _plan_summary_sources(
+        self,
+        customer_id: str,
+        start_date: str,
+        end_date: str
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        规划汇总查询的数据来源
+        
+        只有已完整同步、且行上都带有 customer_id 的日期读取本地表；
+        仍含迁移前历史行（customer_id 为空）的日期无法确定归属，改为实时查询
+        
+        Returns:
+            (读取本地表的日期, 需要实时查询的连续日期区间)
         """
+        if not (
+            settings.GOOGLE_ADS_SUMMARY_HYBRID_ENABLED
+            and settings.SYNC_STATE_ENABLED
+            and settings.GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED
+        ):
+            return [], [(start_date, end_date)]
+        db = SessionLocal()
+        try:
+            settled = set(SyncStateService(db).settled_days(
+                self.PLATFORM, customer_id, start_date, end_date, settings.GOOGLE_ADS_SUMMARY_SETTLE_HOURS
+            ))
+            if settled:
+                legacy_days = db.execute(
+                    text(
+                        f"SELECT DISTINCT createtime FROM {self.table_name} "
+                        f"WHERE customer_id = '' AND createtime BETWEEN :start_date AND :end_date"
+                    ),
+                    {"start_date": start_date, "end_date": end_date},
+                ).scalars().all()
+                settled -= {str(day)[:10] for day in legacy_days}
+        except Exception as e:
+            _log_print(f"⚠️ 读取同步状态失败，全部实时查询: {e}")
+            return [], [(start_date, end_date)]
+        finally:
+            db.close()
+        all_days = date_range(start_date, end_date)
+        return (
+            [day for day in all_days if day in settled],
+            to_segments(day for day in all_days if day not in settled),
+        )
+    
+    def _fetch_local_daily_data(self, customer_id: str, days: List[str]) -> List[Dict[str, Any]]:
+        """从本地表按天汇总指定客户的数据（独立会话，可在线程池中并发调用）"""
+        query = text(
+            f"SELECT createtime, SUM(impression) AS impressions, SUM(clicks) AS clicks, "
+            f"SUM(conversions) AS conversions, SUM(conversion_value) AS conversions_value, SUM(cost) AS cost "
+            f"FROM {self.table_name} "
+            f"WHERE customer_id = :customer_id AND createtime BETWEEN :start_date AND :end_date "
+            f"GROUP BY createtime"
+        )
+        wanted = set(days)
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                query, {"customer_id": customer_id, "start_date": min(days), "end_date": max(days)}
+            ).mappings().all()
+        finally:
+            db.close()
+        return [
+            {
+                "date": str(row["createtime"])[:10],
+                "impressions": int(row["impressions"] or 0),
+                "clicks": int(row["clicks"] or 0),
+                "conversions": float(row["conversions"] or 0),
+                "conversions_value": float(row["conversions_value"] or 0),
+                "cost": float(row["cost"] or 0),
+            }
+            for row in rows
+            if str(row["createtime"])[:10] in wanted
+        ]
+    
+    def _fetch_live_daily_data(self, customer_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """从 Google Ads API 实时查询账户级每日数据"""
+        ga_service = self.client.get_service("GoogleAdsService")
         
         # 每日数据查询
         daily_query = f"""
@@ -299,24 +407,8 @@ class GoogleAdsDataSyncService(BaseSyncService):
             ORDER BY segments.date
         """
         
-        summary_response = ga_service.search(customer_id=customer_id, query=summary_query)
         daily_response = ga_service.search(customer_id=customer_id, query=daily_query)
         
-        # 解析汇总数据
-        summary = {}
-        for row in summary_response:
-            metrics = row.metrics
-            summary = {
-                "impressions": metrics.impressions,
-                "clicks": metrics.clicks,
-                "conversions": metrics.conversions,
-                "conversions_value": metrics.conversions_value,
-                "cost": float(metrics.cost_micros) / 1000000,
-                "ctr": metrics.ctr * 100,
-                "average_cpc": float(metrics.average_cpc) / 1000000,
-                "cost_per_conversion": float(metrics.cost_per_conversion) / 1000000 if metrics.cost_per_conversion > 0 else 0
-            }
-        
         # 解析每日数据
         daily_data = []
         for row in daily_response:
@@ -330,12 +422,27 @@ class GoogleAdsDataSyncService(BaseSyncService):
                 "conversions_value": metrics.conversions_value,
                 "cost": float(metrics.cost_micros) / 1000000
             })
-        
-        # 缓存结果
-        result = (summary, daily_data)
-        self._set_to_cache(cache_key, result)
-        
-        return result
+        return daily_data
+    
+    @staticmethod
+    def _summarize_daily_data(daily_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """按每日数据求合计，比率指标由合计值计算（与 API 的 ctr/average_cpc/cost_per_conversion 口径一致）"""
+        if not daily_data:
+            return {}
+        impressions = sum(item["impressions"] for item in daily_data)
+        clicks = sum(item["clicks"] for item in daily_data)
+        conversions = sum(item["conversions"] for item in daily_data)
+        cost = sum(item["cost"] for item in daily_data)
+        return {
+            "impressions": impressions,
+            "clicks": clicks,
+            "conversions": conversions,
+            "conversions_value": sum(item["conversions_value"] for item in daily_data),
+            "cost": cost,
+            "ctr": clicks / impressions * 100 if impressions > 0 else 0,
+            "average_cpc": cost / clicks if clicks > 0 else 0,
+            "cost_per_conversion": cost / conversions if conversions > 0 else 0
+        }
     
     def fetch_overview_summary(
         self, 
@@ -578,16 +685,21 @@ class GoogleAdsDataSyncService(BaseSyncService):
         customer_id: str, 
         start_date: str,
         end_date: str,
-        max_workers: int = 5
+        max_workers: int = 5,
+        chunk_days: Optional[int] = None
     ) -> Tuple[bool, List[Tuple], str]:
         """
         从 Google Ads API 并发获取广告系列数据（优化版本）
         
+        日期范围按 chunk_days 切分，每段用一个 segments.date BETWEEN 查询流式读取，
+        各段并发执行；某段读取失败时该段的日期记入 failed_dates
+        
         Args:
             customer_id: Google Ads 客户ID
             start_date: 开始日期
             end_date: 结束日期
             max_workers: 最大并发线程数（Google Ads API 建议较少并发）
+            chunk_days: 每段天数（默认读取 GOOGLE_ADS_SYNC_CHUNK_DAYS，0 表示整个范围一次读取，1 表示逐天读取）
             
         Returns:
             (成功标志, 数据列表, 错误信息)
@@ -596,44 +708,48 @@ class GoogleAdsDataSyncService(BaseSyncService):
             return False, [], "客户端未初始化"
         
         try:
-            # 生成日期列表
-            date_list = self._generate_date_list(start_date, end_date)
-            _log_print(f"📅 将并发获取 {len(date_list)} 天的数据: {start_date} 到 {end_date}")
-            effective_workers = min(max_workers, settings.GOOGLE_ADS_MAX_WORKERS)
+            if chunk_days is None:
+                chunk_days = settings.GOOGLE_ADS_SYNC_CHUNK_DAYS
+            chunks = self._split_date_range(start_date, end_date, chunk_days)
+            _log_print(f"📅 将分 {len(chunks)} 段获取数据: {start_date} 到 {end_date}")
+            effective_workers = min(max_workers, settings.GOOGLE_ADS_MAX_WORKERS, len(chunks))
             if effective_workers != max_workers:
-                _log_print(f"🚀 请求 {max_workers} 个并发线程，已根据配置限制为 {effective_workers} 个")
+                _log_print(f"🚀 请求 {max_workers} 个并发线程，已根据配置和分段数限制为 {effective_workers} 个")
             else:
                 _log_print(f"🚀 使用 {effective_workers} 个并发线程")
             
             all_ads_data = []
-            completed_dates = 0
-            total_dates = len(date_list)
+            completed_chunks = 0
+            total_chunks = len(chunks)
+            self.failed_dates = []
             
             # 使用线程池并发获取数据（复用线程池，减少创建销毁开销）
             executor = _get_thread_pool(effective_workers)
             # 提交所有任务
-            future_to_date = {
-                executor.submit(self._fetch_single_date_data, customer_id, date): date
-                for date in date_list
+            future_to_chunk = {
+                executor.submit(self._fetch_range_data, customer_id, chunk_start, chunk_end): (chunk_start, chunk_end)
+                for chunk_start, chunk_end in chunks
             }
             
             # 收集结果
-            for future in as_completed(future_to_date):
-                date = future_to_date[future]
-                completed_dates += 1
+            for future in as_completed(future_to_chunk):
+                chunk_start, chunk_end = future_to_chunk[future]
+                completed_chunks += 1
                 
                 try:
-                    success, date_data, error_msg = future.result()
-                    if success and date_data:
-                        all_ads_data.extend(date_data)
+                    success, chunk_data, error_msg = future.result()
+                    if success and chunk_data:
+                        all_ads_data.extend(chunk_data)
                     elif not success:
-                        _log_print(f"   ⚠️  {date} 获取失败: {error_msg}")
+                        self.failed_dates.extend(self._generate_date_list(chunk_start, chunk_end))
+                        _log_print(f"   ⚠️  {chunk_start} 到 {chunk_end} 获取失败: {error_msg}")
                     
                     # 显示进度
-                    progress = (completed_dates / total_dates) * 100
-                    _log_print(f"⏳ 进度: {completed_dates}/{total_dates} ({progress:.1f}%) - 已获取 {len(all_ads_data)} 条数据")
+                    progress = (completed_chunks / total_chunks) * 100
+                    _log_print(f"⏳ 进度: {completed_chunks}/{total_chunks} ({progress:.1f}%) - 已获取 {len(all_ads_data)} 条数据")
                 except Exception as e:
-                    _log_print(f"   ⚠️  {date} 处理失败: {e}")
+                    self.failed_dates.extend(self._generate_date_list(chunk_start, chunk_end))
+                    _log_print(f"   ⚠️  {chunk_start} 到 {chunk_end} 处理失败: {e}")
             
             _log_print(f"\n🎉 并发获取完成！总共找到 {len(all_ads_data)} 条广告数据")
             return True, all_ads_data, ""
@@ -643,12 +759,52 @@ class GoogleAdsDataSyncService(BaseSyncService):
             _log_print(f"❌ {error_msg}")
             return False, [], error_msg
     
+    def _customer_clause(self, customer_id: str, alias: str = "") -> str:
+        """
+        客户范围条件
+        
+        迁移前写入的历史行 customer_id 为空，它们属于原 GOOGLE_ADS_CUSTOMER_ID，
+        由该客户的同步一并覆盖（写入时补上 customer_id），不需要手工回填
+        """
+        prefix = f"{alias}." if alias else ""
+        if customer_id == (settings.GOOGLE_ADS_CUSTOMER_ID or "").replace("-", ""):
+            return f"{prefix}customer_id IN (:customer_id, '')"
+        return f"{prefix}customer_id = :customer_id"
+    
+    def _scope_clause(self, scope: Optional[Dict[str, Any]], alias: str = "") -> str:
+        scope = dict(scope or {})
+        customer_id = scope.pop("customer_id", None)
+        clause = super()._scope_clause(scope, alias)
+        if customer_id is not None:
+            clause += f" AND {self._customer_clause(customer_id, alias)}"
+        return clause
+    
+    def delete_data_in_range(self, start_date: str, end_date: str, customer_id: str = None) -> None:
+        """
+        删除指定日期范围和客户的数据
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            customer_id: 客户ID（可选）
+        """
+        if customer_id:
+            delete_query = text(
+                f"DELETE FROM {self.table_name}{self.partition_selection(start_date, end_date)} "
+                f"WHERE createtime BETWEEN :start_date AND :end_date AND {self._customer_clause(customer_id)}"
+            )
+            self.db.execute(delete_query, {"start_date": start_date, "end_date": end_date, "customer_id": customer_id})
+            _log_print(f"🗑️  已删除客户 {customer_id} 日期范围 {start_date} 到 {end_date} 的数据")
+        else:
+            super().delete_data_in_range(start_date, end_date)
+    
     def sync_to_database(
         self, 
         data_list: List[Tuple],
         start_date: str,
         end_date: str,
-        clear_existing: bool = True
+        clear_existing: bool = True,
+        customer_id: Optional[str] = None
     ) -> Tuple[bool, str]:
         """
         同步数据到数据库
@@ -657,35 +813,23 @@ class GoogleAdsDataSyncService(BaseSyncService):
             data_list: 要插入的数据列表
             start_date: 开始日期
             end_date: 结束日期
-            clear_existing: 是否清空日期范围内的现有数据
+            clear_existing: 是否清理日期范围内的现有数据（upsert 模式下仅删除上游已消失的行；
+                data_list 为空时窗口内的现有数据全部删除）
+            customer_id: 客户ID（开启 GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED 时只覆盖该客户的数据，
+                多个客户可分别同步同一日期范围）
             
         Returns:
             (成功标志, 消息)
         """
-        if not data_list:
+        if not data_list and not clear_existing:
             return False, "没有数据需要同步"
         
         try:
-            # 清空指定日期范围内的数据（如果需要）
-            if clear_existing:
-                self.delete_data_in_range(start_date, end_date)
-            
-            # 准备SQL语句
-            insert_query = text("""
-                INSERT INTO fact_bi_ads_google_campaign (
-                    campaign_id, campaign, impression, 
-                    conversions, cost, clicks, conversion_value, createtime
-                )
-                VALUES (
-                    :campaign_id, :campaign, :impression,
-                    :conversions, :cost, :clicks, :conversion_value, :createtime
-                )
-            """)
-            
             # 转换数据为字典格式
             data_dicts = [
                 {
                     "campaign_id": data[0],
+                    "customer_id": customer_id or "",
                     "campaign": data[1],
                     "impression": data[2],
                     "conversions": data[3],
@@ -697,9 +841,12 @@ class GoogleAdsDataSyncService(BaseSyncService):
                 for data in data_list
             ]
             
-            # 批量插入
-            count = self.batch_insert(insert_query, data_dicts)
-            message = f"成功插入 {count} 条数据"
+            # 按写入模式覆盖或增量写入（clear_existing 控制是否清理窗口内的旧数据）
+            scope = {"customer_id": customer_id} if customer_id and settings.GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED else None
+            count = self.write_rows(data_dicts, start_date, end_date, scope=scope, delete_missing=clear_existing)
+            self.track_written_rows(data_dicts)
+            self.notify_data_changed(start_date, end_date)
+            message = f"成功写入 {count} 条数据"
             return True, message
             
         except Exception as e:
@@ -716,7 +863,8 @@ class GoogleAdsDataSyncService(BaseSyncService):
         proxy_url: Optional[str] = None,
         clear_existing: bool = True,
         use_concurrent: bool = True,
-        max_workers: int = 10  # 提升并发数：5 -> 10
+        max_workers: int = 10,  # 提升并发数：5 -> 10
+        skip_fresh_seconds: int = 0
     ) -> Dict[str, Any]:
         """
         完整的同步流程：获取数据并同步到数据库（优化版本）
@@ -729,6 +877,7 @@ class GoogleAdsDataSyncService(BaseSyncService):
             clear_existing: 是否清空现有数据
             use_concurrent: 是否使用并发模式（默认True，性能更好）
             max_workers: 并发线程数（默认5，Google Ads API建议较少并发）
+            skip_fresh_seconds: 大于 0 时跳过在该时间内已成功同步的日期（需启用 SYNC_STATE_ENABLED）
             
         Returns:
             包含执行结果的字典
@@ -749,40 +898,102 @@ class GoogleAdsDataSyncService(BaseSyncService):
             if not self.initialize_client():
                 return self.create_sync_result(False, "初始化 Google Ads 客户端失败", 0, ["初始化失败"])
             
-            # 获取数据（选择并发或串行模式）
-            _log_print("\n📡 从 Google Ads API 获取数据...")
-            if use_concurrent:
-                success, data_list, error_msg = self.fetch_campaigns_data_concurrent(
-                    customer_id, start_date, end_date, max_workers
+            segments = self.plan_sync_segments(customer_id, start_date, end_date, skip_fresh_seconds)
+            if not segments:
+                _log_print("✅ 所有日期均在近期成功同步，本次跳过")
+                return self.create_sync_result(True, "所有日期均在近期成功同步，本次跳过", 0)
+            
+            total_rows = 0
+            messages = []
+            errors = []
+            for segment_start, segment_end in segments:
+                self.begin_sync_segment(customer_id, segment_start, segment_end)
+                success, rows, message, failed_days = self._sync_window(
+                    customer_id, segment_start, segment_end, clear_existing, use_concurrent, max_workers
                 )
-            else:
-                success, data_list, error_msg = self.fetch_campaigns_data(
-                    customer_id, start_date, end_date
-                )
-            
-            if not success:
-                return self.create_sync_result(False, error_msg, 0, [error_msg])
+                self.finish_sync_segment(customer_id, segment_start, segment_end, failed_days, message)
+                total_rows += rows
+                if failed_days:
+                    errors.append(message)
+                elif message:
+                    messages.append(message)
             
-            _log_print(f"✅ 成功获取 {len(data_list)} 条广告数据")
-            
-            # 同步到数据库
-            _log_print("\n💾 写入数据库...")
-            success, message = self.sync_to_database(data_list, start_date, end_date, clear_existing)
-            if not success:
-                return self.create_sync_result(False, message, 0, [message])
+            if errors and not total_rows:
+                return self.create_sync_result(False, errors[0], 0, errors)
             
             elapsed_time = time.time() - start_time
             
             _log_print(f"\n{'='*60}")
             _log_print(f"✅ Google Ads 数据同步完成！")
-            _log_print(f"📊 共同步 {len(data_list)} 条记录")
+            _log_print(f"📊 共同步 {total_rows} 条记录")
             _log_print(f"⏱️  总耗时: {elapsed_time:.2f} 秒")
-            _log_print(f"⚡ 平均速度: {len(data_list)/elapsed_time:.2f} 条/秒")
+            _log_print(f"⚡ 平均速度: {total_rows/elapsed_time:.2f} 条/秒")
             _log_print(f"{'='*60}\n")
             
-            # 成功
-            return self.create_sync_result(True, f"{message}（耗时 {elapsed_time:.2f}秒）", len(data_list))
+            if errors:
+                return self.create_sync_result(
+                    False, f"部分日期同步失败，已写入 {total_rows} 条数据（耗时 {elapsed_time:.2f}秒）", total_rows, errors
+                )
+            message = messages[0] if len(messages) == 1 else f"成功写入 {total_rows} 条数据"
+            return self.create_sync_result(True, f"{message}（耗时 {elapsed_time:.2f}秒）", total_rows)
             
         except Exception as e:
             error_msg = f"同步过程出错: {str(e)}"
             return self.create_sync_result(False, error_msg, 0, [error_msg])
+    
+    def _sync_window(
+        self,
+        customer_id: str,
+        start_date: str,
+        end_date: str,
+        clear_existing: bool,
+        use_concurrent: bool,
+        max_workers: int
+    ) -> Tuple[bool, int, str, set]:
+        """
+        同步一个连续日期区间
+        
+        并发模式下部分日期读取失败时，只写入成功读取的连续日期，失败日期的现有数据保持不变
+        
+        Returns:
+            (成功标志, 写入的记录数, 消息, 失败的日期集合)
+        """
+        all_days = set(date_range(start_date, end_date))
+        
+        # 获取数据（选择并发或串行模式）
+        _log_print("\n📡 从 Google Ads API 获取数据...")
+        self.failed_dates = []
+        if use_concurrent:
+            success, data_list, error_msg = self.fetch_campaigns_data_concurrent(
+                customer_id, start_date, end_date, max_workers
+            )
+        else:
+            success, data_list, error_msg = self.fetch_campaigns_data(
+                customer_id, start_date, end_date
+            )
+        
+        if not success:
+            return False, 0, error_msg, all_days
+        
+        _log_print(f"✅ 成功获取 {len(data_list)} 条广告数据")
+        failed_days = set(self.failed_dates) & all_days
+        
+        # 同步到数据库（跳过读取失败的日期；清理模式下没有数据的日期也要写入，以删除上游已消失的行）
+        _log_print("\n💾 写入数据库...")
+        messages = []
+        for segment_start, segment_end in to_segments(d for d in date_range(start_date, end_date) if d not in failed_days):
+            rows = data_list if not failed_days else [
+                data for data in data_list if segment_start <= str(data[7])[:10] <= segment_end
+            ]
+            if not rows and not clear_existing:
+                continue
+            success, message = self.sync_to_database(rows, segment_start, segment_end, clear_existing, customer_id)
+            if not success:
+                return False, 0, message, all_days
+            messages.append(message)
+        
+        if failed_days:
+            return True, len(data_list), f"{len(failed_days)} 天读取失败: {', '.join(sorted(failed_days))}", failed_days
+        if not data_list:
+            return True, 0, "没有数据需要同步", set()
+        return True, len(data_list), messages[0] if len(messages) == 1 else f"成功写入 {len(data_list)} 条数据", set()
@@ -7,7 +7,7 @@ from sqlalchemy import text
 from app.services.base_service import BaseDashboardService
 from app.services.data_parser_config import get_parse_config
 from app.utils.chart_helpers import generate_chart_data, GOOGLE_IMPRESSION_CHART_CONFIG, GOOGLE_CONVERSION_CHART_CONFIG
-from app.utils.helpers import build_mysql_regex_union, escape_mysql_regex_literal, safe_divide
+from app.utils.helpers import build_mysql_regex_union, escape_mysql_regex_literal, get_week_comparison_bounds, safe_divide
 from app.core.cache import cached
 from app.core.config import settings
 
@@ -41,9 +41,12 @@ class GoogleDashboardService(BaseDashboardService):
             ORDER BY createtime
         """)
         
-        # 执行查询
-        current_rows = await self.execute_query(query, {"start_date": start_date, "end_date": end_date})
-        current_data = [self._parse_impression_row(row) for row in current_rows]
+        # 执行查询（当前期与对比期在独立连接上并行）
+        queries = [(query, {"start_date": start_date, "end_date": end_date})]
+        if compare_start_date and compare_end_date:
+            queries.append((query, {"start_date": compare_start_date, "end_date": compare_end_date}))
+        period_rows = await self.execute_queries_parallel(*queries)
+        current_data = [self._parse_impression_row(row) for row in period_rows[0]]
         
         # 生成图表数据
         chart_data = generate_chart_data(current_data, "date", GOOGLE_IMPRESSION_CHART_CONFIG)
@@ -64,8 +67,7 @@ class GoogleDashboardService(BaseDashboardService):
         
         # 处理对比数据
         if compare_start_date and compare_end_date:
-            compare_rows = await self.execute_query(query, {"start_date": compare_start_date, "end_date": compare_end_date})
-            compare_data = [self._parse_impression_row(row) for row in compare_rows]
+            compare_data = [self._parse_impression_row(row) for row in period_rows[1]]
             
             result = self.process_comparison_data(
                 current_data=current_data,
@@ -115,9 +117,12 @@ class GoogleDashboardService(BaseDashboardService):
             GROUP BY createtime
         """)
         
-        # 执行查询
-        current_rows = await self.execute_query(query, {"start_date": start_date, "end_date": end_date})
-        current_data = [self._parse_conversion_row(row) for row in current_rows]
+        # 执行查询（当前期与对比期在独立连接上并行）
+        queries = [(query, {"start_date": start_date, "end_date": end_date})]
+        if compare_start_date and compare_end_date:
+            queries.append((query, {"start_date": compare_start_date, "end_date": compare_end_date}))
+        period_rows = await self.execute_queries_parallel(*queries)
+        current_data = [self._parse_conversion_row(row) for row in period_rows[0]]
         
         # 生成图表数据
         chart_data = generate_chart_data(current_data, "date", GOOGLE_CONVERSION_CHART_CONFIG)
@@ -143,8 +148,7 @@ class GoogleDashboardService(BaseDashboardService):
         
         # 处理对比数据
         if compare_start_date and compare_end_date:
-            compare_rows = await self.execute_query(query, {"start_date": compare_start_date, "end_date": compare_end_date})
-            compare_data = [self._parse_conversion_row(row) for row in compare_rows]
+            compare_data = [self._parse_conversion_row(row) for row in period_rows[1]]
             
             result = self.process_comparison_data(
                 current_data=current_data,
@@ -308,16 +312,24 @@ class GoogleDashboardService(BaseDashboardService):
         
         return [self._parse_campaign_performance_row(row) for row in rows]
     
-    @cached(prefix="google:ads_performance", ttl=settings.CACHE_TTL_LONG)
+    @cached(
+        prefix="google:ads_performance",
+        ttl=settings.CACHE_TTL_LONG,
+        range_builder=lambda arguments: get_week_comparison_bounds(arguments["variable_date"])
+    )
     async def get_ads_performance_overview(self, variable_date: str) -> List[Dict[str, Any]]:
         """获取Ads Performance Overview数据（产品表现）- 已启用缓存"""
         product_list = [name.strip() for name in settings.GOOGLE_PRODUCT_NAMES_LIST if name and name.strip()]
         if not product_list:
             return []
 
+        # 显式限定扫描范围（上周一 ~ 本周日），使 createtime 分区裁剪生效
+        scan_start, scan_end = get_week_comparison_bounds(variable_date)
         params = {
             "variable_time": variable_date,
             "product_pattern": build_mysql_regex_union(product_list),
+            "scan_start": scan_start,
+            "scan_end": scan_end,
         }
 
         # 动态构建CASE WHEN语句（使用参数绑定，避免字符串拼接注入）
@@ -358,6 +370,7 @@ class GoogleDashboardService(BaseDashboardService):
                 conversions, cost, conversion_value, createtime
               FROM fact_bi_ads_google_campaign, date_range
               WHERE campaign REGEXP :product_pattern
+                AND createtime BETWEEN :scan_start AND :scan_end
             ),
             current_week_data AS (
               SELECT
@@ -0,0 +1,237 @@
+"""
+事实表分区管理服务
+按 createtime 做月度 RANGE COLUMNS 分区：预建未来分区、按保留期整区删除、为同步删除提供分区选择
+"""
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.partition_service")
+
+PARTITIONED_FACT_TABLES = (
+    "fact_bi_ads_facebook_campaign",
+    "fact_bi_ads_google_campaign",
+)
+MAXVALUE_PARTITION = "pmax"
+PARTITION_INFO_TTL = 600  # 分区元数据缓存时间（秒）
+
+# 表名 -> (过期时间, [(分区名, 上界日期或None表示MAXVALUE)])
+_partition_cache: Dict[str, Tuple[float, List[Tuple[str, Optional[date]]]]] = {}
+_partition_cache_lock = threading.Lock()
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """月度分区名，例如 2026-01 -> p202601"""
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def build_partition_clause(months: List[date]) -> str:
+    """生成按月分区定义（末尾追加 MAXVALUE 分区）"""
+    parts = [
+        f"PARTITION {partition_name(month)} VALUES LESS THAN ('{_add_months(month, 1).isoformat()}')"
+        for month in months
+    ]
+    parts.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ",\n    ".join(parts)
+
+
+class PartitionService:
+    """事实表分区管理服务"""
+
+    def __init__(self, db: Session):
+        """
+        初始化服务
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    def get_partitions(self, table_name: str, refresh: bool = False) -> List[Tuple[str, Optional[date]]]:
+        """
+        获取表的分区列表（按上界升序）
+
+        Returns:
+            [(分区名, 上界日期)]，MAXVALUE 分区的上界为 None；未分区的表返回空列表
+        """
+        now = time.time()
+        if not refresh:
+            with _partition_cache_lock:
+                cached = _partition_cache.get(table_name)
+                if cached and cached[0] > now:
+                    return cached[1]
+
+        rows = self.db.execute(
+            text("""
+                SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+                FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE()
+                  AND TABLE_NAME = :table_name
+                  AND PARTITION_NAME IS NOT NULL
+                ORDER BY PARTITION_ORDINAL_POSITION
+            """),
+            {"table_name": table_name},
+        ).fetchall()
+
+        partitions = []
+        for name, description in rows:
+            bound = (description or "").strip("'\"")
+            partitions.append((name, None if bound.upper() == "MAXVALUE" else _to_date(bound)))
+
+        with _partition_cache_lock:
+            _partition_cache[table_name] = (now + PARTITION_INFO_TTL, partitions)
+        return partitions
+
+    def partitions_for_range(self, table_name: str, start_date: str, end_date: str) -> List[str]:
+        """
+        计算日期范围涉及的分区名（用于 DELETE/SELECT ... PARTITION (...) 显式分区选择）
+
+        Returns:
+            分区名列表；表未分区或查询失败时返回空列表（调用方不加分区限定）
+        """
+        try:
+            partitions = self.get_partitions(table_name)
+        except Exception as e:
+            _log_print(f"⚠️  读取分区信息失败，按未分区处理: {e}")
+            return []
+        if not partitions:
+            return []
+
+        start, end = _to_date(start_date), _to_date(end_date)
+        selected = []
+        lower = None
+        for name, upper in partitions:
+            # 分区覆盖 [lower, upper)
+            if (upper is None or start < upper) and (lower is None or end >= lower):
+                selected.append(name)
+            lower = upper
+        return selected
+
+    def ensure_future_partitions(self, table_name: str, months_ahead: int) -> List[str]:
+        """预建从当前月起未来 months_ahead 个月的分区（拆分 MAXVALUE 分区）"""
+        partitions = self.get_partitions(table_name, refresh=True)
+        if not partitions:
+            return []
+
+        monthly_bounds = [upper for _, upper in partitions if upper is not None]
+        last_bound = max(monthly_bounds) if monthly_bounds else _month_start(date.today())
+        target_bound = _add_months(_month_start(date.today()), months_ahead + 1)
+
+        new_months = []
+        month = last_bound
+        while month < target_bound:
+            new_months.append(month)
+            month = _add_months(month, 1)
+        if not new_months:
+            return []
+
+        has_maxvalue = any(upper is None for _, upper in partitions)
+        if has_maxvalue:
+            ddl = (
+                f"ALTER TABLE {table_name} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO (\n    "
+                f"{build_partition_clause(new_months)}\n)"
+            )
+        else:
+            new_parts = ",\n    ".join(
+                f"PARTITION {partition_name(m)} VALUES LESS THAN ('{_add_months(m, 1).isoformat()}')"
+                for m in new_months
+            )
+            ddl = f"ALTER TABLE {table_name} ADD PARTITION (\n    {new_parts}\n)"
+        self.db.execute(text(ddl))
+        self.get_partitions(table_name, refresh=True)
+
+        created = [partition_name(m) for m in new_months]
+        _log_print(f"🧱 {table_name} 已预建分区: {', '.join(created)}")
+        return created
+
+    def drop_expired_partitions(self, table_name: str, retention_months: int) -> List[str]:
+        """整区删除超过保留期的月度分区（retention_months <= 0 时不删除）"""
+        if retention_months <= 0:
+            return []
+        partitions = self.get_partitions(table_name, refresh=True)
+        cutoff = _add_months(_month_start(date.today()), -retention_months)
+        expired = [name for name, upper in partitions if upper is not None and upper <= cutoff]
+        if not expired:
+            return []
+        # 至少保留一个有界分区，避免把表删成只剩 MAXVALUE
+        if len(expired) >= len([p for p in partitions if p[1] is not None]):
+            expired = expired[:-1]
+        if not expired:
+            return []
+
+        self.db.execute(text(f"ALTER TABLE {table_name} DROP PARTITION {', '.join(expired)}"))
+        self.get_partitions(table_name, refresh=True)
+        _log_print(f"🗑️  {table_name} 已删除过期分区（早于 {cutoff.isoformat()}）: {', '.join(expired)}")
+        return expired
+
+    def run_maintenance(self) -> Dict[str, Dict[str, List[str]]]:
+        """对所有已分区的事实表执行预建与过期清理"""
+        report = {}
+        for table_name in PARTITIONED_FACT_TABLES:
+            try:
+                if not self.get_partitions(table_name, refresh=True):
+                    _log_print(f"ℹ️ {table_name} 未分区，跳过分区维护（可执行 scripts/partition_fact_tables.py --init）")
+                    continue
+                report[table_name] = {
+                    "created": self.ensure_future_partitions(
+                        table_name, settings.FACT_PARTITION_PRECREATE_MONTHS
+                    ),
+                    "dropped": self.drop_expired_partitions(
+                        table_name, settings.FACT_PARTITION_RETENTION_MONTHS
+                    ),
+                }
+            except Exception as e:
+                _log_print(f"❌ {table_name} 分区维护失败: {e}")
+        return report
+
+    def build_initial_partition_ddl(self, table_name: str, from_month: date, months_ahead: int) -> str:
+        """生成把未分区表改为月度分区表的 DDL（from_month 之前的数据落入第一个分区）"""
+        first = _month_start(from_month)
+        last = _add_months(_month_start(date.today()), months_ahead)
+        months = []
+        month = first
+        while month <= last:
+            months.append(month)
+            month = _add_months(month, 1)
+        return (
+            f"ALTER TABLE {table_name}\n"
+            f"PARTITION BY RANGE COLUMNS(createtime) (\n    {build_partition_clause(months)}\n)"
+        )
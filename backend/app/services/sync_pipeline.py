@@ -0,0 +1,169 @@
+"""
+同步流式流水线
+fetch → transform → write 三段通过有界队列连接：上游页面边读取边转换边写库，
+队列满时上游阻塞（背压），在途行数不超过配置上限，峰值内存与同步窗口大小无关
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger("app.services.sync_pipeline")
+
+_END = object()  # 队列结束标记
+_QUEUE_POLL_SECONDS = 0.5  # 阻塞读写队列时检查中止标志的间隔
+
+# 读取任务：接收 emit 回调，每读到一批行调用一次
+FetchTask = Callable[[Callable[[List[Any]], None]], None]
+
+
+class PipelineAborted(Exception):
+    """流水线已中止（其他阶段出错）"""
+
+
+class StreamingPipeline:
+    """有界三段式流水线（读取可多线程并发，转换单线程，写入在调用线程中执行）"""
+
+    def __init__(self, max_inflight_rows: int, batch_size: int, fetch_workers: int = 1):
+        """
+        Args:
+            max_inflight_rows: 两个队列中最多缓存的行数（不含各阶段正在处理的批次）
+            batch_size: 每批行数（用于换算队列长度）
+            fetch_workers: 并发执行读取任务的线程数
+        """
+        slots = max(2, max_inflight_rows // max(1, batch_size))
+        self.fetch_workers = max(1, fetch_workers)
+        self._raw: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, slots // 2))
+        self._transformed: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, slots - slots // 2))
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "rows_fetched": 0,
+            "rows_written": 0,
+            "batches": 0,
+            "producer_waits": 0,  # 因队列已满而阻塞的次数（背压）
+            "max_queued_batches": 0,
+            "seconds": 0.0,
+        }
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _put(self, target: "queue.Queue[Any]", item: Any) -> None:
+        """放入队列，队列已满时阻塞等待；流水线中止时抛出 PipelineAborted"""
+        if target.full():
+            with self._lock:
+                self.stats["producer_waits"] += 1
+        while True:
+            if self._stop.is_set():
+                raise PipelineAborted()
+            try:
+                target.put(item, timeout=_QUEUE_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        queued = self._raw.qsize() + self._transformed.qsize()
+        if queued > self.stats["max_queued_batches"]:
+            self.stats["max_queued_batches"] = queued
+
+    def _get(self, source: "queue.Queue[Any]") -> Any:
+        """从队列取出，流水线中止时抛出 PipelineAborted"""
+        while True:
+            if self._stop.is_set():
+                raise PipelineAborted()
+            try:
+                return source.get(timeout=_QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _emit(self, rows: List[Any]) -> None:
+        if rows:
+            with self._lock:
+                self.stats["rows_fetched"] += len(rows)
+            self._put(self._raw, rows)
+
+    def _run_fetchers(self, tasks: List[FetchTask]) -> None:
+        def run_task(task: FetchTask) -> None:
+            if self._stop.is_set():
+                return
+            try:
+                task(self._emit)
+            except PipelineAborted:
+                pass
+            except BaseException as e:
+                self._fail(e)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.fetch_workers, max(1, len(tasks)))) as executor:
+                list(executor.map(run_task, tasks))
+            self._put(self._raw, _END)
+        except PipelineAborted:
+            pass
+
+    def _run_transformer(self, transform: Callable[[List[Any]], List[Any]]) -> None:
+        try:
+            while True:
+                batch = self._get(self._raw)
+                if batch is _END:
+                    self._put(self._transformed, _END)
+                    return
+                rows = transform(batch)
+                if rows:
+                    self._put(self._transformed, rows)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def run(
+        self,
+        fetch_tasks: List[FetchTask],
+        transform: Callable[[List[Any]], List[Any]],
+        write: Callable[[List[Any]], None]
+    ) -> Dict[str, Any]:
+        """
+        运行流水线直到所有读取任务完成且数据全部写入
+
+        Args:
+            fetch_tasks: 读取任务列表
+            transform: 转换函数（一批原始行 -> 一批待写入行）
+            write: 写入函数（在调用线程中执行，可安全使用调用方的数据库会话）
+
+        Returns:
+            统计信息
+
+        Raises:
+            任一阶段的第一个异常（其余阶段随之中止）
+        """
+        started = time.time()
+        fetcher = threading.Thread(target=self._run_fetchers, args=(fetch_tasks,), name="sync-fetch", daemon=True)
+        transformer = threading.Thread(target=self._run_transformer, args=(transform,), name="sync-transform", daemon=True)
+        fetcher.start()
+        transformer.start()
+        try:
+            while True:
+                batch = self._get(self._transformed)
+                if batch is _END:
+                    break
+                write(batch)
+                self.stats["batches"] += 1
+                self.stats["rows_written"] += len(batch)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            if self._errors:
+                self._stop.set()
+            fetcher.join()
+            transformer.join()
+            self.stats["seconds"] = round(time.time() - started, 3)
+
+        if self._errors:
+            raise self._errors[0]
+        return dict(self.stats)
@@ -0,0 +1,259 @@
+"""
+同步状态（水位）服务
+按 平台 × 账户 × 天 记录最近一次同步的状态、行数和内容校验和，
+用于规划下一次同步：失败或中断的日期优先重试，近期已成功同步的日期可以跳过
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger("app.services.sync_state_service")
+
+SYNC_STATE_TABLE = "bi_ads_sync_state"
+STATUS_RUNNING = "running"
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+_CHECKSUM_MODULUS = 1 << 128
+
+
+def _log_print(*args, **kwargs) -> None:
+    sep = kwargs.get("sep", " ")
+    message = sep.join(str(arg) for arg in args).strip()
+    if not message:
+        return
+    if "❌" in message:
+        logger.error(message)
+    elif "⚠️" in message or "警告" in message:
+        logger.warning(message)
+    elif "⏳" in message or "进度" in message:
+        logger.debug(message)
+    else:
+        logger.info(message)
+
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """日期范围内的所有日期（YYYY-MM-DD）"""
+    current = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    days = []
+    while current <= end:
+        days.append(current.strftime('%Y-%m-%d'))
+        current += timedelta(days=1)
+    return days
+
+
+def to_segments(days: Iterable[str]) -> List[Tuple[str, str]]:
+    """把日期列表按原顺序切分为连续区间 [(开始日期, 结束日期)]"""
+    segments: List[Tuple[str, str]] = []
+    previous = None
+    for day in days:
+        current = datetime.strptime(day, '%Y-%m-%d')
+        if segments and previous is not None and current - previous == timedelta(days=1):
+            segments[-1] = (segments[-1][0], day)
+        else:
+            segments.append((day, day))
+        previous = current
+    return segments
+
+
+class DayChecksum:
+    """按天累加行数和内容校验和（各行摘要按 128 位整数求和，与行到达顺序无关）"""
+
+    def __init__(self):
+        self._days: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, day: str, digest: str) -> None:
+        count, total = self._days.get(day, (0, 0))
+        self._days[day] = (count + 1, (total + int(digest, 16)) % _CHECKSUM_MODULUS)
+
+    def result(self, days: Iterable[str]) -> Dict[str, Tuple[int, str]]:
+        """{日期: (行数, 校验和)}，没有数据的日期行数为 0"""
+        stats = {}
+        for day in days:
+            count, total = self._days.get(day, (0, 0))
+            stats[day] = (count, f"{total:032x}")
+        return stats
+
+
+class SyncStateService:
+    """同步状态读写与同步计划"""
+
+    def __init__(self, db: Session):
+        """
+        初始化服务
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    def load(self, platform: str, account_id: str, start_date: str, end_date: str) -> Dict[str, Dict]:
+        """读取日期范围内的同步状态 {日期: {status, row_count, checksum, source_fingerprint, attempts, synced_at}}"""
+        rows = self.db.execute(
+            text(
+                f"SELECT stat_date, status, row_count, checksum, source_fingerprint, attempts, synced_at "
+                f"FROM {SYNC_STATE_TABLE} "
+                f"WHERE platform = :platform AND account_id = :account_id "
+                f"AND stat_date BETWEEN :start_date AND :end_date"
+            ),
+            {"platform": platform, "account_id": account_id or "", "start_date": start_date, "end_date": end_date},
+        ).mappings().all()
+        return {str(row["stat_date"])[:10]: dict(row) for row in rows}
+
+    def plan(
+        self,
+        platform: str,
+        account_id: str,
+        start_date: str,
+        end_date: str,
+        skip_fresh_seconds: int = 0
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """
+        规划需要同步的日期
+
+        Args:
+            skip_fresh_seconds: 大于 0 时跳过在该时间内已成功同步的日期
+
+        Returns:
+            (优先重试的日期（失败或中断）, 其余需要同步的日期（升序）, 跳过的日期)
+        """
+        state = self.load(platform, account_id, start_date, end_date)
+        fresh_after = datetime.now() - timedelta(seconds=skip_fresh_seconds) if skip_fresh_seconds > 0 else None
+        retry_days, pending_days, skipped_days = [], [], []
+        for day in date_range(start_date, end_date):
+            entry = state.get(day)
+            if entry is None:
+                pending_days.append(day)
+            elif entry["status"] != STATUS_SUCCESS:
+                retry_days.append(day)
+            elif fresh_after and entry["synced_at"] and entry["synced_at"] >= fresh_after:
+                skipped_days.append(day)
+            else:
+                pending_days.append(day)
+        return retry_days, pending_days, skipped_days
+
+    def settled_days(
+        self,
+        platform: str,
+        account_id: str,
+        start_date: str,
+        end_date: str,
+        settle_hours: float = 0
+    ) -> List[str]:
+        """
+        日期范围内本地数据已完整的日期（可直接用本地表回答查询）
+
+        最近一次同步成功，且同步发生在该日结束 settle_hours 小时之后；
+        当天或同步时尚未结束的日期之后仍会变化，不算完整
+
+        Args:
+            settle_hours: 日期结束后还需等待的小时数（账户时区晚于服务器时区时调大）
+        """
+        state = self.load(platform, account_id, start_date, end_date)
+        settled = []
+        for day in date_range(start_date, end_date):
+            entry = state.get(day)
+            if not entry or entry["status"] != STATUS_SUCCESS or not entry["synced_at"]:
+                continue
+            closed_at = datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1, hours=settle_hours)
+            if entry["synced_at"] >= closed_at:
+                settled.append(day)
+        return settled
+
+    def _upsert(self, params: List[Dict], update_clause: str) -> None:
+        if not params:
+            return
+        self.db.execute(
+            text(
+                f"INSERT INTO {SYNC_STATE_TABLE} "
+                f"(platform, account_id, stat_date, status, row_count, checksum, source_fingerprint, attempts, last_error, synced_at) "
+                f"VALUES (:platform, :account_id, :stat_date, :status, :row_count, :checksum, :source_fingerprint, "
+                f":attempts, :last_error, :synced_at) "
+                f"ON DUPLICATE KEY UPDATE {update_clause}"
+            ),
+            params,
+        )
+        self.db.commit()
+
+    @staticmethod
+    def _params(platform: str, account_id: str, day: str, status: str, **values) -> Dict:
+        return {
+            "platform": platform,
+            "account_id": account_id or "",
+            "stat_date": day,
+            "status": status,
+            "row_count": values.get("row_count"),
+            "checksum": values.get("checksum"),
+            "source_fingerprint": values.get("source_fingerprint"),
+            "attempts": values.get("attempts", 0),
+            "last_error": values.get("last_error"),
+            "synced_at": values.get("synced_at"),
+        }
+
+    def mark_running(self, platform: str, account_id: str, days: Iterable[str]) -> None:
+        """标记日期开始同步（进程中断时保留 running，下次同步优先重试）"""
+        self._upsert(
+            [self._params(platform, account_id, day, STATUS_RUNNING) for day in days],
+            "status = VALUES(status)",
+        )
+
+    def mark_success(
+        self,
+        platform: str,
+        account_id: str,
+        day_stats: Dict[str, Tuple[int, str]],
+        fingerprints: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        记录成功同步的日期
+
+        Args:
+            day_stats: {日期: (行数, 校验和)}
+            fingerprints: {日期: 上游汇总指纹}，未提供的日期指纹置空（下次变化检测时按已变化处理）
+        """
+        now = datetime.now()
+        fingerprints = fingerprints or {}
+        self._upsert(
+            [
+                self._params(
+                    platform, account_id, day, STATUS_SUCCESS,
+                    row_count=count, checksum=checksum, source_fingerprint=fingerprints.get(day), synced_at=now,
+                )
+                for day, (count, checksum) in day_stats.items()
+            ],
+            "status = VALUES(status), row_count = VALUES(row_count), checksum = VALUES(checksum), "
+            "source_fingerprint = VALUES(source_fingerprint), attempts = 0, last_error = NULL, synced_at = VALUES(synced_at)",
+        )
+
+    def mark_verified(self, platform: str, account_id: str, days: Iterable[str]) -> None:
+        """上游汇总未变化、无需重新读取的日期：只刷新同步时间（用于近期已同步的判断）"""
+        days = list(days)
+        if not days:
+            return
+        self.db.execute(
+            text(
+                f"UPDATE {SYNC_STATE_TABLE} SET synced_at = :now "
+                f"WHERE platform = :platform AND account_id = :account_id "
+                f"AND stat_date IN :days AND status = :status"
+            ).bindparams(bindparam("days", expanding=True)),
+            {
+                "now": datetime.now(),
+                "platform": platform,
+                "account_id": account_id or "",
+                "days": days,
+                "status": STATUS_SUCCESS,
+            },
+        )
+        self.db.commit()
+
+    def mark_failed(self, platform: str, account_id: str, days: Iterable[str], error: Optional[str]) -> None:
+        """记录同步失败的日期（保留上一次成功的行数、校验和与时间）"""
+        self._upsert(
+            [
+                self._params(platform, account_id, day, STATUS_FAILED, attempts=1, last_error=(error or "")[:500])
+                for day in days
+            ],
+            "status = VALUES(status), attempts = attempts + 1, last_error = VALUES(last_error)",
+        )
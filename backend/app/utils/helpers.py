@@ -2,7 +2,7 @@
 通用工具函数
 """
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 
@@ -94,6 +94,23 @@ def safe_divide(numerator: float, denominator: float, default: float = 0, precis
     return round(numerator / denominator, precision)
 
 
+def get_week_comparison_bounds(date_str: str) -> tuple:
+    """
+    计算"上周一 ~ 本周日"的日期边界（周对比查询的扫描范围，便于分区裁剪）
+    
+    Args:
+        date_str: 基准日期 YYYY-MM-DD
+        
+    Returns:
+        (上周一, 本周日) 字符串元组
+    """
+    base = datetime.strptime(date_str[:10], "%Y-%m-%d")
+    monday_current = base - timedelta(days=base.weekday())
+    monday_last = monday_current - timedelta(days=7)
+    sunday_current = monday_current + timedelta(days=6)
+    return monday_last.strftime("%Y-%m-%d"), sunday_current.strftime("%Y-%m-%d")
+
+
 def normalize_account_id(account_id: Optional[str], prefix: str = "act_") -> Optional[str]:
     """
     规范化账户ID，确保以指定前缀开头
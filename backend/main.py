@@ -21,6 +21,7 @@ from app.core.scheduler import (
     release_scheduler_lock,
     start_facebook_ads_daily_sync_task,
     start_google_ads_daily_sync_task,
+    start_partition_maintenance_task,
 )
 from app.services.dingtalk_notify_service import send_error_notification
 
@@ -162,7 +163,11 @@ async def start_scheduler():
     app.state.scheduler_tasks = []
     app.state.scheduler_lock_conn = None
 
-    scheduler_enabled = settings.GOOGLE_ADS_DAILY_SYNC_ENABLED or settings.FACEBOOK_DAILY_SYNC_ENABLED
+    scheduler_enabled = (
+        settings.GOOGLE_ADS_DAILY_SYNC_ENABLED
+        or settings.FACEBOOK_DAILY_SYNC_ENABLED
+        or settings.FACT_PARTITION_MAINTENANCE_ENABLED
+    )
     if not scheduler_enabled:
         logger.info("scheduler disabled by config")
         return
@@ -180,6 +185,9 @@ async def start_scheduler():
     if settings.FACEBOOK_DAILY_SYNC_ENABLED:
         app.state.scheduler_tasks.append(start_facebook_ads_daily_sync_task())
         logger.info("Facebook Ads hourly sync enabled")
+    if settings.FACT_PARTITION_MAINTENANCE_ENABLED:
+        app.state.scheduler_tasks.append(start_partition_maintenance_task())
+        logger.info("fact table partition maintenance enabled")
 
 
 @app.on_event("shutdown")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Rebuild the Facebook daily rollup tables from fact_bi_ads_facebook_campaign.
+
+Run once after creating the tables (scripts/sql_create_facebook_rollup_tables.sql),
+or whenever the rollups need to be repaired. The rebuild is done month by month so
+each transaction stays small.
+
+Example:
+  python backend/scripts/facebook_rollup_backfill.py --start-date 2025-01-01
+  python backend/scripts/facebook_rollup_backfill.py --start-date 2025-06-01 --end-date 2025-06-30 --account-id 123
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+
+def _bootstrap_backend() -> Path:
+    """Add backend to sys.path and load .env if present."""
+    backend_dir = Path(__file__).resolve().parents[1]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+    env_file = backend_dir / ".env"
+    if env_file.exists():
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv(env_file)
+            print(f"🔧 Loaded env from {env_file}")
+        except Exception as exc:  # pragma: no cover
+            print(f"⚠️  Failed to load .env ({exc})")
+    return backend_dir
+
+
+def _month_windows(start: date, end: date) -> List[Tuple[str, str]]:
+    windows = []
+    current = start
+    while current <= end:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        window_end = min(end, next_month - timedelta(days=1))
+        windows.append((current.isoformat(), window_end.isoformat()))
+        current = window_end + timedelta(days=1)
+    return windows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild Facebook daily rollup tables")
+    parser.add_argument("--start-date", required=True, help="Start date YYYY-MM-DD")
+    parser.add_argument("--end-date", help="End date YYYY-MM-DD (default: today)")
+    parser.add_argument("--account-id", help="Only rebuild one account (without act_ prefix)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    _bootstrap_backend()
+    args = parse_args()
+
+    from app.core.database import SessionLocal
+    from app.services.facebook_rollup_service import FacebookRollupService
+
+    try:
+        start = date.fromisoformat(args.start_date)
+        end = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    if start > end:
+        print("❌ --start-date must be <= --end-date")
+        return 1
+
+    account_id = (args.account_id or "").replace("act_", "") or None
+    print(f"\nDate range: {start} -> {end}")
+    print(f"Account: {account_id or 'all'}\n")
+
+    db = SessionLocal()
+    try:
+        service = FacebookRollupService(db)
+        for window_start, window_end in _month_windows(start, end):
+            service.refresh(window_start, window_end, account_id)
+            print(f"✅ Rebuilt {window_start} -> {window_end}")
+    except Exception as exc:
+        print(f"❌ Backfill failed: {exc}")
+        return 1
+    finally:
+        db.close()
+
+    print("✅ Rollup backfill complete")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -50,6 +50,9 @@ ON fact_bi_ads_facebook_campaign (createtime, account_id, impression, spend, pur
 -- 3. 清理过期数据（可选）
 -- ==========================================
 
+-- 推荐：执行 scripts/partition_fact_tables.py --init 将事实表改为按月分区，
+-- 由调度器的分区维护任务按 FACT_PARTITION_RETENTION_MONTHS 整区删除过期数据（无需逐行 DELETE）
+
 -- 删除超过1年的历史数据（根据实际需求调整）
 -- DELETE FROM fact_bi_ads_google_campaign WHERE createtime < DATE_SUB(CURDATE(), INTERVAL 365 DAY);
 -- DELETE FROM fact_bi_ads_facebook_campaign WHERE createtime < DATE_SUB(CURDATE(), INTERVAL 365 DAY);
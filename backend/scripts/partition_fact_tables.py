@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Monthly RANGE partitioning for the fact tables (by createtime).
+
+--init converts an unpartitioned table to monthly partitions. Rows before
+--from-month land in the first partition. It rebuilds the table, so run it
+in a maintenance window. --maintain runs the same job as the scheduler:
+pre-create future partitions and drop the ones past the retention period.
+
+Example:
+  python backend/scripts/partition_fact_tables.py --init --from-month 2024-01 --dry-run
+  python backend/scripts/partition_fact_tables.py --init --from-month 2024-01
+  python backend/scripts/partition_fact_tables.py --maintain
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+
+def _bootstrap_backend() -> Path:
+    """Add backend to sys.path and load .env if present."""
+    backend_dir = Path(__file__).resolve().parents[1]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+    env_file = backend_dir / ".env"
+    if env_file.exists():
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv(env_file)
+            print(f"🔧 Loaded env from {env_file}")
+        except Exception as exc:  # pragma: no cover
+            print(f"⚠️  Failed to load .env ({exc})")
+    return backend_dir
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the fact tables")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--init", action="store_true", help="Partition unpartitioned fact tables")
+    action.add_argument("--maintain", action="store_true", help="Create future / drop expired partitions")
+    parser.add_argument("--from-month", help="First monthly partition YYYY-MM (required with --init)")
+    parser.add_argument("--table", help="Only handle this fact table")
+    parser.add_argument("--dry-run", action="store_true", help="Print the DDL without executing it")
+    return parser.parse_args()
+
+
+def main() -> int:
+    _bootstrap_backend()
+    args = parse_args()
+
+    from sqlalchemy import text
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.services.partition_service import PARTITIONED_FACT_TABLES, PartitionService
+
+    tables = [args.table] if args.table else list(PARTITIONED_FACT_TABLES)
+    unknown = [t for t in tables if t not in PARTITIONED_FACT_TABLES]
+    if unknown:
+        print(f"❌ Unsupported table: {', '.join(unknown)}")
+        return 1
+
+    db = SessionLocal()
+    try:
+        service = PartitionService(db)
+        if args.maintain:
+            report = service.run_maintenance()
+            for table_name, changes in report.items():
+                print(f"✅ {table_name}: created={changes['created']} dropped={changes['dropped']}")
+            return 0
+
+        if not args.from_month:
+            print("❌ --from-month is required with --init")
+            return 1
+        try:
+            from_month = date.fromisoformat(f"{args.from_month}-01")
+        except ValueError as exc:
+            print(f"❌ {exc}")
+            return 1
+
+        for table_name in tables:
+            if service.get_partitions(table_name, refresh=True):
+                print(f"ℹ️ {table_name} is already partitioned, skipped")
+                continue
+            ddl = service.build_initial_partition_ddl(
+                table_name, from_month, settings.FACT_PARTITION_PRECREATE_MONTHS
+            )
+            print(f"\n{ddl};\n")
+            if not args.dry_run:
+                db.execute(text(ddl))
+                print(f"✅ {table_name} partitioned")
+        return 0
+    except Exception as exc:
+        print(f"❌ Partitioning failed: {exc}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
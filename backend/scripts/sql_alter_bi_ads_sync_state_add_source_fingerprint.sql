@@ -0,0 +1,10 @@
+-- ==========================================
+-- 同步状态表增加上游汇总指纹列（整点同步的变化检测使用）
+-- 整点同步先用一次账户级 time_increment=1 请求取得每天的汇总，与该列比较，
+-- 只对汇总发生变化的日期执行广告级读取；新建的表已包含该列，无需执行
+-- ==========================================
+
+ALTER TABLE bi_ads_sync_state
+  ADD COLUMN `source_fingerprint` char(32) CHARACTER SET ascii COLLATE ascii_bin DEFAULT NULL COMMENT '同步时上游当天账户级汇总的指纹（变化检测用）' AFTER `checksum`;
+
+-- 已有行的指纹为 NULL，首次整点同步会按变化处理并补齐
@@ -0,0 +1,30 @@
+-- ==========================================
+-- 把事实表上的创意列迁移到 dim_ad_creative 后删除
+-- 先执行 scripts/sql_create_dim_ad_creative.sql，并部署不再写入这两列的同步服务
+-- ==========================================
+
+-- 1. 回填维度表（每个广告取最近一天的创意）
+INSERT INTO dim_ad_creative (ad_id, account_id, image_url, preview_html, content_hash)
+SELECT
+  f.ad_id,
+  MAX(f.account_id),
+  MAX(f.image_url),
+  MAX(f.preview_url),
+  MD5(CONCAT_WS(CHAR(31), IFNULL(MAX(f.image_url), ''), IFNULL(MAX(f.preview_url), '')))
+FROM fact_bi_ads_facebook_campaign f
+JOIN (
+  SELECT ad_id, MAX(createtime) AS createtime
+  FROM fact_bi_ads_facebook_campaign
+  WHERE image_url IS NOT NULL OR preview_url IS NOT NULL
+  GROUP BY ad_id
+) latest ON latest.ad_id = f.ad_id AND latest.createtime = f.createtime
+GROUP BY f.ad_id
+ON DUPLICATE KEY UPDATE ad_id = dim_ad_creative.ad_id;
+
+-- 2. 删除事实表上的创意列（大表建议使用 pt-online-schema-change / gh-ost 执行）
+ALTER TABLE fact_bi_ads_facebook_campaign
+  DROP COLUMN image_url,
+  DROP COLUMN preview_url;
+
+-- 3. 回收空间
+OPTIMIZE TABLE fact_bi_ads_facebook_campaign;
@@ -0,0 +1,14 @@
+-- ==========================================
+-- Google 事实表增加客户ID列（多客户同步使用）
+-- 每个客户按 customer_id 分别覆盖同步窗口内的数据，互不删除
+-- 执行后开启 GOOGLE_ADS_CUSTOMER_SCOPE_ENABLED
+-- ==========================================
+
+ALTER TABLE fact_bi_ads_google_campaign
+  ADD COLUMN `customer_id` varchar(32) NOT NULL DEFAULT '' COMMENT 'Google Ads 客户ID' AFTER `createtime`,
+  ADD INDEX `idx_customer_createtime` (`customer_id`, `createtime`);
+
+-- 历史行的 customer_id 为空，视为属于 GOOGLE_ADS_CUSTOMER_ID：该客户同步时会一并覆盖并补上 customer_id，
+-- 概览汇总遇到仍含历史行的日期时改为实时查询。
+-- 如需立即回填，把占位符替换为原 GOOGLE_ADS_CUSTOMER_ID（不含“-”）后取消注释单独执行
+-- UPDATE fact_bi_ads_google_campaign SET customer_id = '<GOOGLE_ADS_CUSTOMER_ID>' WHERE customer_id = '';
@@ -0,0 +1,16 @@
+-- ==========================================
+-- 事实表增加内容哈希列（SYNC_WRITE_MODE=upsert/staging 使用，切换写入模式前执行）
+-- 同步时按主键比较 row_hash，未变化的行不再写入
+-- ==========================================
+
+-- upsert 依赖以下主键（ON DUPLICATE KEY UPDATE），如表上缺失请先补齐：
+-- ALTER TABLE fact_bi_ads_facebook_campaign ADD PRIMARY KEY (campaign_id, adset_id, ad_id, createtime);
+-- ALTER TABLE fact_bi_ads_google_campaign ADD PRIMARY KEY (campaign_id, createtime);
+
+ALTER TABLE fact_bi_ads_facebook_campaign
+  ADD COLUMN `row_hash` char(32) CHARACTER SET ascii COLLATE ascii_bin NULL COMMENT '数据列内容哈希（增量同步用）';
+
+ALTER TABLE fact_bi_ads_google_campaign
+  ADD COLUMN `row_hash` char(32) CHARACTER SET ascii COLLATE ascii_bin NULL COMMENT '数据列内容哈希（增量同步用）';
+
+-- 历史行的 row_hash 为 NULL，首次增量同步时会被视为已变化并重写一次，之后即可跳过未变化的行
@@ -0,0 +1,23 @@
+-- ==========================================
+-- 广告数据同步状态表（平台 × 账户 × 天）
+-- 记录每一天最近一次同步的状态、行数和内容校验和；
+-- 同步服务据此优先重试失败/中断的日期、跳过近期已成功同步的日期，并只写入成功读取的连续日期区间
+-- ==========================================
+
+-- status: running（已开始未完成，进程中断时保留）/ success / failed
+-- checksum 为当天各行（主键 + 内容哈希）摘要按 128 位整数求和，与行顺序无关
+CREATE TABLE IF NOT EXISTS bi_ads_sync_state (
+  `platform` varchar(16) CHARACTER SET ascii COLLATE ascii_bin NOT NULL COMMENT '平台 facebook/google',
+  `account_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '账户ID（Facebook 不含act_前缀 / Google 客户ID）',
+  `stat_date` date NOT NULL COMMENT '数据日期',
+  `status` varchar(16) CHARACTER SET ascii COLLATE ascii_bin NOT NULL COMMENT '同步状态',
+  `row_count` int DEFAULT NULL COMMENT '最近一次成功同步的行数',
+  `checksum` char(32) CHARACTER SET ascii COLLATE ascii_bin DEFAULT NULL COMMENT '最近一次成功同步的内容校验和',
+  `source_fingerprint` char(32) CHARACTER SET ascii COLLATE ascii_bin DEFAULT NULL COMMENT '同步时上游当天账户级汇总的指纹（变化检测用）',
+  `attempts` int NOT NULL DEFAULT 0 COMMENT '连续失败次数（成功后清零）',
+  `last_error` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '最近一次失败原因',
+  `synced_at` datetime DEFAULT NULL COMMENT '最近一次成功同步时间',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '状态更新时间',
+  PRIMARY KEY (`platform`, `account_id`, `stat_date`),
+  KEY `idx_sync_state_status` (`platform`, `status`, `stat_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='广告数据同步状态';
@@ -0,0 +1,18 @@
+-- ==========================================
+-- Facebook 广告创意维度表（每个广告一行）
+-- 图片 URL 与预览 HTML 从事实表移出，同步时按内容哈希只在变化时写入
+-- 建表后执行 scripts/sql_alter_fact_facebook_drop_creative_columns.sql 回填并删除事实表上的创意列，
+-- 再开启 FACEBOOK_CREATIVE_DIMENSION_ENABLED（广告明细接口才会关联本表）
+-- ==========================================
+
+-- preview_html 单条可达 64KB，表使用压缩行格式（需 innodb_file_per_table=ON；不支持时可去掉 ROW_FORMAT/KEY_BLOCK_SIZE）
+CREATE TABLE IF NOT EXISTS dim_ad_creative (
+  `ad_id` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '广告ID',
+  `account_id` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '广告账户ID（不含act_前缀）',
+  `image_url` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '广告图片URL',
+  `preview_html` mediumtext CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '广告预览HTML',
+  `content_hash` char(32) CHARACTER SET ascii COLLATE ascii_bin NOT NULL COMMENT '图片URL+预览HTML 内容哈希',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '内容更新时间',
+  PRIMARY KEY (`ad_id`),
+  KEY `idx_dim_ad_creative_account` (`account_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8 COMMENT='Facebook 广告创意维度';
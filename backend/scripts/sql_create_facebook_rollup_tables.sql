@@ -0,0 +1,64 @@
+-- ==========================================
+-- Facebook 日汇总表（账户/广告系列/广告组 × 天）
+-- 由同步服务在写入明细后按同步窗口增量刷新
+-- 首次部署后请执行 scripts/facebook_rollup_backfill.py 回填历史数据，再开启 FACEBOOK_ROLLUP_ENABLED
+-- （未开启前同步不会刷新汇总表，开启后可对开启前几天再回填一次）
+-- ==========================================
+
+-- 说明：
+-- ad_rows / ctr_ratio_sum / cpm_ratio_sum 用于还原明细表上
+-- AVG(CASE WHEN impression > 0 THEN clicks / impression * 100 ELSE 0 END) 这类逐行平均指标，
+-- 即 AVG = SUM(ctr_ratio_sum) / SUM(ad_rows)，保证看板口径与明细表完全一致。
+-- purchases_value 为 SUM(purchases_roas * spend)。
+
+CREATE TABLE IF NOT EXISTS agg_bi_ads_facebook_account_daily (
+  `account_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '账户ID（不含act_前缀）',
+  `createtime` date NOT NULL COMMENT '日期',
+  `impression` bigint NOT NULL DEFAULT 0 COMMENT '展示次数',
+  `spend` decimal(16,4) NOT NULL DEFAULT 0 COMMENT '花费',
+  `clicks` bigint NOT NULL DEFAULT 0 COMMENT '点击次数',
+  `reach` bigint NOT NULL DEFAULT 0 COMMENT '触达（广告行累加，与明细表口径一致）',
+  `unique_link_clicks` bigint NOT NULL DEFAULT 0 COMMENT '独立链接点击',
+  `adds_to_cart` bigint NOT NULL DEFAULT 0 COMMENT '加购次数',
+  `adds_payment_info` bigint NOT NULL DEFAULT 0 COMMENT '添加支付信息次数',
+  `purchases` bigint NOT NULL DEFAULT 0 COMMENT '购买次数',
+  `purchases_value` decimal(20,6) NOT NULL DEFAULT 0 COMMENT '购买价值 SUM(purchases_roas * spend)',
+  `ad_rows` int NOT NULL DEFAULT 0 COMMENT '明细广告行数',
+  `ctr_ratio_sum` decimal(24,8) NOT NULL DEFAULT 0 COMMENT '逐行CTR之和',
+  `cpm_ratio_sum` decimal(24,8) NOT NULL DEFAULT 0 COMMENT '逐行CPM之和',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '刷新时间',
+  PRIMARY KEY (`createtime`, `account_id`),
+  KEY `idx_fb_account_daily_account` (`account_id`, `createtime`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Facebook 账户×天汇总';
+
+CREATE TABLE IF NOT EXISTS agg_bi_ads_facebook_campaign_daily (
+  `account_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '账户ID（不含act_前缀）',
+  `campaign_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '广告系列ID',
+  `campaign_name` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '广告系列名称',
+  `createtime` date NOT NULL COMMENT '日期',
+  `impression` bigint NOT NULL DEFAULT 0 COMMENT '展示次数',
+  `spend` decimal(16,4) NOT NULL DEFAULT 0 COMMENT '花费',
+  `clicks` bigint NOT NULL DEFAULT 0 COMMENT '点击次数',
+  `unique_link_clicks` bigint NOT NULL DEFAULT 0 COMMENT '独立链接点击',
+  `purchases` bigint NOT NULL DEFAULT 0 COMMENT '购买次数',
+  `purchases_value` decimal(20,6) NOT NULL DEFAULT 0 COMMENT '购买价值 SUM(purchases_roas * spend)',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '刷新时间',
+  PRIMARY KEY (`createtime`, `account_id`, `campaign_id`, `campaign_name`),
+  KEY `idx_fb_campaign_daily_campaign` (`campaign_id`, `createtime`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Facebook 广告系列×天汇总';
+
+CREATE TABLE IF NOT EXISTS agg_bi_ads_facebook_adset_daily (
+  `account_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '账户ID（不含act_前缀）',
+  `adset_id` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '广告组ID',
+  `adset_name` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '广告组名称',
+  `createtime` date NOT NULL COMMENT '日期',
+  `impression` bigint NOT NULL DEFAULT 0 COMMENT '展示次数',
+  `spend` decimal(16,4) NOT NULL DEFAULT 0 COMMENT '花费',
+  `clicks` bigint NOT NULL DEFAULT 0 COMMENT '点击次数',
+  `unique_link_clicks` bigint NOT NULL DEFAULT 0 COMMENT '独立链接点击',
+  `purchases` bigint NOT NULL DEFAULT 0 COMMENT '购买次数',
+  `purchases_value` decimal(20,6) NOT NULL DEFAULT 0 COMMENT '购买价值 SUM(purchases_roas * spend)',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '刷新时间',
+  PRIMARY KEY (`createtime`, `account_id`, `adset_id`, `adset_name`),
+  KEY `idx_fb_adset_daily_adset` (`adset_id`, `createtime`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Facebook 广告组×天汇总';